@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.analytics import hour_weekday_heatmap, load_columns
+from where_did_my_time_go.storage import Database
+
+CATEGORIES = ["Work", "Social", "Video", "Reading", "Communication", "Other", "Idle"]
+
+
+def build_database(path: Path, sessions: int, days: int) -> tuple[str, str]:
+    db = Database(path)
+    db.initialize()
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    step = days * 86400 / sessions
+    rows = []
+    for index in range(sessions):
+        begin = start + timedelta(seconds=index * step)
+        length = rng.randint(5, int(step * 3))
+        rows.append(
+            (
+                begin.isoformat(),
+                (begin + timedelta(seconds=length)).isoformat(),
+                length,
+                f"app{rng.randint(0, 150)}.exe",
+                "",
+                "",
+                rng.choice(CATEGORIES),
+                None,
+            )
+        )
+    db._conn.executemany(
+        """
+        INSERT INTO sessions (
+            start_ts, end_ts, duration_sec, process_name, exe_path,
+            window_title, category, intent_tag
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    db._conn.commit()
+    db.close()
+    return start.isoformat(), (start + timedelta(days=days + 1)).isoformat()
+
+
+# The approach ReportsWidget.refresh takes: iterate sqlite3.Row objects in Python.
+def row_by_row_heatmap(db: Database, start_ts: str, end_ts: str) -> list[list[float]]:
+    heatmap = [[0.0] * 24 for _ in range(7)]
+    for row in db.fetch_sessions(start_ts, end_ts):
+        begin = datetime.fromisoformat(row["start_ts"])
+        end = datetime.fromisoformat(row["end_ts"])
+        while begin < end:
+            hour_end = begin.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            piece_end = min(end, hour_end)
+            heatmap[begin.weekday()][begin.hour] += (piece_end - begin).total_seconds()
+            begin = piece_end
+    return heatmap
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare vectorized and row-by-row heatmaps.")
+    parser.add_argument("--sessions", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        start_ts, end_ts = build_database(path, args.sessions, args.days)
+        db = Database(path)
+        db.initialize()
+
+        began = time.perf_counter()
+        row_by_row_heatmap(db, start_ts, end_ts)
+        row_seconds = time.perf_counter() - began
+
+        began = time.perf_counter()
+        columns = load_columns(db, start_ts, end_ts)
+        load_seconds = time.perf_counter() - began
+        began = time.perf_counter()
+        hour_weekday_heatmap(columns)
+        compute_seconds = time.perf_counter() - began
+        db.close()
+
+    print(f"sessions:            {args.sessions} over {args.days} days")
+    print(f"row-by-row:          {row_seconds * 1000:.1f} ms")
+    print(f"vectorized load:     {load_seconds * 1000:.1f} ms")
+    print(f"vectorized heatmap:  {compute_seconds * 1000:.1f} ms")
+    print(f"speedup:             {row_seconds / (load_seconds + compute_seconds):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.backup import run_backup
+from where_did_my_time_go.storage import Database, SessionRecord
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def build(path: Path, rows: int) -> None:
+    db = Database(path)
+    db.initialize()
+    db.add_sessions(
+        SessionRecord(
+            start_ts=(START + timedelta(seconds=index * 30)).isoformat(),
+            end_ts=(START + timedelta(seconds=index * 30 + 25)).isoformat(),
+            duration_sec=25,
+            process_name=f"app{index % 200}.exe",
+            exe_path=f"C:\\Program Files\\App {index % 200}\\app.exe",
+            window_title=f"Document {index} - some longer window title text - App {index % 200}",
+            category="Work",
+            intent_tag=None,
+        )
+        for index in range(rows)
+    )
+    db.close()
+
+
+class Ticker(threading.Thread):
+    # Stands in for the tracker: extends the open session row on its own
+    # connection every interval and records how long each write took.
+    def __init__(self, path: Path, interval: float) -> None:
+        super().__init__(daemon=True)
+        self._db = Database(path, check_same_thread=False)
+        self._interval = interval
+        self._stop_event = threading.Event()
+        self.latencies: list[float] = []
+        self.errors = 0
+        self._session_id = self._db.add_session(
+            SessionRecord(START.isoformat(), START.isoformat(), 0, "bench.exe", "", "open", "Work", None)
+        )
+
+    def run(self) -> None:
+        ticks = 0
+        while not self._stop_event.wait(self._interval):
+            ticks += 1
+            began = time.perf_counter()
+            try:
+                self._db.update_session_end(self._session_id, (START + timedelta(seconds=ticks)).isoformat(), ticks)
+            except sqlite3.OperationalError:
+                self.errors += 1
+            self.latencies.append((time.perf_counter() - began) * 1000)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+        self._db.close()
+
+
+def measure(label: str, path: Path, backup, interval: float) -> None:
+    ticker = Ticker(path, interval)
+    ticker.start()
+    time.sleep(0.5)
+    began = time.perf_counter()
+    backup()
+    elapsed = time.perf_counter() - began
+    time.sleep(0.2)
+    ticker.stop()
+    latencies = sorted(ticker.latencies)
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+    print(
+        f"{label:<28} backup {elapsed:6.2f}s  ticks {len(latencies):5d}  "
+        f"p50 {statistics.median(latencies):6.2f} ms  p95 {p95:7.2f} ms  max {latencies[-1]:8.1f} ms  "
+        f"errors {ticker.errors}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Tracker write latency while the database is backed up.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tick-ms", type=float, default=20.0, help="write interval of the stand-in tracker")
+    args = parser.parse_args()
+    interval = args.tick_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.db"
+        build(path, args.rows)
+        print(f"database: {args.rows:,} sessions, {path.stat().st_size / 2**20:.0f} MiB")
+        target = Path(tmp) / "backups"
+
+        measure("no backup", path, lambda: time.sleep(2), interval)
+        measure("stepped (WAL snapshot)", path, lambda: run_backup(path, target, quick_check=False), interval)
+        measure("one step (WAL snapshot)", path, lambda: run_backup(path, target, quick_check=False, pages=-1), interval)
+        measure("stepped + quick_check", path, lambda: run_backup(path, target), interval)
+
+        # What the same copy costs under the old rollback journal: the reader
+        # holds a shared lock for the whole copy and the tracker's commits wait.
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode=DELETE")
+        connection.close()
+
+        def rollback_copy() -> None:
+            source = sqlite3.connect(path)
+            dest = sqlite3.connect(Path(tmp) / "rollback-copy.db")
+            source.backup(dest)
+            dest.close()
+            source.close()
+
+        measure("one step (rollback journal)", path, rollback_copy, interval)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
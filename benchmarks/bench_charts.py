@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCharts import (  # noqa: E402
+    QBarCategoryAxis,
+    QBarSeries,
+    QBarSet,
+    QChart,
+    QChartView,
+    QPieSeries,
+    QValueAxis,
+)
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from where_did_my_time_go.chart_model import BarChartModel, PieChartModel  # noqa: E402
+
+
+def synthetic_totals(apps: int, categories: int, seed: int = 0) -> tuple[dict, dict]:
+    rng = random.Random(seed)
+    by_app = {f"app{index}.exe": float(rng.randint(60, 36_000)) for index in range(apps)}
+    by_category = {f"Category {index}": float(rng.randint(600, 72_000)) for index in range(categories)}
+    return by_app, by_category
+
+
+def tick(by_app: dict, by_category: dict, rng: random.Random) -> None:
+    # A 5 s refresh: the focused app and its category grow a little.
+    by_app[rng.choice(list(by_app))] += 5
+    by_category[rng.choice(list(by_category))] += 5
+
+
+class Rebuild:
+    # What ReportsWidget.refresh did before chart_model (with addAxis in place
+    # of the deprecated setAxisX): clear and refill the pie, recreate the bar
+    # set and the axes every refresh.
+    def __init__(self) -> None:
+        self.pie_chart = QChart()
+        self.pie = QPieSeries()
+        self.pie_chart.addSeries(self.pie)
+        self.bar_chart = QChart()
+        self.bars = QBarSeries()
+        self.bar_chart.addSeries(self.bars)
+        self.views = [QChartView(self.pie_chart), QChartView(self.bar_chart)]
+
+    def refresh(self, by_app: dict, by_category: dict) -> None:
+        self.pie.clear()
+        for category, total in by_category.items():
+            self.pie.append(category, total)
+        self.bars.clear()
+        bar_set = QBarSet("Apps")
+        labels = []
+        for app, total in sorted(by_app.items(), key=lambda item: item[1], reverse=True)[:10]:
+            bar_set.append(total)
+            labels.append(app)
+        self.bars.append(bar_set)
+        axis = QBarCategoryAxis()
+        axis.append(labels)
+        for old in self.bar_chart.axes():
+            self.bar_chart.removeAxis(old)
+        self.bar_chart.createDefaultAxes()
+        self.bar_chart.addAxis(axis, Qt.AlignBottom)
+        self.bars.attachAxis(axis)
+
+
+class Incremental:
+    def __init__(self) -> None:
+        self.pie_chart = QChart()
+        self.pie = QPieSeries()
+        self.pie_chart.addSeries(self.pie)
+        self.bar_chart = QChart()
+        bars = QBarSeries()
+        bar_set = QBarSet("Apps")
+        bars.append(bar_set)
+        self.bar_chart.addSeries(bars)
+        axis = QBarCategoryAxis()
+        value_axis = QValueAxis()
+        self.bar_chart.addAxis(axis, Qt.AlignBottom)
+        self.bar_chart.addAxis(value_axis, Qt.AlignLeft)
+        bars.attachAxis(axis)
+        bars.attachAxis(value_axis)
+        self.pie_model = PieChartModel(self.pie_chart, self.pie)
+        self.bar_model = BarChartModel(self.bar_chart, bar_set, axis, value_axis)
+        self.views = [QChartView(self.pie_chart), QChartView(self.bar_chart)]
+
+    def refresh(self, by_app: dict, by_category: dict) -> None:
+        self.pie_model.update(by_category)
+        self.bar_model.update(by_app)
+
+
+def measure(view_cls, apps: int, categories: int, refreshes: int) -> tuple[float, float]:
+    # (CPU ms per refresh for the update itself, CPU ms including a repaint)
+    app = QApplication.instance()
+    chart = view_cls()
+    for view in chart.views:
+        view.resize(800, 400)
+        view.show()
+    by_app, by_category = synthetic_totals(apps, categories)
+    rng = random.Random(1)
+    chart.refresh(by_app, by_category)
+    app.processEvents()
+    update = total = 0.0
+    for _ in range(refreshes):
+        tick(by_app, by_category, rng)
+        began = time.process_time()
+        chart.refresh(by_app, by_category)
+        updated = time.process_time()
+        for view in chart.views:
+            view.repaint()
+        app.processEvents()
+        update += updated - began
+        total += time.process_time() - began
+    for view in chart.views:
+        view.close()
+    return update / refreshes * 1000, total / refreshes * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare chart rebuilds with in-place chart model updates.")
+    parser.add_argument("--apps", type=int, default=400)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--refreshes", type=int, default=100)
+    args = parser.parse_args()
+
+    QApplication([])
+    for name, view_cls in (("rebuild", Rebuild), ("incremental", Incremental)):
+        update, total = measure(view_cls, args.apps, args.categories, args.refreshes)
+        print(f"{name:<12} update {update:7.2f} ms   update + repaint {total:7.2f} ms   CPU per refresh")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.comparison import compare_periods
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.report_cache import ReportCache, ReportTotals
+from where_did_my_time_go.storage import Database, SessionRecord
+
+CATEGORIES = ["Work", "Communication", "Browsing", "Video", "Games", "Other", "Idle"]
+
+
+def synthetic_records(days: int, end: datetime, seed: int = 0):
+    # Twelve tracked hours a day, switching every few seconds to a minute.
+    rng = random.Random(seed)
+    start = end - timedelta(days=days)
+    for day in range(days + 1):
+        moment = start + timedelta(days=day, hours=8)
+        day_end = min(moment + timedelta(hours=12), end)
+        while moment < day_end:
+            seconds = rng.randint(2, 60)
+            category = rng.choice(CATEGORIES)
+            yield SessionRecord(
+                start_ts=moment.isoformat(),
+                end_ts=(moment + timedelta(seconds=seconds)).isoformat(),
+                duration_sec=seconds,
+                process_name=f"{category.lower()}{rng.randint(0, 20)}.exe",
+                exe_path="",
+                window_title=f"Window {rng.randint(0, 500)}",
+                category=category,
+                intent_tag=None,
+            )
+            moment += timedelta(seconds=seconds)
+
+
+def naive(db: Database, now: datetime, period_days: int) -> tuple[dict[str, int], dict[str, int]]:
+    # Both periods summed from raw rows in Python, as a report reading the
+    # sessions of each period would.
+    end = datetime(now.year, now.month, now.day, tzinfo=timezone.utc) + timedelta(days=1)
+    middle = end - timedelta(days=period_days)
+    start = middle - timedelta(days=period_days)
+    periods = []
+    for low, high in ((middle, end), (start, middle)):
+        totals = ReportTotals()
+        for row in db.iter_select(SessionQuery(low.isoformat(), high.isoformat())):
+            totals.add(row[6], row[3], row[2])
+        periods.append(totals.by_category())
+    return periods[0], periods[1]
+
+
+def timed(action, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        action()
+        samples.append((time.perf_counter() - began) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time period-over-period comparisons on a large history.")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--period", type=int, default=30, help="days per period (30: month over month)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "data.db")
+        db.initialize()
+        rows = db.add_sessions(synthetic_records(args.days, now))
+        print(f"{rows} sessions over {args.days} days")
+
+        samples = timed(lambda: naive(db, now, args.period), args.repeat)
+        print(f"raw rows, two periods    median {statistics.median(samples):9.1f} ms")
+        cache = ReportCache(db)
+        cold = timed(lambda: compare_periods(cache, args.period, now=now), 1)[0]
+        print(f"comparison, cold rollups        {cold:9.1f} ms")
+        samples = timed(lambda: compare_periods(cache, args.period, now=now), args.repeat)
+        print(f"comparison, cached rollups median {statistics.median(samples):7.1f} ms")
+        samples = timed(lambda: compare_periods(cache, args.period, by="app", now=now), args.repeat)
+        print(f"comparison by app, cached  median {statistics.median(samples):7.1f} ms")
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Both children track a scripted foreground app, so the numbers compare process
+# overhead rather than Win32 calls.
+_PRELUDE = """
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from where_did_my_time_go import storage
+storage.DB_PATH = Path({db_path!r})
+
+from where_did_my_time_go.settings import SettingsStore
+
+app = SimpleNamespace(process_name="code.exe", window_title="main.py", exe_path="C:/code.exe")
+providers = dict(foreground=lambda: app, idle_seconds=lambda: 0)
+settings = SettingsStore()
+settings.load()
+print("ready", flush=True)
+"""
+
+_DAEMON_SCRIPT = _PRELUDE + """
+from where_did_my_time_go.daemon import TrackerDaemon
+from where_did_my_time_go.tracker_core import TrackerCore
+
+TrackerDaemon(TrackerCore(settings, **providers), Path({state_path!r})).serve_forever()
+"""
+
+# Today's process: the full window with Dashboard and Reports built, then hidden
+# to tray, with the tracker on a QThread.
+_GUI_SCRIPT = _PRELUDE + """
+from PySide6.QtCore import QThread
+from PySide6.QtWidgets import QApplication
+
+from where_did_my_time_go.app import MainWindow
+from where_did_my_time_go.tracker import TrackerWorker
+
+qt_app = QApplication(sys.argv)
+window = MainWindow(settings)
+window.show()
+for index in range(2):
+    window.tabs.setCurrentIndex(index)
+    qt_app.processEvents()
+window.hide()
+thread = QThread()
+worker = TrackerWorker(settings, **providers)
+worker.moveToThread(thread)
+thread.started.connect(worker.run)
+thread.start()
+qt_app.exec()
+"""
+
+
+def process_stats(pid: int) -> tuple[float, float]:
+    # (RSS in MiB, user+system CPU seconds) for a child process.
+    if sys.platform == "win32":
+        import win32api
+        import win32con
+        import win32process
+
+        handle = win32api.OpenProcess(
+            win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ, False, pid
+        )
+        try:
+            rss = win32process.GetProcessMemoryInfo(handle)["WorkingSetSize"]
+            times = win32process.GetProcessTimes(handle)
+            cpu = (times["UserTime"] + times["KernelTime"]) / 10_000_000
+        finally:
+            win32api.CloseHandle(handle)
+        return rss / 2**20, cpu
+    with open(f"/proc/{pid}/status", encoding="ascii") as handle:
+        rss_kib = next(int(line.split()[1]) for line in handle if line.startswith("VmRSS:"))
+    with open(f"/proc/{pid}/stat", encoding="ascii") as handle:
+        fields = handle.read().rsplit(")", 1)[1].split()
+    ticks = os.sysconf("SC_CLK_TCK")
+    return rss_kib / 1024, (int(fields[11]) + int(fields[12])) / ticks
+
+
+def measure(script: str, warmup: float, duration: float) -> tuple[float, float]:
+    env = dict(os.environ)
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    child = subprocess.Popen([sys.executable, "-c", script], env=env, stdout=subprocess.PIPE, text=True)
+    try:
+        child.stdout.readline()
+        time.sleep(warmup)
+        _, cpu_before = process_stats(child.pid)
+        time.sleep(duration)
+        rss, cpu_after = process_stats(child.pid)
+    finally:
+        child.terminate()
+        child.wait(10)
+    return rss, (cpu_after - cpu_before) / duration * 100
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare the headless tracker daemon with the in-app tracker.")
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "data.db")
+        state_path = str(Path(tmp) / "daemon.json")
+        results = {
+            "daemon": measure(_DAEMON_SCRIPT.format(db_path=db_path, state_path=state_path), args.warmup, args.duration),
+            "gui + tracker": measure(_GUI_SCRIPT.format(db_path=db_path), args.warmup, args.duration),
+        }
+    for name, (rss, cpu) in results.items():
+        print(f"{name:<14} RSS {rss:7.1f} MiB   CPU {cpu:5.2f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.eventlog import EventLog
+from where_did_my_time_go.storage import Database, SessionRecord, to_iso
+
+START = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def _write_bytes() -> int | None:
+    # Linux only; counts bytes this process handed to the block layer.
+    try:
+        with open("/proc/self/io", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("write_bytes:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _ticks(seconds: int, switch_every: int):
+    for tick in range(seconds):
+        yield tick, to_iso(START + timedelta(seconds=tick)), f"app{(tick // switch_every) % 7}.exe"
+
+
+def simulate_sessions(db: Database, seconds: int, switch_every: int) -> None:
+    # Mirrors TrackerWorker in "sessions" mode: insert on change, update every tick.
+    session_id = None
+    current = None
+    start_ts = None
+    for _, ts, app in _ticks(seconds, switch_every):
+        if app != current:
+            if session_id is not None:
+                duration = int((datetime.fromisoformat(ts) - datetime.fromisoformat(start_ts)).total_seconds())
+                db.update_session_end(session_id, ts, duration)
+            session_id = db.add_session(SessionRecord(ts, ts, 0, app, "", "", "Work", None))
+            current, start_ts = app, ts
+        else:
+            duration = int((datetime.fromisoformat(ts) - datetime.fromisoformat(start_ts)).total_seconds())
+            db.update_session_end(session_id, ts, duration)
+
+
+def simulate_events(db: Database, seconds: int, switch_every: int) -> None:
+    log = EventLog(db)
+    current = None
+    for _, ts, app in _ticks(seconds, switch_every):
+        if app != current:
+            log.focus(ts, app, "", "", "Work")
+            current = app
+        else:
+            log.checkpoint(ts)
+    log.stop(to_iso(START + timedelta(seconds=seconds)))
+
+
+def measure(name: str, simulate, seconds: int, switch_every: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        db.initialize()
+        commits = 0
+
+        def trace(statement: str) -> None:
+            nonlocal commits
+            commits += statement.strip().upper().startswith("COMMIT")
+
+        db._conn.set_trace_callback(trace)
+        changes = db._conn.total_changes
+        written = _write_bytes()
+        began = time.perf_counter()
+        simulate(db, seconds, switch_every)
+        elapsed = time.perf_counter() - began
+        changes = db._conn.total_changes - changes
+        written = None if written is None else _write_bytes() - written
+        db._conn.set_trace_callback(None)
+        db.close()
+    hours = seconds / 3600
+    line = f"{name:<9} commits/h {commits / hours:7.0f}  row changes/h {changes / hours:7.0f}  {elapsed:6.2f}s"
+    if written is not None:
+        line += f"  disk KiB/h {written / 1024 / hours:9.0f}"
+    print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare per-tick session updates with the focus-event log.")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--switch-every", type=int, default=90, help="seconds between focus changes")
+    args = parser.parse_args()
+    seconds = int(args.hours * 3600)
+    measure("sessions", simulate_sessions, seconds, args.switch_every)
+    measure("events", simulate_events, seconds, args.switch_every)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
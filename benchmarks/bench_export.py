@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.exporter import SessionExporter, Sink
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.storage import Database, SessionRecord
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class SlowSink(Sink):
+    # A collector that takes delay seconds per batch, whatever its size.
+    def __init__(self, delay: float) -> None:
+        super().__init__("slow")
+        self.delay = delay
+        self.received = 0
+
+    def write(self, records: list[SessionRecord]) -> None:
+        time.sleep(self.delay)
+        self.received += len(records)
+
+
+def record(index: int) -> SessionRecord:
+    start = START + timedelta(seconds=index * 10)
+    end = start + timedelta(seconds=9)
+    return SessionRecord(start.isoformat(), end.isoformat(), 9, "app.exe", "", f"window {index}", "Work", None)
+
+
+def report(label: str, latencies: list[float], extra: str = "") -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{label:<22} p50 {statistics.median(latencies) * 1000:8.3f} ms  p99 {p99 * 1000:8.3f} ms  "
+        f"max {latencies[-1] * 1000:8.1f} ms  {extra}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cost of exporting on the tracker thread with a slow sink.")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--sink-ms", type=float, default=50.0, help="time the sink takes per write")
+    parser.add_argument("--queue", type=int, default=100)
+    args = parser.parse_args()
+    delay = args.sink_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.db"
+        db = Database(path)
+        db.initialize()
+        records = [record(index) for index in range(args.sessions)]
+        # Started before the sessions exist, so all of them are due.
+        sink = SlowSink(delay)
+        exporter = SessionExporter(sink, path, queue_size=args.queue)
+        db.add_sessions(records)
+        ids = [row[0] for row in db.select(SessionQuery(columns=("session_id",), order_by=("session_id",)))]
+
+        # Writing to the sink where the session closes: every close waits.
+        inline = SlowSink(delay)
+        latencies = []
+        for item in records[:50]:
+            began = time.perf_counter()
+            inline.write([item])
+            latencies.append(time.perf_counter() - began)
+        report("inline write", latencies, "(first 50 sessions)")
+
+        exporter.start()
+        latencies = []
+        for session_id, item in zip(ids, records):
+            began = time.perf_counter()
+            exporter.submit(session_id, item)
+            latencies.append(time.perf_counter() - began)
+        report("queued submit", latencies, f"dropped {exporter.dropped}")
+        began = time.perf_counter()
+        while exporter.exported < len(records) and time.perf_counter() - began < 120:
+            time.sleep(0.01)
+        exporter.stop()
+        print(f"sink received {sink.received}/{len(records)} after catch-up in {time.perf_counter() - began:.2f}s")
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.importer import import_sessions
+from where_did_my_time_go.storage import Database, SessionRecord
+
+
+def synthetic_records(count: int) -> list[SessionRecord]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    records = []
+    for index in range(count):
+        begin = start + timedelta(seconds=index * 30)
+        records.append(
+            SessionRecord(
+                start_ts=begin.isoformat(),
+                end_ts=(begin + timedelta(seconds=25)).isoformat(),
+                duration_sec=25,
+                process_name=f"app{index % 120}.exe",
+                exe_path=f"C:\\Program Files\\app{index % 120}.exe",
+                window_title=f"Document {index % 4000} - editor",
+                category="Other",
+                intent_tag=None,
+            )
+        )
+    return records
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure bulk import throughput.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    records = synthetic_records(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        db.initialize()
+
+        began = time.perf_counter()
+        result = import_sessions(db, records)
+        elapsed = time.perf_counter() - began
+        print(f"fresh import:     {result.inserted} rows in {elapsed:.2f}s = {result.inserted / elapsed:,.0f} rows/s")
+
+        began = time.perf_counter()
+        result = import_sessions(db, records)
+        elapsed = time.perf_counter() - began
+        print(f"duplicate import: {result.skipped} skipped in {elapsed:.2f}s = {result.read / elapsed:,.0f} rows/s")
+
+        # A CSV in arbitrary order: every chunk spans the whole history.
+        shuffled = records[:]
+        random.Random(0).shuffle(shuffled)
+        began = time.perf_counter()
+        result = import_sessions(db, shuffled)
+        elapsed = time.perf_counter() - began
+        print(f"shuffled dupes:   {result.skipped} skipped in {elapsed:.2f}s = {result.read / elapsed:,.0f} rows/s")
+
+        began = time.perf_counter()
+        result = import_sessions(db, records, reclassify_with_rules=True)
+        elapsed = time.perf_counter() - began
+        print(f"with reclassify:  {result.read} rows in {elapsed:.2f}s = {result.read / elapsed:,.0f} rows/s")
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench_analytics import build_database
+
+from where_did_my_time_go.rollup import aggregate_many
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time team rollups over many synthetic databases.")
+    parser.add_argument("--databases", type=int, default=32)
+    parser.add_argument("--sessions", type=int, default=50_000, help="sessions per database")
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for index in range(args.databases):
+            path = Path(tmp) / f"user{index}.db"
+            build_database(path, args.sessions, args.days)
+            paths.append(path)
+        start_ts = datetime(2023, 1, 1, tzinfo=timezone.utc).isoformat()
+        end_ts = datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat()
+
+        cpu_count = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1)))
+        baseline = None
+        print(f"{args.databases} databases x {args.sessions} sessions")
+        for workers in worker_counts:
+            began = time.perf_counter()
+            result = aggregate_many(paths, start_ts, end_ts, workers=workers)
+            elapsed = time.perf_counter() - began
+            baseline = baseline or elapsed
+            print(
+                f"workers={workers:<3} {elapsed * 1000:8.1f} ms  "
+                f"speedup {baseline / elapsed:4.1f}x  sessions={result.sessions}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
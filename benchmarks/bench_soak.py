@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from where_did_my_time_go.simulation import SOAK_START, Soak, accounting_errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the tracker over simulated hours and report resource use.")
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--mode", choices=("sessions", "events"), default="sessions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", action="store_true", help="measure allocations with tracemalloc (slower)")
+    parser.add_argument("--dir", help="where to put the database; a tmpfs such as /dev/shm skips fsync cost")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        if args.trace:
+            tracemalloc.start()
+        soak = Soak(Path(tmp) / "soak.db", args.mode, args.seed, trace=args.trace)
+        print(f"{'hour':>4} {'RSS MiB':>8} {'blocks':>9} {'alloc KiB/tick':>14} {'CPU us/tick':>11} {'rows':>6} {'DB KiB':>8}")
+        for hour in range(1, args.hours + 1):
+            sample = soak.run_hour()
+            rss = f"{sample.rss_bytes / 2**20:8.1f}" if sample.rss_bytes else f"{'-':>8}"
+            rate = f"{sample.allocated / sample.ticks / 1024:14.2f}" if args.trace else f"{'-':>14}"
+            print(
+                f"{hour:>4} {rss} {sample.blocks:9d} {rate} {sample.cpu_per_tick * 1e6:11.0f}"
+                f" {sample.rows:6d} {sample.db_bytes / 1024:8.0f}"
+            )
+        end_ts = soak.finish()
+        errors = accounting_errors(soak.sessions(), SOAK_START.isoformat(), end_ts)
+        soak.db.close()
+    print(f"{soak.transitions} focus/idle transitions; accounting: {'; '.join(errors[:5]) or 'ok'}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
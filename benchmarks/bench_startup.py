@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Seconds; --check fails when the median of a measurement exceeds its budget.
+BUDGETS = {
+    "cli_import": 0.25,
+    "app_import": 1.0,
+    "first_paint": 2.0,
+}
+
+_IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+_FIRST_PAINT_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+from pathlib import Path
+
+from where_did_my_time_go import storage
+storage.DB_PATH = Path({db_path!r})
+
+from PySide6.QtCore import QEvent, QObject, QTimer
+from PySide6.QtWidgets import QApplication
+
+from where_did_my_time_go.app import MainWindow
+from where_did_my_time_go.settings import SettingsStore
+
+app = QApplication(sys.argv)
+settings = SettingsStore()
+settings.load()
+window = MainWindow(settings)
+
+
+class PaintWatcher(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            print(time.perf_counter() - start)
+            QTimer.singleShot(0, app.quit)
+            obj.removeEventFilter(self)
+        return False
+
+
+watcher = PaintWatcher()
+window.installEventFilter(watcher)
+window.show()
+QTimer.singleShot(10000, app.quit)
+app.exec()
+"""
+
+
+def _run(script: str) -> float:
+    env = dict(os.environ)
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _median(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def measure(repeat: int = 5, include_gui: bool = True) -> dict[str, float]:
+    results = {
+        "cli_import": _median(
+            [_run(_IMPORT_SCRIPT.format(module="where_did_my_time_go.cli")) for _ in range(repeat)]
+        )
+    }
+    if include_gui:
+        results["app_import"] = _median(
+            [_run(_IMPORT_SCRIPT.format(module="where_did_my_time_go.app")) for _ in range(repeat)]
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "data.db")
+            results["first_paint"] = _median(
+                [_run(_FIRST_PAINT_SCRIPT.format(db_path=db_path)) for _ in range(repeat)]
+            )
+    return results
+
+
+def over_budget(results: dict[str, float]) -> dict[str, float]:
+    return {name: value for name, value in results.items() if value > BUDGETS[name]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-paint.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-gui", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit 1 when a budget is exceeded")
+    args = parser.parse_args()
+
+    results = measure(args.repeat, include_gui=not args.no_gui)
+    print(json.dumps({name: round(value, 4) for name, value in results.items()}, indent=2))
+    failures = over_budget(results)
+    for name, value in failures.items():
+        print(f"{name}: {value:.3f}s exceeds budget {BUDGETS[name]:.3f}s", file=sys.stderr)
+    return 1 if args.check and failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.storage import Database, SessionRecord
+from where_did_my_time_go.suggestions import SuggestionEngine
+
+SITES = ["Jira", "GitHub", "Reddit", "YouTube", "Confluence", "Gmail", "Figma", "Notion", "Slack", "Stack Overflow"]
+
+
+def synthetic_records(count: int, start: datetime, seed: int = 0) -> list[SessionRecord]:
+    rng = random.Random(seed)
+    records = []
+    for index in range(count):
+        begin = start + timedelta(seconds=index * 40)
+        process = rng.choice(["chrome.exe", "firefox.exe", "code.exe", "explorer.exe", f"tool{index % 50}.exe"])
+        title = f"({rng.randint(1, 9)}) Item {rng.randint(0, 50_000)} - {rng.choice(SITES)} - {process[:-4]}"
+        records.append(
+            SessionRecord(
+                start_ts=begin.isoformat(),
+                end_ts=(begin + timedelta(seconds=35)).isoformat(),
+                duration_sec=35,
+                process_name=process,
+                exe_path="",
+                window_title=title,
+                category="Other" if rng.random() < 0.7 else "Work",
+                intent_tag=None,
+            )
+        )
+    return records
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure suggestion scans on a large history.")
+    parser.add_argument("--rows", type=int, default=300_000)
+    args = parser.parse_args()
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        db.initialize()
+        db.add_sessions(synthetic_records(args.rows, start))
+        engine = SuggestionEngine(db)
+
+        began = time.perf_counter()
+        scanned = engine.scan()
+        elapsed = time.perf_counter() - began
+        print(f"first scan:    {scanned:,} sessions in {elapsed:.2f}s = {scanned / elapsed:,.0f} sessions/s")
+
+        db.add_sessions(synthetic_records(1000, start + timedelta(days=365), seed=1))
+        began = time.perf_counter()
+        scanned = engine.scan()
+        print(f"repeat scan:   {scanned:,} new sessions in {(time.perf_counter() - began) * 1000:.1f} ms")
+
+        began = time.perf_counter()
+        suggestions = engine.suggestions([], limit=15)
+        print(f"suggestions:   {len(suggestions)} in {(time.perf_counter() - began) * 1000:.1f} ms")
+        for suggestion in suggestions[:5]:
+            rule = suggestion.rule
+            print(f"  {rule.process_pattern or '*':<14} {rule.title_pattern or '':<12} {suggestion.share:6.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from where_did_my_time_go.storage import Database, SessionRecord  # noqa: E402
+from where_did_my_time_go.timeline import DAY, HOUR, TimelineIndex  # noqa: E402
+from where_did_my_time_go.timeline_ui import LANE_LABEL_WIDTH, TimelineCanvas  # noqa: E402
+
+CATEGORIES = ["Work", "Communication", "Browsing", "Video", "Games", "Other", "Idle"]
+WIDTH = 1200
+ZOOMS = {"hour": HOUR, "day": DAY, "week": 7 * DAY, "month": 30 * DAY, "quarter": 90 * DAY}
+
+
+def synthetic_records(days: int, start: datetime, seed: int = 0) -> list[SessionRecord]:
+    # Eight to sixteen tracked hours a day, switching every few seconds to minutes.
+    rng = random.Random(seed)
+    records = []
+    for day in range(days):
+        moment = start + timedelta(days=day, hours=8)
+        day_end = moment + timedelta(hours=rng.randint(8, 16))
+        while moment < day_end:
+            seconds = int(rng.expovariate(1 / 90)) + 1
+            category = rng.choice(CATEGORIES)
+            records.append(
+                SessionRecord(
+                    start_ts=moment.isoformat(),
+                    end_ts=(moment + timedelta(seconds=seconds)).isoformat(),
+                    duration_sec=seconds,
+                    process_name=f"{category.lower()}{rng.randint(0, 20)}.exe",
+                    exe_path="",
+                    window_title=f"Window {rng.randint(0, 500)}",
+                    category=category,
+                    intent_tag=None,
+                )
+            )
+            moment += timedelta(seconds=seconds)
+    return records
+
+
+def timed(action) -> tuple[float, object]:
+    began = time.perf_counter()
+    result = action()
+    return (time.perf_counter() - began) * 1000, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure timeline fetch and paint times on months of data.")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--pans", type=int, default=50)
+    args = parser.parse_args()
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = int((start + timedelta(days=args.days)).timestamp())
+    records = synthetic_records(args.days, start)
+    QApplication([])
+    canvas = TimelineCanvas()
+    canvas.resize(WIDTH + LANE_LABEL_WIDTH, 400)
+    canvas.show()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        db.initialize()
+        db.add_sessions(records)
+        print(f"{len(records):,} sessions over {args.days} days, {WIDTH} px wide")
+        index = TimelineIndex(db, clock=lambda: end + DAY)
+        for name, span in ZOOMS.items():
+            view_start = end - span
+            cold, viewport = timed(lambda: index.fetch(view_start, end, WIDTH))
+            warm, viewport = timed(lambda: index.fetch(view_start, end, WIDTH))
+            # Panning by a tenth of the view per step.
+            pans = []
+            for step in range(args.pans):
+                shift = span // 10 * (step % 10)
+                pans.append(timed(lambda: index.fetch(view_start - shift, end - shift, WIDTH))[0])
+            canvas.view_start, canvas.view_end = view_start, end
+            canvas.set_viewport(viewport)
+            paint, _ = timed(canvas.grab)
+            # A drag step repaints the same data shifted by a few pixels.
+            canvas.view_start += span // 100
+            canvas.view_end += span // 100
+            drag, _ = timed(canvas.grab)
+            level = {0: "raw", 60: "minute", 3600: "hour"}[viewport.resolution]
+            print(
+                f"{name:<8} {level:<6} {len(viewport.items):>7,} items   cold {cold:8.1f} ms   "
+                f"warm {warm:6.1f} ms   pan max {max(pans):6.1f} ms   paint {paint:6.1f} ms   drag {drag:6.1f} ms"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
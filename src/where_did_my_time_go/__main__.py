@@ -1,14 +1,28 @@
+import multiprocessing
 import sys
 
-from PySide6.QtWidgets import QApplication
+from where_did_my_time_go.cli import COMMANDS, run
 
-from where_did_my_time_go.app import MainWindow
-from where_did_my_time_go.settings import SettingsStore
-from where_did_my_time_go.tracker import TrackerController
-from where_did_my_time_go.tray import TrayController
 
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS + ("-h", "--help"):
+        return run(argv)
+    return run_gui(start_minimized="--minimized" in argv, attach="--attach" in argv)
 
-def main() -> int:
+
+def run_gui(start_minimized: bool = False, attach: bool = False) -> int:
+    from PySide6.QtWidgets import QApplication
+
+    from where_did_my_time_go.app import MainWindow
+    from where_did_my_time_go.metrics import SnapshotWriter
+    from where_did_my_time_go.profiling import profiler, start_from_environment
+    from where_did_my_time_go.settings import SettingsStore
+    from where_did_my_time_go.storage import APP_DIR
+    from where_did_my_time_go.tracker import RemoteTrackerController, TrackerController
+    from where_did_my_time_go.tray import TrayController
+
+    start_from_environment()
     app = QApplication(sys.argv)
     app.setApplicationName("Where Did My Time Go?")
 
@@ -16,19 +30,53 @@ def main() -> int:
     settings.load()
 
     main_window = MainWindow(settings)
-    tracker = TrackerController(settings)
-    tray = TrayController(app, main_window, tracker, settings)
+    if attach:
+        from where_did_my_time_go.daemon import ensure_daemon
+
+        # Tracking lives in the headless daemon; this process is only the UI.
+        tracker = RemoteTrackerController(ensure_daemon())
+        backups = None
+        api, api_error = None, ""
+        exports = None
+    else:
+        from where_did_my_time_go.backup import BackupScheduler
+        from where_did_my_time_go.exporter import ExportHub
+        from where_did_my_time_go.query_server import core_status, start_server
+
+        tracker = TrackerController(settings)
+        # Whichever process tracks also takes the backups.
+        backups = BackupScheduler(settings)
+        backups.start()
+        api, api_error = start_server(settings.current.api_port, core_status(tracker.worker.core))
+        exports = ExportHub(settings.current.export_sinks)
+        tracker.worker.core.on_session_closed = exports.submit
+        exports.start()
+    tray = TrayController(app, main_window, tracker, settings, backups, api_error, exports)
 
     tracker.worker.session_updated.connect(main_window.refresh_views)
 
+    snapshot_writer = SnapshotWriter(APP_DIR / "metrics.json")
+    snapshot_writer.start()
+
     tracker.start()
-    main_window.show()
+    if not (start_minimized or settings.current.start_minimized):
+        main_window.show()
     tray.show()
 
     exit_code = app.exec()
     tracker.stop()
+    if backups is not None:
+        backups.stop()
+    if api is not None:
+        api.stop()
+    if exports is not None:
+        exports.stop()
+    snapshot_writer.stop()
+    profiler.stop()
     return exit_code
 
 
 if __name__ == "__main__":
+    # Needed by the rollup worker pool in frozen (PyInstaller) builds.
+    multiprocessing.freeze_support()
     raise SystemExit(main())
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Sequence, Union
+
+import numpy as np
+
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.storage import Database
+
+SPAN_COLUMNS = ("start_epoch", "end_epoch", "category", "process_name")
+
+HOUR = 3600
+DAY = 86400
+# 1970-01-01 was a Thursday; shifting by 3 makes Monday weekday 0.
+_EPOCH_WEEKDAY_SHIFT = 3
+# A single offset in seconds, or one per session.
+Offset = Union[int, np.ndarray]
+
+
+def local_offset(timestamp: int) -> int:
+    return time.localtime(timestamp).tm_gmtoff
+
+
+# UTC offset in effect at each timestamp, so ranges spanning a DST change
+# bucket both sides correctly. offset_at is sampled hourly and transitions
+# are bisected to the second, which keeps calls in the thousands per year.
+def utc_offsets(
+    timestamps: np.ndarray, offset_at: Callable[[int], int] = local_offset
+) -> np.ndarray:
+    if not len(timestamps):
+        return np.zeros(0, dtype=np.int64)
+    first = int(timestamps.min()) // HOUR * HOUR
+    last = int(timestamps.max()) // HOUR * HOUR + HOUR
+    breaks = [first]
+    offsets = [offset_at(first)]
+    for hour in range(first + HOUR, last + 1, HOUR):
+        value = offset_at(hour)
+        if value == offsets[-1]:
+            continue
+        low, high = hour - HOUR, hour
+        while high - low > 1:
+            middle = (low + high) // 2
+            if offset_at(middle) == offsets[-1]:
+                low = middle
+            else:
+                high = middle
+        breaks.append(high)
+        offsets.append(value)
+    position = np.searchsorted(np.asarray(breaks, dtype=np.int64), timestamps, side="right") - 1
+    return np.asarray(offsets, dtype=np.int64)[np.maximum(position, 0)]
+
+
+@dataclass
+class SessionColumns:
+    start: np.ndarray
+    end: np.ndarray
+    category_codes: np.ndarray
+    categories: list[str]
+    process_codes: np.ndarray
+    processes: list[str]
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def without_categories(self, excluded: Sequence[str]) -> SessionColumns:
+        codes = [self.categories.index(name) for name in excluded if name in self.categories]
+        if not codes:
+            return self
+        mask = ~np.isin(self.category_codes, codes)
+        return SessionColumns(
+            start=self.start[mask],
+            end=self.end[mask],
+            category_codes=self.category_codes[mask],
+            categories=self.categories,
+            process_codes=self.process_codes[mask],
+            processes=self.processes,
+        )
+
+
+def load_columns(db: Database, start_ts: str, end_ts: str) -> SessionColumns:
+    rows = db.select(SessionQuery(start_ts, end_ts, columns=SPAN_COLUMNS))
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return SessionColumns(empty, empty, empty.astype(np.int32), [], empty.astype(np.int32), [])
+    starts, ends, categories, processes = zip(*rows)
+    category_names, category_codes = _encode(categories)
+    process_names, process_codes = _encode(processes)
+    return SessionColumns(
+        start=np.asarray(starts, dtype=np.int64),
+        end=np.asarray(ends, dtype=np.int64),
+        category_codes=category_codes,
+        categories=category_names,
+        process_codes=process_codes,
+        processes=process_names,
+    )
+
+
+def _encode(values: Sequence[str]) -> tuple[list[str], np.ndarray]:
+    lookup: dict[str, int] = {}
+    codes = np.fromiter(
+        (lookup.setdefault(value, len(lookup)) for value in values), dtype=np.int32, count=len(values)
+    )
+    # Re-number so codes follow sorted names, which keeps output order stable.
+    names = sorted(lookup)
+    remap = np.empty(len(names), dtype=np.int32)
+    for new_code, name in enumerate(names):
+        remap[lookup[name]] = new_code
+    return names, remap[codes]
+
+
+# Splits each [start, end) interval at bucket boundaries without a Python
+# loop. Returns (session index, bucket number, seconds in bucket) per piece;
+# bucket numbers count from the epoch shifted by offset_sec (per session when
+# an array, taken at the session's start).
+def split_intervals(
+    start: np.ndarray, end: np.ndarray, bucket_sec: int, offset_sec: Offset = 0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    start = start + offset_sec
+    end = np.maximum(end + offset_sec, start)
+    first = start // bucket_sec
+    last = np.maximum(end - 1, start) // bucket_sec
+    counts = (last - first + 1).astype(np.int64)
+    index = np.repeat(np.arange(len(start)), counts)
+    group_offsets = np.cumsum(counts) - counts
+    step = np.arange(int(counts.sum())) - np.repeat(group_offsets, counts)
+    bucket = first[index] + step
+    piece_start = np.maximum(start[index], bucket * bucket_sec)
+    piece_end = np.minimum(end[index], (bucket + 1) * bucket_sec)
+    return index, bucket, piece_end - piece_start
+
+
+# Seconds per (weekday, hour of day) as a 7x24 array, Monday first.
+def hour_weekday_heatmap(columns: SessionColumns, utc_offset_sec: Offset = 0) -> np.ndarray:
+    _, bucket, seconds = split_intervals(columns.start, columns.end, HOUR, utc_offset_sec)
+    hour_of_day = bucket % 24
+    weekday = (bucket // 24 + _EPOCH_WEEKDAY_SHIFT) % 7
+    flat = np.bincount(weekday * 24 + hour_of_day, weights=seconds, minlength=7 * 24)
+    return flat.reshape(7, 24)
+
+
+def hour_of_day_distribution(columns: SessionColumns, utc_offset_sec: Offset = 0) -> np.ndarray:
+    return hour_weekday_heatmap(columns, utc_offset_sec).sum(axis=0)
+
+
+# Returns (day numbers since the epoch, seconds shaped [category, day]).
+def category_trends(
+    columns: SessionColumns, utc_offset_sec: Offset = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    if not len(columns):
+        return np.zeros(0, dtype=np.int64), np.zeros((len(columns.categories), 0))
+    index, bucket, seconds = split_intervals(columns.start, columns.end, DAY, utc_offset_sec)
+    first_day = int(bucket.min())
+    day_count = int(bucket.max()) - first_day + 1
+    flat = (columns.category_codes[index].astype(np.int64) * day_count) + (bucket - first_day)
+    totals = np.bincount(flat, weights=seconds, minlength=len(columns.categories) * day_count)
+    return np.arange(first_day, first_day + day_count), totals.reshape(len(columns.categories), day_count)
+
+
+# Returns (day numbers since the epoch, app switches per active hour).
+def context_switch_rate(columns: SessionColumns, utc_offset_sec: Offset = 0) -> tuple[np.ndarray, np.ndarray]:
+    if len(columns) < 2:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    order = np.argsort(columns.start, kind="stable")
+    processes = columns.process_codes[order]
+    switched = processes[1:] != processes[:-1]
+    local_start = columns.start + utc_offset_sec
+    switch_days = local_start[order][1:][switched] // DAY
+
+    _, bucket, seconds = split_intervals(columns.start, columns.end, DAY, utc_offset_sec)
+    first_day = int(bucket.min())
+    day_count = int(bucket.max()) - first_day + 1
+    active_hours = np.bincount(bucket - first_day, weights=seconds, minlength=day_count) / HOUR
+    switches = np.bincount(switch_days - first_day, minlength=day_count)[:day_count]
+    rate = np.divide(switches, active_hours, out=np.zeros(day_count), where=active_hours > 0)
+    return np.arange(first_day, first_day + day_count), rate
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from typing import Callable
+
 from PySide6.QtCore import QTimer
-from PySide6.QtGui import QCloseEvent, QIcon
+from PySide6.QtGui import QCloseEvent, QHideEvent, QIcon, QShowEvent
 from PySide6.QtWidgets import (
     QDialog,
     QLabel,
@@ -12,12 +14,9 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from where_did_my_time_go.dashboard import DashboardWidget
-from where_did_my_time_go.reports import ReportsWidget
-from where_did_my_time_go.rules_ui import RulesWidget
+from where_did_my_time_go.metrics import registry as metrics
+from where_did_my_time_go.profiling import profiler
 from where_did_my_time_go.settings import SettingsStore
-from where_did_my_time_go.settings_ui import SettingsWidget
-from where_did_my_time_go.storage import Database
 from where_did_my_time_go.utils import optional_icon
 
 
@@ -46,28 +45,106 @@ class IntentDialog(QDialog):
         self.accept()
 
 
+class LazyTab(QWidget):
+    def __init__(self, name: str, factory: Callable[[], QWidget]) -> None:
+        super().__init__()
+        self._name = name
+        self._factory = factory
+        self.widget: QWidget | None = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def ensure_built(self) -> QWidget:
+        if self.widget is None:
+            self.widget = self._factory()
+            self._layout.addWidget(self.widget)
+        return self.widget
+
+    def refresh(self) -> None:
+        refresh = getattr(self.widget, "refresh", None)
+        if refresh is not None:
+            with metrics.timer(f"ui.refresh.{self._name}"), profiler.section(f"ui.{self._name}"):
+                refresh()
+
+    def release(self) -> None:
+        # Drops the tab's rows and chart data but keeps its widgets and
+        # filters, so showing it again is just a refresh.
+        release = getattr(self.widget, "release", None)
+        if release is not None:
+            release()
+
+
+def _build_dashboard() -> QWidget:
+    from where_did_my_time_go.dashboard import DashboardWidget
+
+    return DashboardWidget()
+
+
+def _build_reports() -> QWidget:
+    from where_did_my_time_go.reports import ReportsWidget
+
+    return ReportsWidget()
+
+
+def _build_trends() -> QWidget:
+    from where_did_my_time_go.trends_ui import TrendsWidget
+
+    return TrendsWidget()
+
+
+def _build_timeline() -> QWidget:
+    from where_did_my_time_go.timeline_ui import TimelineWidget
+
+    return TimelineWidget()
+
+
+def _build_rules() -> QWidget:
+    from where_did_my_time_go.rules_ui import RulesWidget
+
+    return RulesWidget()
+
+
+def _build_settings(settings: SettingsStore) -> QWidget:
+    from where_did_my_time_go.settings_ui import SettingsWidget
+
+    return SettingsWidget(settings)
+
+
+def _build_diagnostics() -> QWidget:
+    from where_did_my_time_go.diagnostics_ui import DiagnosticsWidget
+
+    return DiagnosticsWidget()
+
+
 class MainWindow(QMainWindow):
     def __init__(self, settings: SettingsStore) -> None:
         super().__init__()
         self._settings = settings
-        self._db = Database()
-        self._db.initialize()
         self._allow_close = False
         self.setWindowTitle("Where Did My Time Go?")
         icon_path = optional_icon("icon.ico")
         if icon_path:
             self.setWindowIcon(QIcon(icon_path))
 
+        # Tabs are only constructed (and their chart modules imported) the
+        # first time they are shown, so a start minimized to tray builds none.
         self.tabs = QTabWidget()
-        self.dashboard = DashboardWidget()
-        self.reports = ReportsWidget()
-        self.rules = RulesWidget()
-        self.settings_widget = SettingsWidget(settings)
+        self.dashboard = LazyTab("dashboard", _build_dashboard)
+        self.reports = LazyTab("reports", _build_reports)
+        self.trends = LazyTab("trends", _build_trends)
+        self.timeline = LazyTab("timeline", _build_timeline)
+        self.rules = LazyTab("rules", _build_rules)
+        self.settings_widget = LazyTab("settings", lambda: _build_settings(settings))
+        self.diagnostics = LazyTab("diagnostics", _build_diagnostics)
 
         self.tabs.addTab(self.dashboard, "Dashboard")
         self.tabs.addTab(self.reports, "Reports")
+        self.tabs.addTab(self.trends, "Trends")
+        self.tabs.addTab(self.timeline, "Timeline")
         self.tabs.addTab(self.rules, "Rules")
         self.tabs.addTab(self.settings_widget, "Settings")
+        self.tabs.addTab(self.diagnostics, "Diagnostics")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
 
         self.setCentralWidget(self.tabs)
 
@@ -76,10 +153,34 @@ class MainWindow(QMainWindow):
         self.refresh_timer.timeout.connect(self.refresh_views)
         self.refresh_timer.start()
 
+    def _current_tab(self) -> LazyTab:
+        return self.tabs.currentWidget()
+
+    def _show_current_tab(self) -> None:
+        tab = self._current_tab()
+        if tab.widget is None:
+            tab.ensure_built()
+        else:
+            tab.refresh()
+
+    def _on_tab_changed(self, _index: int) -> None:
+        if self.isVisible():
+            self._show_current_tab()
+
+    def showEvent(self, event: QShowEvent) -> None:
+        self._show_current_tab()
+        super().showEvent(event)
+
+    def hideEvent(self, event: QHideEvent) -> None:
+        # The window can sit in the tray all day; don't hold report data there.
+        if not event.spontaneous():
+            for index in range(self.tabs.count()):
+                self.tabs.widget(index).release()
+        super().hideEvent(event)
+
     def refresh_views(self) -> None:
-        self.dashboard.refresh()
-        self.reports.refresh()
-        self.rules.refresh()
+        if self.isVisible():
+            self._current_tab().refresh()
 
     def closeEvent(self, event: QCloseEvent) -> None:
         if self._settings.current.close_to_tray and not self._allow_close:
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from where_did_my_time_go.metrics import registry as metrics
+from where_did_my_time_go.settings import SettingsStore
+from where_did_my_time_go.storage import APP_DIR, DB_PATH, Database
+
+BACKUP_DIR = APP_DIR / "backups"
+# 1 MiB per step at the default 4 KiB page size.
+PAGES_PER_STEP = 256
+# Sleep between steps so the copy doesn't hog the disk the tracker writes to.
+STEP_PAUSE_SEC = 0.002
+# Write the copy out as it grows; flushing it all at the end stalls the
+# tracker's own commits behind one large write-back.
+FLUSH_STEPS = 8
+CHECK_INTERVAL_SEC = 60.0
+# Partial copies this old were left by a process that exited mid-backup.
+STALE_PART_SEC = 3600
+
+
+class BackupCancelled(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class BackupResult:
+    # None when the copy failed its integrity check and was not kept.
+    path: Path | None
+    pages: int
+    seconds: float
+    # quick_check findings; ["ok"] when clean, [] when the check was skipped.
+    problems: list[str]
+    removed: list[Path]
+    # Why the backup couldn't be taken at all (disk full, file locked).
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.path is not None
+
+
+def backup_name(at: datetime) -> str:
+    return f"data-{at:%Y%m%d-%H%M%S}.db"
+
+
+def list_backups(directory: Path = BACKUP_DIR) -> list[Path]:
+    # Oldest first; the names sort by time.
+    return sorted(directory.glob("data-*.db"))
+
+
+def rotate(directory: Path, keep: int) -> list[Path]:
+    backups = list_backups(directory)
+    removed = backups[: max(0, len(backups) - keep)]
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
+
+
+def run_backup(
+    db_path: Path = DB_PATH,
+    directory: Path = BACKUP_DIR,
+    keep: int = 7,
+    quick_check: bool = True,
+    pages: int = PAGES_PER_STEP,
+    pause: float = STEP_PAUSE_SEC,
+    should_stop: Callable[[], bool] = lambda: False,
+    now: datetime | None = None,
+) -> BackupResult:
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / backup_name(now or datetime.now())
+    partial = target.with_name(target.name + ".part")
+    partial.unlink(missing_ok=True)
+    for stale in directory.glob("*.part"):
+        if time.time() - stale.stat().st_mtime > STALE_PART_SEC:
+            stale.unlink(missing_ok=True)
+    copied = 0
+    steps = 0
+    flush_fd: int | None = None
+
+    def step(done: int, total: int) -> None:
+        nonlocal copied, steps, flush_fd
+        copied = total
+        if should_stop():
+            raise BackupCancelled
+        steps += 1
+        if steps % FLUSH_STEPS == 0:
+            if flush_fd is None:
+                flush_fd = os.open(partial, os.O_RDWR)
+            os.fsync(flush_fd)
+        if done < total:
+            time.sleep(pause)
+
+    began = time.perf_counter()
+    source = Database(db_path, check_same_thread=False)
+    try:
+        source.backup_to(partial, pages, step)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    finally:
+        if flush_fd is not None:
+            os.close(flush_fd)
+        source.close()
+
+    problems: list[str] = []
+    if quick_check:
+        # The copy holds the same pages as the live file, so checking it finds
+        # the same damage without reading the database the tracker is using.
+        copy = Database(partial, read_only=True)
+        try:
+            problems = copy.quick_check()
+        finally:
+            copy.close()
+        if problems != ["ok"]:
+            # Keep the older, good backups rather than rotating them out.
+            partial.unlink(missing_ok=True)
+            return BackupResult(None, copied, time.perf_counter() - began, problems, [])
+    os.replace(partial, target)
+    removed = rotate(directory, keep)
+    return BackupResult(target, copied, time.perf_counter() - began, problems, removed)
+
+
+# Backs the database up every settings.backup_interval_hours on a background
+# thread. The newest file in the backup directory says when the last one ran,
+# so restarts don't reset the schedule. Failures are left in last_result for
+# the tray to show and counted in metrics; there may be no console to print to.
+class BackupScheduler(threading.Thread):
+    def __init__(
+        self,
+        settings: SettingsStore,
+        db_path: Path = DB_PATH,
+        directory: Path = BACKUP_DIR,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(name="backup", daemon=True)
+        self._settings = settings
+        self._db_path = db_path
+        self._directory = directory
+        self._clock = clock
+        self._stop_event = threading.Event()
+        self.last_result: BackupResult | None = None
+
+    def run(self) -> None:
+        while not self._stop_event.wait(CHECK_INTERVAL_SEC):
+            try:
+                self.run_if_due()
+            except BackupCancelled:
+                return
+            except (sqlite3.Error, OSError) as exc:
+                metrics.increment("backup.failed")
+                self.last_result = BackupResult(None, 0, 0.0, [], [], error=str(exc))
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def due(self) -> bool:
+        interval = self._settings.current.backup_interval_hours * 3600
+        if interval <= 0:
+            return False
+        backups = list_backups(self._directory)
+        return not backups or self._clock() - backups[-1].stat().st_mtime >= interval
+
+    def run_if_due(self) -> BackupResult | None:
+        if not self.due():
+            return None
+        settings = self._settings.current
+        result = run_backup(
+            self._db_path,
+            self._directory,
+            keep=settings.backup_keep,
+            quick_check=settings.backup_quick_check,
+            should_stop=self._stop_event.is_set,
+            now=datetime.fromtimestamp(self._clock()),
+        )
+        if not result.ok:
+            metrics.increment("backup.check_failed")
+        self.last_result = result
+        return result
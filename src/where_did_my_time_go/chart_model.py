@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PySide6.QtCharts import QBarCategoryAxis, QBarSet, QChart, QPieSeries, QValueAxis
+
+OTHER = "Other"
+# Smallest value change worth pushing to Qt; totals are whole seconds.
+_EPSILON = 0.5
+
+
+def top_with_other(totals: dict[str, float], limit: int) -> list[tuple[str, float]]:
+    # The largest `limit - 1` entries plus one "Other" entry for the rest, so
+    # hundreds of apps don't become hundreds of slivers. A real "Other"
+    # category absorbs the tail instead of appearing twice.
+    items = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+    if len(items) <= limit:
+        return items
+    head = items[: limit - 1]
+    rest = sum(value for _, value in items[limit - 1 :])
+    for index, (label, value) in enumerate(head):
+        if label == OTHER:
+            head[index] = (OTHER, value + rest)
+            return head
+    return [*head, (OTHER, rest)]
+
+
+@dataclass(slots=True)
+class SliceChanges:
+    added: list[tuple[str, float]] = field(default_factory=list)
+    updated: list[tuple[str, float]] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    @property
+    def structural(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def diff_slices(shown: dict[str, float], target: list[tuple[str, float]]) -> SliceChanges:
+    changes = SliceChanges()
+    labels = set()
+    for label, value in target:
+        labels.add(label)
+        current = shown.get(label)
+        if current is None:
+            changes.added.append((label, value))
+        elif abs(current - value) >= _EPSILON:
+            changes.updated.append((label, value))
+    changes.removed = [label for label in shown if label not in labels]
+    return changes
+
+
+# Allows a chart animation only when the chart's shape changes and the last
+# one was long enough ago; the 5 s refresh otherwise re-animates every tick.
+class AnimationThrottle:
+    def __init__(self, min_interval_sec: float = 30.0, clock=time.monotonic) -> None:
+        self._min_interval = min_interval_sec
+        self._clock = clock
+        self._last = float("-inf")
+
+    def allow(self, structural: bool) -> bool:
+        if not structural:
+            return False
+        now = self._clock()
+        if now - self._last < self._min_interval:
+            return False
+        self._last = now
+        return True
+
+
+def _set_animated(chart: QChart, animated: bool) -> None:
+    from PySide6.QtCharts import QChart
+
+    options = QChart.SeriesAnimations if animated else QChart.NoAnimation
+    if chart.animationOptions() != options:
+        chart.setAnimationOptions(options)
+
+
+# Keeps a QPieSeries in step with a list of (label, value) by updating slice
+# values in place and only adding or removing the slices that changed.
+class PieChartModel:
+    def __init__(self, chart: QChart, series: QPieSeries, limit: int = 8) -> None:
+        self._chart = chart
+        self._series = series
+        self._limit = limit
+        self._slices: dict[str, object] = {}
+        self._shown: dict[str, float] = {}
+        self._throttle = AnimationThrottle()
+
+    def update(self, totals: dict[str, float]) -> SliceChanges:
+        changes = diff_slices(self._shown, top_with_other(totals, self._limit))
+        if not (changes.structural or changes.updated):
+            return changes
+        _set_animated(self._chart, self._throttle.allow(changes.structural))
+        for label in changes.removed:
+            self._series.remove(self._slices.pop(label))
+            del self._shown[label]
+        for label, value in changes.updated:
+            self._slices[label].setValue(value)
+            self._shown[label] = value
+        for label, value in changes.added:
+            self._slices[label] = self._series.append(label, value)
+            self._shown[label] = value
+        return changes
+
+    def clear(self) -> None:
+        self._series.clear()
+        self._slices.clear()
+        self._shown.clear()
+
+
+# Same for a single-set bar chart over a fixed category axis: values are
+# replaced in place and the axis only changes when the ranking does.
+class BarChartModel:
+    def __init__(
+        self,
+        chart: QChart,
+        bar_set: QBarSet,
+        axis: QBarCategoryAxis,
+        value_axis: QValueAxis,
+        limit: int = 10,
+    ) -> None:
+        self._chart = chart
+        self._bar_set = bar_set
+        self._axis = axis
+        self._value_axis = value_axis
+        self._limit = limit
+        self._labels: list[str] = []
+        self._values: list[float] = []
+        self._throttle = AnimationThrottle()
+
+    def update(self, totals: dict[str, float]) -> bool:
+        top = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[: self._limit]
+        labels = [label for label, _ in top]
+        values = [float(value) for _, value in top]
+        structural = labels != self._labels
+        changed = [
+            index
+            for index, value in enumerate(values)
+            if index >= len(self._values) or abs(self._values[index] - value) >= _EPSILON
+        ]
+        if not structural and not changed:
+            return False
+        _set_animated(self._chart, self._throttle.allow(structural))
+        if structural:
+            self._axis.setCategories(labels)
+            self._labels = labels
+        shared = min(len(values), self._bar_set.count())
+        for index in changed:
+            if index < shared:
+                self._bar_set.replace(index, values[index])
+        if self._bar_set.count() > len(values):
+            self._bar_set.remove(len(values), self._bar_set.count() - len(values))
+        elif self._bar_set.count() < len(values):
+            self._bar_set.append(values[self._bar_set.count() :])
+        self._values = values
+        self._value_axis.setRange(0, max(values, default=0) * 1.05 or 1)
+        return True
+
+    def clear(self) -> None:
+        if self._bar_set.count():
+            self._bar_set.remove(0, self._bar_set.count())
+        self._axis.clear()
+        self._labels = []
+        self._values = []
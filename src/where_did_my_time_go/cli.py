@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Sequence, TextIO
+
+from where_did_my_time_go.query import SESSION_COLUMNS, SessionQuery
+from where_did_my_time_go.ranges import PRESETS, resolve_range
+from where_did_my_time_go.report_cache import ReportCache
+from where_did_my_time_go.storage import DB_PATH, Database
+from where_did_my_time_go.utils import format_duration
+
+COMMANDS = ("report", "top", "export", "stats", "rollup", "import", "rebuild", "suggest", "backup", "daemon")
+FORMATS = ("table", "csv", "json")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="where_did_my_time_go",
+        description="Query tracked usage without starting the desktop app.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report = subparsers.add_parser("report", help="total time per category or app")
+    _add_common_arguments(report, default_format="table")
+    report.add_argument("--by", choices=("category", "app"), default="category")
+
+    top = subparsers.add_parser("top", help="top apps by total time")
+    _add_common_arguments(top, default_format="table")
+    top.add_argument("--limit", type=int, default=10)
+
+    export = subparsers.add_parser("export", help="stream raw sessions")
+    _add_common_arguments(export, default_format="csv")
+    export.add_argument("--category", default="", help="only categories containing this text")
+    export.add_argument("--app", default="", help="only processes containing this text")
+
+    stats = subparsers.add_parser("stats", help="active/idle totals and database stats")
+    _add_common_arguments(stats, default_format="table")
+
+    rollup = subparsers.add_parser("rollup", help="merge totals across many data.db files")
+    _add_common_arguments(rollup, default_format="table", with_db=False)
+    rollup.add_argument("paths", nargs="+", type=Path, help="database files or directories to scan")
+    rollup.add_argument("--by", choices=("category", "app", "day"), default="category")
+    rollup.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+
+    importer = subparsers.add_parser("import", help="merge sessions from a CSV export or another data.db")
+    importer.add_argument("source", type=Path, help="CSV export (*.csv) or SQLite database")
+    importer.add_argument("--db", type=Path, default=None, help=f"database path (default: {DB_PATH})")
+    importer.add_argument("--format", choices=FORMATS, default="table")
+    importer.add_argument("--reclassify", action="store_true", help="recategorize with the current rules")
+
+    rebuilder = subparsers.add_parser("rebuild", help="re-derive sessions from the focus-event log")
+    rebuilder.add_argument("--db", type=Path, default=None, help=f"database path (default: {DB_PATH})")
+    rebuilder.add_argument("--format", choices=FORMATS, default="table")
+    rebuilder.add_argument("--reclassify", action="store_true", help="recategorize with the current rules")
+    rebuilder.add_argument(
+        "--coalesce", type=int, default=0, help="fold focus blips shorter than N seconds into the previous session"
+    )
+
+    suggester = subparsers.add_parser("suggest", help="propose rules for uncategorized time")
+    suggester.add_argument("--db", type=Path, default=None, help=f"database path (default: {DB_PATH})")
+    suggester.add_argument("--format", choices=FORMATS, default="table")
+    suggester.add_argument("--limit", type=int, default=10)
+
+    backup = subparsers.add_parser("backup", help="copy the database while the tracker keeps running")
+    backup.add_argument("--db", type=Path, default=None, help=f"database path (default: {DB_PATH})")
+    backup.add_argument("--dir", type=Path, default=None, help="backup directory (default: backups next to the db)")
+    backup.add_argument("--format", choices=FORMATS, default="table")
+    backup.add_argument("--keep", type=int, default=7, help="newest backups to keep")
+    backup.add_argument("--no-check", action="store_true", help="skip the quick_check of the copy")
+
+    daemon = subparsers.add_parser("daemon", help="run the headless tracker (the UI attaches with --attach)")
+    action = daemon.add_mutually_exclusive_group()
+    action.add_argument("--status", action="store_true", help="show the running daemon's state")
+    action.add_argument("--stop", action="store_true", help="ask the running daemon to exit")
+    return parser
+
+
+def _add_common_arguments(
+    parser: argparse.ArgumentParser, default_format: str, with_db: bool = True
+) -> None:
+    if with_db:
+        parser.add_argument("--db", type=Path, default=None, help=f"database path (default: {DB_PATH})")
+    parser.add_argument("--format", choices=FORMATS, default=default_format)
+    parser.add_argument(
+        "--range",
+        choices=PRESETS,
+        default="today",
+        help="preset range in UTC days (ignored when --days or --start is given)",
+    )
+    parser.add_argument("--days", type=_days, default=None, help="the last N days up to now")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="last day, YYYY-MM-DD (inclusive)")
+
+
+def _days(text: str) -> int:
+    days = int(text)
+    if days < 0:
+        raise argparse.ArgumentTypeError("must be at least 0")
+    return days
+
+
+def _range(args: argparse.Namespace) -> tuple[datetime, datetime]:
+    return resolve_range(args.range, args.days, args.start, args.end)
+
+
+def run(argv: Sequence[str] | None = None, out: TextIO | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    out = out or sys.stdout
+    if args.command == "daemon":
+        return _daemon(args, out)
+    if args.command == "rollup":
+        columns, rows = _rollup(args, *_range(args))
+        write_rows(out, columns, rows, args.format)
+        return 0
+    path = args.db or DB_PATH
+    if args.command != "import" and not path.exists():
+        # Only import may create a database; anything else is a typo.
+        print(f"database not found: {path}", file=sys.stderr)
+        return 2
+    if args.command == "backup":
+        return _backup(path, args, out)
+    db = Database(path)
+    db.initialize()
+    try:
+        if args.command == "import":
+            # Command modules are imported on demand to keep CLI startup lean.
+            from where_did_my_time_go.importer import import_path
+
+            result = import_path(db, args.source, args.reclassify)
+            rows = [
+                {"stat": "read", "value": result.read},
+                {"stat": "inserted", "value": result.inserted},
+                {"stat": "duplicates", "value": result.skipped},
+            ]
+            write_rows(out, ["stat", "value"], rows, args.format)
+            return 0
+        if args.command == "rebuild":
+            from where_did_my_time_go.eventlog import rebuild
+            from where_did_my_time_go.rules import Rule
+
+            rules = [Rule(**dict(row)) for row in db.list_rules()] if args.reclassify else None
+            sessions = rebuild(db, rules, args.coalesce)
+            write_rows(out, ["stat", "value"], [{"stat": "sessions", "value": sessions}], args.format)
+            return 0
+        if args.command == "suggest":
+            columns, rows = _suggest(db, args)
+            write_rows(out, columns, rows, args.format)
+            return 0
+        start, end = _range(args)
+        handler = _HANDLERS[args.command]
+        columns, rows = handler(db, args, start, end)
+        write_rows(out, columns, rows, args.format)
+    finally:
+        db.close()
+    return 0
+
+
+def _report(db: Database, args: argparse.Namespace, start: datetime, end: datetime):
+    totals = ReportCache(db).totals(start, end)
+    grouped = totals.by_category() if args.by == "category" else totals.by_app()
+    key = "category" if args.by == "category" else "process_name"
+    rows = (
+        {key: name, "total_sec": total, "duration": format_duration(total)}
+        for name, total in sorted(grouped.items(), key=lambda item: item[1], reverse=True)
+    )
+    return [key, "total_sec", "duration"], rows
+
+
+def _top(db: Database, args: argparse.Namespace, start: datetime, end: datetime):
+    query = SessionQuery(
+        start.isoformat(),
+        end.isoformat(),
+        group_by=("process_name",),
+        order_by=("-total",),
+        limit=args.limit,
+    )
+    rows = (
+        {"process_name": process_name, "total_sec": int(total), "duration": format_duration(int(total))}
+        for process_name, total, _ in db.iter_select(query)
+    )
+    return ["process_name", "total_sec", "duration"], rows
+
+
+def _export(db: Database, args: argparse.Namespace, start: datetime, end: datetime):
+    query = SessionQuery(
+        start.isoformat(),
+        end.isoformat(),
+        category_like=args.category,
+        process_like=args.app,
+        order_by=("start_ts",),
+    )
+    rows = (dict(zip(SESSION_COLUMNS, row)) for row in db.iter_select(query))
+    return SESSION_COLUMNS, rows
+
+
+def _stats(db: Database, args: argparse.Namespace, start: datetime, end: datetime):
+    start_ts, end_ts = start.isoformat(), end.isoformat()
+    query = SessionQuery(start_ts, end_ts, group_by=("category",))
+    totals, sessions = {}, 0
+    for category, total, count in db.iter_select(query):
+        totals[category] = int(total)
+        sessions += count
+    idle = totals.pop("Idle", 0)
+    active = sum(totals.values())
+    first = db.select(SessionQuery(start_ts, end_ts, columns=("start_ts",), order_by=("start_ts",), limit=1))
+    last = db.select(SessionQuery(start_ts, end_ts, columns=("end_ts",), order_by=("-end_ts",), limit=1))
+    values = [
+        ("range_start", start_ts),
+        ("range_end", end_ts),
+        ("active", format_duration(active)),
+        ("active_sec", active),
+        ("idle", format_duration(idle)),
+        ("idle_sec", idle),
+        ("sessions", sessions),
+        ("first_start", first[0][0] if first else ""),
+        ("last_end", last[0][0] if last else ""),
+        ("data_version", db.data_version()),
+    ]
+    return ["stat", "value"], ({"stat": name, "value": value} for name, value in values)
+
+
+def _rollup(args: argparse.Namespace, start: datetime, end: datetime):
+    paths = []
+    for path in args.paths:
+        paths.extend(sorted(path.rglob("*.db")) if path.is_dir() else [path])
+    from where_did_my_time_go.rollup import aggregate_many
+
+    result = aggregate_many(paths, start.isoformat(), end.isoformat(), args.workers)
+    for path, error in result.errors:
+        print(f"skipped {path}: {error}", file=sys.stderr)
+    if args.by == "day":
+        rows = (
+            {"day": day, "category": category, "total_sec": total, "duration": format_duration(total)}
+            for (day, category), total in sorted(result.by_day.items())
+        )
+        return ["day", "category", "total_sec", "duration"], rows
+    grouped = result.by_category if args.by == "category" else result.by_app
+    key = "category" if args.by == "category" else "process_name"
+    rows = (
+        {key: name, "total_sec": total, "duration": format_duration(total)}
+        for name, total in sorted(grouped.items(), key=lambda item: item[1], reverse=True)
+    )
+    return [key, "total_sec", "duration"], rows
+
+
+def _suggest(db: Database, args: argparse.Namespace):
+    from where_did_my_time_go.rules import Rule
+    from where_did_my_time_go.suggestions import SuggestionEngine
+
+    engine = SuggestionEngine(db)
+    engine.scan()
+    rules = [Rule(**dict(row)) for row in db.list_rules()]
+    rows = (
+        {
+            "process_pattern": suggestion.rule.process_pattern or "",
+            "title_pattern": suggestion.rule.title_pattern or "",
+            "total_sec": suggestion.seconds,
+            "duration": format_duration(suggestion.seconds),
+            "share": round(suggestion.share, 3),
+            "sessions": suggestion.sessions,
+            "example": suggestion.example,
+        }
+        for suggestion in engine.suggestions(rules, args.limit)
+    )
+    columns = ["process_pattern", "title_pattern", "total_sec", "duration", "share", "sessions", "example"]
+    return columns, rows
+
+
+def _backup(path: Path, args: argparse.Namespace, out: TextIO) -> int:
+    from where_did_my_time_go.backup import run_backup
+
+    result = run_backup(path, args.dir or path.parent / "backups", max(1, args.keep), not args.no_check)
+    rows = [
+        {"stat": "path", "value": str(result.path or "")},
+        {"stat": "pages", "value": result.pages},
+        {"stat": "seconds", "value": round(result.seconds, 3)},
+        {"stat": "check", "value": "; ".join(result.problems) or "skipped"},
+        {"stat": "removed", "value": len(result.removed)},
+    ]
+    write_rows(out, ["stat", "value"], rows, args.format)
+    return 0 if result.ok else 1
+
+
+def _daemon(args: argparse.Namespace, out: TextIO) -> int:
+    from where_did_my_time_go.daemon import DaemonClient, run_daemon
+
+    if not (args.status or args.stop):
+        return run_daemon()
+    client = DaemonClient.connect()
+    if client is None:
+        print("tracker daemon is not running", file=sys.stderr)
+        return 1
+    try:
+        if args.stop:
+            client.send("stop")
+            return 0
+        _, status, session, pid = client.request("status")
+    finally:
+        client.close()
+    rows = [{"stat": "pid", "value": pid}, {"stat": "status", "value": status}]
+    if session:
+        rows += [{"stat": key, "value": value} for key, value in session.items()]
+    write_rows(out, ["stat", "value"], rows, "table")
+    return 0
+
+
+_HANDLERS = {
+    "report": _report,
+    "top": _top,
+    "export": _export,
+    "stats": _stats,
+}
+
+
+def write_rows(out: TextIO, columns: list[str], rows: Iterable[dict], fmt: str) -> None:
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+    elif fmt == "json":
+        out.write("[")
+        for index, row in enumerate(rows):
+            out.write(",\n " if index else "\n ")
+            out.write(json.dumps(row, ensure_ascii=False))
+        out.write("\n]\n")
+    else:
+        materialized = [[_cell(row[column]) for column in columns] for row in rows]
+        widths = [len(column) for column in columns]
+        for values in materialized:
+            widths = [max(width, len(value)) for width, value in zip(widths, values)]
+        out.write("  ".join(column.ljust(width) for column, width in zip(columns, widths)).rstrip() + "\n")
+        for values in materialized:
+            out.write("  ".join(value.ljust(width) for value, width in zip(values, widths)).rstrip() + "\n")
+
+
+def _cell(value) -> str:
+    return "" if value is None else str(value)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+# A tick whose wall time moves this much more or less than the monotonic
+# clock did saw the wall clock stepped (NTP correction, manual change).
+# NTP slewing stays far below it.
+JUMP_TOLERANCE_SEC = 2.0
+
+
+class SystemClock:
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def boottime(self) -> float:
+        # Monotonic, but counting time spent suspended, which monotonic()
+        # skips on Linux. Elsewhere a suspend the clock misses shows up as a
+        # forward wall-clock step instead and is split the same way.
+        if hasattr(time, "CLOCK_BOOTTIME"):
+            return time.clock_gettime(time.CLOCK_BOOTTIME)
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+# Time that only moves when slept on, so soak runs and tests can put the
+# tracker through simulated hours in moments. suspend() and step_wall()
+# inject the faults real clocks have.
+class VirtualClock(SystemClock):
+    def __init__(self, start: datetime) -> None:
+        self._start = start
+        self._elapsed = 0.0
+        self._suspended = 0.0
+        self._wall_offset = 0.0
+
+    def now(self) -> datetime:
+        return self._start + timedelta(seconds=self._elapsed + self._wall_offset)
+
+    def monotonic(self) -> float:
+        return self._elapsed - self._suspended
+
+    def boottime(self) -> float:
+        return self._elapsed
+
+    def sleep(self, seconds: float) -> None:
+        self._elapsed += seconds
+
+    def suspend(self, seconds: float) -> None:
+        # Like Linux: wall and boot time move on, monotonic() doesn't.
+        self._elapsed += seconds
+        self._suspended += seconds
+
+    def step_wall(self, seconds: float) -> None:
+        self._wall_offset += seconds
+
+
+@dataclass(slots=True)
+class Tick:
+    # Wall time the tick is accounted at.
+    now: datetime
+    # Real seconds since the previous tick, time suspended included.
+    elapsed: float
+    # The part of elapsed the machine spent suspended, where that is known.
+    suspended: float
+    # Where the old timeline ended when the wall clock was stepped forward.
+    jumped_from: datetime | None = None
+
+
+# Session times come from here rather than straight from the wall clock.
+# Between ticks wall time is the last tick's reading plus monotonic elapsed
+# time, so durations never include a clock step. Each tick checks the two
+# against each other: small drift follows the wall clock, a step forward
+# starts a new timeline that the tracker splits sessions at. A step back
+# doesn't move the timeline back, so nothing recorded after it can start
+# before what was recorded already; it runs on ahead of the wall clock by the
+# step until a later step catches up.
+class TimeAccounting:
+    def __init__(self, clock: SystemClock, tolerance_sec: float = JUMP_TOLERANCE_SEC) -> None:
+        self._clock = clock
+        self._tolerance = tolerance_sec
+        # Seconds the timeline is held ahead of the wall clock.
+        self._ahead = 0.0
+        # (wall, boottime, monotonic) read together; replaced whole, so now()
+        # can run on another thread.
+        self._anchor = (clock.now(), clock.boottime(), clock.monotonic())
+
+    def now(self) -> datetime:
+        wall, boot, _ = self._anchor
+        return wall + timedelta(seconds=max(0.0, self._clock.boottime() - boot))
+
+    def advance(self) -> Tick:
+        last_wall, last_boot, last_mono = self._anchor
+        boot = self._clock.boottime()
+        mono = self._clock.monotonic()
+        raw = self._clock.now()
+        wall = raw + timedelta(seconds=self._ahead)
+        elapsed = max(0.0, boot - last_boot)
+        suspended = max(0.0, elapsed - (mono - last_mono))
+        expected = last_wall + timedelta(seconds=elapsed)
+        if abs((wall - expected).total_seconds()) <= self._tolerance:
+            self._anchor = (wall, boot, mono)
+            return Tick(wall, elapsed, suspended)
+        if abs((raw - expected).total_seconds()) <= self._tolerance:
+            # A step forward caught the wall clock up with a held timeline.
+            self._ahead = 0.0
+            self._anchor = (raw, boot, mono)
+            return Tick(raw, elapsed, suspended)
+        if raw < expected:
+            self._ahead = (expected - raw).total_seconds()
+            self._anchor = (expected, boot, mono)
+            return Tick(expected, elapsed, suspended)
+        self._ahead = 0.0
+        self._anchor = (raw, boot, mono)
+        return Tick(raw, elapsed, suspended, jumped_from=expected)
+
+
+system_clock = SystemClock()
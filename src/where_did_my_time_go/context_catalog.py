@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from where_did_my_time_go.rules import AppContext, Rule, match_rule
+from where_did_my_time_go.storage import Database
+
+# Unread counters and unsaved-change markers turn one chat or document into
+# many contexts: "(3) Inbox - Mail", "● main.py - Code", "notes.txt*".
+_COUNTER = re.compile(r"^\s*[(\[]\d+\+?[)\]]\s*")
+_MARKER = re.compile(r"^[●•*]\s*|\s*[●•*]$")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_title(title: str) -> str:
+    title = _COUNTER.sub("", title or "")
+    title = _MARKER.sub("", title)
+    return _SPACES.sub(" ", title).strip()
+
+
+def _aggregate(rows: list[tuple[str, str, str, int]]) -> dict[tuple[str, str, str], int]:
+    totals: dict[tuple[str, str, str], int] = {}
+    for process_name, title, category, seconds in rows:
+        key = (process_name, normalize_title(title), category)
+        totals[key] = totals.get(key, 0) + int(seconds or 0)
+    return totals
+
+
+# Distinct (process, normalized title, category) contexts with their time per
+# day. Closed days are stored in context_catalog under the data_version stamp
+# like the report rollups; today is aggregated from sessions on demand.
+class ContextCatalog:
+    def __init__(self, db: Database, clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)) -> None:
+        self._db = db
+        self._clock = clock
+
+    def contexts(self, days: int = 30) -> list[tuple[str, str, str, int]]:
+        first_session = self._db.first_session_start()
+        if first_session is None:
+            return []
+        today = _floor_day(self._clock())
+        start = max(today - timedelta(days=days - 1), _floor_day(datetime.fromisoformat(first_session)))
+        closed = []
+        day = start
+        while day < today:
+            closed.append(day)
+            day += timedelta(days=1)
+
+        totals: dict[tuple[str, str, str], int] = {}
+        if closed:
+            self._ensure_cached(closed)
+            for process_name, title, category, seconds in self._db.fetch_catalog(_key(closed[0]), _key(closed[-1])):
+                totals[(process_name, title, category)] = seconds
+        live = self._db.fetch_context_durations(today.isoformat(), (today + timedelta(days=1)).isoformat())
+        for key, seconds in _aggregate(live).items():
+            totals[key] = totals.get(key, 0) + seconds
+        return [(*key, seconds) for key, seconds in totals.items()]
+
+    def _ensure_cached(self, days: list[datetime]) -> None:
+        version = self._db.data_version()
+        cached = self._db.cached_catalog_days(_key(days[0]), _key(days[-1]), version)
+        for day in days:
+            if _key(day) in cached:
+                continue
+            rows = self._db.fetch_context_durations(day.isoformat(), (day + timedelta(days=1)).isoformat())
+            self._db.store_catalog_day(
+                _key(day), [(*key, seconds) for key, seconds in _aggregate(rows).items()], version
+            )
+
+
+@dataclass(slots=True)
+class RulePreview:
+    days: int
+    # (old category, new category) -> seconds that would move.
+    changes: dict[tuple[str, str], int] = field(default_factory=dict)
+    contexts: int = 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.changes.values())
+
+
+def preview_rule(draft: Rule, rules: list[Rule], contexts: list[tuple[str, str, str, int]], days: int) -> RulePreview:
+    # Time the draft would take over: contexts it matches, that no rule ahead
+    # of it in priority order claims first, and that were recorded under a
+    # different category. The draft replaces the rule with its rule_id.
+    preview = RulePreview(days)
+    if not draft.enabled:
+        return preview
+    ahead = [
+        rule
+        for rule in rules
+        if rule.enabled
+        and rule.rule_id != draft.rule_id
+        and (rule.priority, rule.rule_id) < (draft.priority, draft.rule_id)
+    ]
+    for process_name, title, category, seconds in contexts:
+        if category == draft.category:
+            continue
+        context = AppContext(process_name, title)
+        if not match_rule(draft, context) or any(match_rule(rule, context) for rule in ahead):
+            continue
+        key = (category, draft.category)
+        preview.changes[key] = preview.changes.get(key, 0) + seconds
+        preview.contexts += 1
+    return preview
+
+
+def _floor_day(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+
+
+def _key(day: datetime) -> str:
+    return day.date().isoformat()
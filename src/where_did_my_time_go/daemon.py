@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Iterator
+
+from where_did_my_time_go.metrics import registry as metrics
+from where_did_my_time_go.storage import APP_DIR
+
+DAEMON_STATE_PATH = APP_DIR / "daemon.json"
+# Messages waiting for one subscriber before it counts as stalled and is
+# dropped; a few minutes of updates at the default interval.
+SUBSCRIBER_QUEUE = 1000
+
+
+def write_state(path: Path, address: tuple[str, int], authkey: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    state = {"host": address[0], "port": address[1], "authkey": authkey.hex(), "pid": os.getpid()}
+    path.write_text(json.dumps(state), encoding="utf-8")
+
+
+def read_state(path: Path) -> tuple[tuple[str, int], bytes] | None:
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+        return (state["host"], int(state["port"])), bytes.fromhex(state["authkey"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# Feeds one attached UI from its own thread. The tracker thread only ever
+# queues, so a client that stops reading fills its own queue and is dropped
+# instead of stalling tracking. The connection's reader thread owns it and
+# closes it once this sender has finished.
+class _Subscriber:
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self._queue: queue.Queue[tuple | None] = queue.Queue(maxsize=SUBSCRIBER_QUEUE)
+        self._thread = threading.Thread(target=self._send_loop, name="daemon-subscriber", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def offer(self, message: tuple) -> bool:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            return False
+        return True
+
+    def close(self) -> None:
+        # Nothing is offered once a subscriber is removed, so after clearing
+        # the backlog there is room for the stop marker.
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        # Shutting the socket down wakes a send blocked on a client that
+        # stopped reading, and the reader thread, and tells the client it has
+        # to attach again.
+        try:
+            with socket.fromfd(self.connection.fileno(), socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def join(self, timeout: float = 5.0) -> None:
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _send_loop(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            try:
+                self.connection.send(message)
+            except OSError:
+                return
+
+
+# Serves a TrackerCore over a loopback socket. Clients send tuples such as
+# ("pause",) or ("intent", session_id, text); subscribers receive
+# ("session", summary), ("prompt", session_id, category), ("status", text)
+# and ("activity", category, epoch).
+class TrackerDaemon:
+    def __init__(self, core, state_path: Path = DAEMON_STATE_PATH, port: int = 0) -> None:
+        self._core = core
+        self._state_path = state_path
+        self._authkey = secrets.token_bytes(32)
+        self._listener = Listener(("127.0.0.1", port), authkey=self._authkey)
+        self._address = self._listener.address
+        self._subscribers: list[_Subscriber] = []
+        self._lock = threading.Lock()
+        self._status = "Running"
+        self._pending_prompt: tuple | None = None
+        self._activity: tuple = ("activity", None, 0.0)
+        core.on_session_updated = self._on_session_updated
+        core.on_prompt = self._on_prompt
+        core.on_status = self._on_status
+        core.on_activity = self._on_activity
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._address
+
+    def serve_forever(self) -> None:
+        write_state(self._state_path, self.address, self._authkey)
+        threading.Thread(target=self._accept_loop, name="daemon-accept", daemon=True).start()
+        try:
+            self._core.run()
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        self._core.stop()
+
+    def close(self) -> None:
+        self._listener.close()
+        with self._lock:
+            for subscriber in self._subscribers:
+                subscriber.close()
+            self._subscribers.clear()
+        if read_state(self._state_path) == (self.address, self._authkey):
+            self._state_path.unlink(missing_ok=True)
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                connection = self._listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(connection,), name="daemon-client", daemon=True).start()
+
+    def _serve(self, connection: Connection) -> None:
+        subscriber = None
+        try:
+            while True:
+                message = connection.recv()
+                if message[0] != "subscribe":
+                    self._handle(connection, message)
+                elif subscriber is None:
+                    subscriber = self._subscribe(connection)
+        except (EOFError, OSError):
+            pass
+        finally:
+            if subscriber is not None:
+                with self._lock:
+                    if subscriber in self._subscribers:
+                        self._subscribers.remove(subscriber)
+                subscriber.close()
+                subscriber.join()
+            connection.close()
+
+    def _subscribe(self, connection: Connection) -> _Subscriber:
+        subscriber = _Subscriber(connection)
+        with self._lock:
+            # Queued under the lock, so no broadcast can overtake them.
+            subscriber.offer(("status", self._status))
+            subscriber.offer(("session", self._summary()))
+            subscriber.offer(self._activity)
+            # The tracker starts before any UI attaches, so replay a prompt
+            # for the still-active session instead of dropping it.
+            active = self._core.active_session
+            if self._pending_prompt and active and active.session_id == self._pending_prompt[1]:
+                subscriber.offer(self._pending_prompt)
+            self._subscribers.append(subscriber)
+        subscriber.start()
+        return subscriber
+
+    def _handle(self, connection: Connection, message: tuple) -> None:
+        command = message[0]
+        if command == "pause":
+            self._core.pause()
+        elif command == "resume":
+            self._core.resume()
+        elif command == "intent":
+            self._core.set_intent_tag(message[1], message[2])
+            self._pending_prompt = None
+        elif command == "status":
+            self._reply(connection, ("status", self._status, self._summary(), os.getpid()))
+        elif command == "stop":
+            self._core.stop()
+
+    def _reply(self, connection: Connection, message: tuple) -> None:
+        # A subscribed connection is written by its sender thread only.
+        with self._lock:
+            for subscriber in self._subscribers:
+                if subscriber.connection is connection:
+                    subscriber.offer(message)
+                    return
+        connection.send(message)
+
+    def _summary(self) -> dict | None:
+        active = self._core.active_session
+        if active is None:
+            return None
+        return {
+            "session_id": active.session_id,
+            "start_ts": active.start_ts,
+            "process_name": active.process_name,
+            "window_title": active.window_title,
+            "category": active.category,
+        }
+
+    def _on_session_updated(self) -> None:
+        self._broadcast(("session", self._summary()))
+
+    def _on_prompt(self, session_id: int, category: str) -> None:
+        self._pending_prompt = ("prompt", session_id, category)
+        self._broadcast(self._pending_prompt)
+
+    def _on_status(self, status: str) -> None:
+        self._status = status
+        self._broadcast(("status", status))
+
+    def _on_activity(self, category: str | None, at: datetime) -> None:
+        self._activity = ("activity", category, at.timestamp())
+        self._broadcast(self._activity)
+
+    def _broadcast(self, message: tuple) -> None:
+        # Runs on the tracker thread, so it never waits on a socket.
+        with self._lock:
+            for subscriber in list(self._subscribers):
+                if not subscriber.offer(message):
+                    self._subscribers.remove(subscriber)
+                    subscriber.close()
+                    metrics.increment("daemon.subscriber_dropped")
+
+
+class DaemonClient:
+    def __init__(self, connection: Connection) -> None:
+        self._connection = connection
+        self._send_lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, state_path: Path = DAEMON_STATE_PATH) -> DaemonClient | None:
+        state = read_state(state_path)
+        if state is None:
+            return None
+        address, authkey = state
+        try:
+            return cls(Client(address, authkey=authkey))
+        except (OSError, AuthenticationError):
+            return None
+
+    def send(self, *message) -> None:
+        with self._send_lock:
+            self._connection.send(message)
+
+    def request(self, *message) -> tuple:
+        self.send(*message)
+        return self._connection.recv()
+
+    def messages(self, timeout: float | None = None) -> Iterator[tuple]:
+        # With a timeout, raises TimeoutError when the daemon goes quiet.
+        while True:
+            try:
+                if timeout is not None and not self._connection.poll(timeout):
+                    raise TimeoutError(f"no message from the tracker daemon within {timeout}s")
+                yield self._connection.recv()
+            except (EOFError, OSError):
+                return
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def daemon_command() -> list[str]:
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "daemon"]
+    return [sys.executable, "-m", "where_did_my_time_go", "daemon"]
+
+
+def ensure_daemon(state_path: Path = DAEMON_STATE_PATH, timeout: float = 10.0) -> DaemonClient:
+    client = DaemonClient.connect(state_path)
+    if client is not None:
+        return client
+    flags = 0
+    if sys.platform == "win32":
+        flags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW
+    subprocess.Popen(daemon_command(), creationflags=flags, close_fds=True)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        client = DaemonClient.connect(state_path)
+        if client is not None:
+            return client
+    raise TimeoutError(f"tracker daemon did not start within {timeout:.0f}s")
+
+
+def run_daemon(state_path: Path = DAEMON_STATE_PATH) -> int:
+    from where_did_my_time_go.backup import BackupScheduler
+    from where_did_my_time_go.exporter import ExportHub
+    from where_did_my_time_go.query_server import core_status, start_server
+    from where_did_my_time_go.settings import SettingsStore
+    from where_did_my_time_go.tracker_core import TrackerCore
+
+    if DaemonClient.connect(state_path) is not None:
+        print("tracker daemon is already running", file=sys.stderr)
+        return 1
+    settings = SettingsStore()
+    settings.load()
+    core = TrackerCore(settings)
+    daemon = TrackerDaemon(core, state_path)
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    signal.signal(signal.SIGINT, lambda *_: daemon.stop())
+    backups = BackupScheduler(settings)
+    backups.start()
+    # Headless: a failure to start is only counted in the metrics.
+    api, _ = start_server(settings.current.api_port, core_status(core))
+    exports = ExportHub(settings.current.export_sinks)
+    core.on_session_closed = exports.submit
+    exports.start()
+    try:
+        daemon.serve_forever()
+    finally:
+        backups.stop()
+        exports.stop()
+        if api is not None:
+            api.stop()
+    return 0
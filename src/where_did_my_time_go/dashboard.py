@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from datetime import datetime, timezone
 
 from PySide6.QtCharts import QChart, QChartView, QPieSeries
@@ -12,13 +13,10 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from where_did_my_time_go.chart_model import PieChartModel
+from where_did_my_time_go.query import SessionQuery
 from where_did_my_time_go.storage import Database, date_range_for_day
-
-
-def format_duration(seconds: int) -> str:
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    return f"{hours}h {minutes}m"
+from where_did_my_time_go.utils import format_duration
 
 
 class DashboardWidget(QWidget):
@@ -37,6 +35,7 @@ class DashboardWidget(QWidget):
         self.chart.setTitle("Today's Category Breakdown")
         self.chart_view = QChartView(self.chart)
         self.chart_view.setRenderHint(QPainter.Antialiasing)
+        self.chart_model = PieChartModel(self.chart, self.series)
 
         stats_layout = QHBoxLayout()
         stats_layout.addWidget(self.total_active_label)
@@ -53,17 +52,32 @@ class DashboardWidget(QWidget):
 
     def refresh(self) -> None:
         start, end = date_range_for_day(datetime.now(timezone.utc))
-        active = self._db.total_active(start, end)
-        idle = self._db.total_idle(start, end)
+        today = SessionQuery(start, end)
+        by_category = {
+            category: int(total) for category, total, _ in self._db.iter_select(replace(today, group_by=("category",)))
+        }
+        idle = by_category.get("Idle", 0)
+        active = sum(by_category.values()) - idle
         self.total_active_label.setText(f"Active: {format_duration(active)}")
         self.total_idle_label.setText(f"Idle: {format_duration(idle)}")
 
-        self.top_apps_list.clear()
-        for row in self._db.top_apps(start, end, 10):
-            self.top_apps_list.addItem(
-                f"{row['process_name']} - {format_duration(int(row['total']))}"
-            )
+        top_apps = replace(today, group_by=("process_name",), order_by=("-total",), limit=10)
+        lines = [
+            f"{process_name} - {format_duration(int(total))}"
+            for process_name, total, _ in self._db.iter_select(top_apps)
+        ]
+        # Reuse the list items; only their text changes between refreshes.
+        while self.top_apps_list.count() > len(lines):
+            self.top_apps_list.takeItem(self.top_apps_list.count() - 1)
+        for index, line in enumerate(lines):
+            item = self.top_apps_list.item(index)
+            if item is None:
+                self.top_apps_list.addItem(line)
+            elif item.text() != line:
+                item.setText(line)
 
-        self.series.clear()
-        for row in self._db.summarize_today(start, end):
-            self.series.append(row["category"], float(row["total"]))
+        self.chart_model.update({category: float(total) for category, total in by_category.items()})
+
+    def release(self) -> None:
+        self.top_apps_list.clear()
+        self.chart_model.clear()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QCheckBox,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from where_did_my_time_go.metrics import MetricsRegistry, registry
+
+
+class DiagnosticsWidget(QWidget):
+    def __init__(self, metrics: MetricsRegistry | None = None) -> None:
+        super().__init__()
+        self._metrics = metrics or registry
+
+        self.enabled_check = QCheckBox("Collect metrics")
+        self.enabled_check.setChecked(self._metrics.enabled)
+        reset_button = QPushButton("Reset")
+
+        self.counters_table = QTableWidget(0, 2)
+        self.counters_table.setHorizontalHeaderLabels(["Counter", "Value"])
+        self.counters_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+
+        self.timings_table = QTableWidget(0, 5)
+        self.timings_table.setHorizontalHeaderLabels(["Timer", "Count", "Mean ms", "p95 ms", "Max ms"])
+        self.timings_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.enabled_check)
+        controls.addStretch()
+        controls.addWidget(reset_button)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(QLabel("Counters"))
+        layout.addWidget(self.counters_table)
+        layout.addWidget(QLabel("Timings"))
+        layout.addWidget(self.timings_table)
+
+        self.enabled_check.toggled.connect(self._set_enabled)
+        reset_button.clicked.connect(self._reset)
+
+        self.refresh()
+
+    def _set_enabled(self, enabled: bool) -> None:
+        self._metrics.enabled = enabled
+        self.refresh()
+
+    def _reset(self) -> None:
+        self._metrics.reset()
+        self.refresh()
+
+    def refresh(self) -> None:
+        snapshot = self._metrics.snapshot()
+        counters = snapshot["counters"]
+        self.counters_table.setRowCount(len(counters))
+        for row_idx, (name, value) in enumerate(counters.items()):
+            self.counters_table.setItem(row_idx, 0, QTableWidgetItem(name))
+            self.counters_table.setItem(row_idx, 1, QTableWidgetItem(str(value)))
+
+        histograms = snapshot["histograms"]
+        self.timings_table.setRowCount(len(histograms))
+        for row_idx, (name, data) in enumerate(histograms.items()):
+            values = [
+                name,
+                str(data["count"]),
+                f"{data['mean_ms']:.3f}",
+                f"{data['p95_ms']:.3f}",
+                f"{data['max_ms']:.3f}",
+            ]
+            for col, value in enumerate(values):
+                self.timings_table.setItem(row_idx, col, QTableWidgetItem(value))
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from where_did_my_time_go.rules import AppContext, Rule, apply_rules
+from where_did_my_time_go.storage import Database, SessionRecord, from_micros, to_micros
+
+FOCUS = 0
+IDLE = 1
+STOP = 2
+STORAGE_MODES = ("sessions", "events")
+CHECKPOINT_SEC = 60
+_IDLE_CONTEXT = ("Idle", "", "", "Idle")
+
+
+# Append-only writer for storage_mode "events". Only transitions hit the
+# database; while a context stays in focus its open session row is extended
+# once per checkpoint interval instead of on every tracker tick.
+class EventLog:
+    def __init__(self, db: Database, checkpoint_sec: int = CHECKPOINT_SEC) -> None:
+        self._db = db
+        self._checkpoint_us = checkpoint_sec * 1_000_000
+        self._contexts: dict[tuple[str, str, str, str], int] = {}
+        self._last_write_us = 0
+        last = db.last_focus_event()
+        self._last_event_us = 0 if last is None else last["ts_us"]
+        self._open_kind = None if last is None or last["kind"] == STOP else last["kind"]
+
+    @property
+    def is_open(self) -> bool:
+        return self._open_kind is not None
+
+    @property
+    def is_idle(self) -> bool:
+        return self._open_kind == IDLE
+
+    def recover(self) -> None:
+        # After a crash the last session already ends at its final checkpoint;
+        # a STOP at that time closes it without stretching it to now.
+        if self._open_kind is None:
+            return
+        end_ts = self._db.open_event_session_end()
+        if end_ts is not None:
+            self.stop(end_ts)
+        else:
+            self._open_kind = None
+
+    def focus(
+        self, ts: str, process_name: str, exe_path: str, window_title: str, category: str
+    ) -> int:
+        context = (process_name, exe_path, window_title, category)
+        return self._append(ts, FOCUS, context)
+
+    def idle(self, ts: str) -> int:
+        return self._append(ts, IDLE, _IDLE_CONTEXT)
+
+    def stop(self, ts: str) -> None:
+        if self._open_kind is None:
+            return
+        ts = self._ordered(ts)
+        self._db.append_focus_event(ts, STOP, None)
+        self._open_kind = None
+        self._last_write_us = self._last_event_us = to_micros(ts)
+
+    def checkpoint(self, ts: str, force: bool = False) -> bool:
+        now_us = to_micros(ts)
+        if self._open_kind is None or (not force and now_us - self._last_write_us < self._checkpoint_us):
+            return False
+        self._db.checkpoint_event_session(ts)
+        self._last_write_us = now_us
+        return True
+
+    def _ordered(self, ts: str) -> str:
+        # Idle spans are back-dated by the tick gap; never let them start
+        # before the event they close.
+        return ts if to_micros(ts) >= self._last_event_us else from_micros(self._last_event_us)
+
+    def _append(self, ts: str, kind: int, context: tuple[str, str, str, str]) -> int:
+        ts = self._ordered(ts)
+        context_id = self._contexts.get(context)
+        if context_id is None:
+            context_id = self._contexts[context] = self._db.context_id(*context)
+        process_name, exe_path, window_title, category = context
+        record = SessionRecord(
+            start_ts=ts,
+            end_ts=ts,
+            duration_sec=0,
+            process_name=process_name,
+            exe_path=exe_path,
+            window_title=window_title,
+            category=category,
+            intent_tag=None,
+        )
+        session_id = self._db.append_focus_event(ts, kind, context_id, record)
+        self._open_kind = kind
+        self._last_write_us = self._last_event_us = to_micros(ts)
+        return int(session_id)
+
+
+@dataclass(slots=True)
+class Span:
+    start_us: int
+    end_us: int
+    context_id: int
+    kind: int
+    category: str | None
+    event_ids: list[int] = field(default_factory=list)
+
+
+def derive_spans(
+    events: list[tuple[int, int, int, int | None, int | None, str | None]],
+    open_end_us: int | None,
+    coalesce_sec: int = 0,
+) -> list[Span]:
+    # Each FOCUS/IDLE event lasts until the next event; the final one is still
+    # open and ends at its last checkpoint.
+    spans: list[Span] = []
+    for index, (event_id, ts_us, kind, context_id, _, category) in enumerate(events):
+        if kind == STOP or context_id is None:
+            continue
+        end_us = events[index + 1][1] if index + 1 < len(events) else open_end_us
+        if end_us is None:
+            continue
+        spans.append(Span(ts_us, max(ts_us, end_us), context_id, kind, category, [event_id]))
+    if coalesce_sec <= 0:
+        return spans
+
+    # Blips shorter than coalesce_sec fold into the session before them, and
+    # back-to-back spans of the same context merge into one.
+    limit_us = coalesce_sec * 1_000_000
+    merged: list[Span] = []
+    for span in spans:
+        previous = merged[-1] if merged else None
+        if previous is not None and previous.end_us == span.start_us and previous.kind == FOCUS:
+            short = span.kind == FOCUS and span.end_us - span.start_us < limit_us
+            same = span.kind == previous.kind and span.context_id == previous.context_id
+            if short or (same and span.category == previous.category):
+                previous.end_us = span.end_us
+                previous.event_ids.extend(span.event_ids)
+                continue
+        merged.append(span)
+    return merged
+
+
+# Re-derives every event-backed session from the focus log. Each session keeps
+# the category its event was logged with unless rules are given, in which case
+# every context is reclassified. Intent tags carry over from the first tagged
+# event of each rebuilt session.
+def rebuild(db: Database, rules: list[Rule] | None = None, coalesce_sec: int = 0) -> int:
+    contexts = {row["context_id"]: row for row in db.fetch_contexts()}
+    categories: dict[int, str] = {}
+    if rules is not None:
+        ordered = sorted(rules, key=lambda r: (r.priority, r.rule_id))
+        for context_id, row in contexts.items():
+            if row["category"] != "Idle":
+                context = AppContext(row["process_name"], row["window_title"])
+                categories[context_id] = apply_rules(ordered, context)
+
+    events = db.fetch_focus_events()
+    if categories:
+        events = [(*event[:5], categories.get(event[3], event[5])) for event in events]
+    open_end = None
+    if events and events[-1][2] != STOP:
+        end_ts = db.open_event_session_end()
+        open_end = to_micros(end_ts) if end_ts else None
+    intents = db.event_session_intents()
+
+    sessions = []
+    for span in derive_spans(events, open_end, coalesce_sec):
+        row = contexts[span.context_id]
+        start_ts = from_micros(span.start_us)
+        end_ts = from_micros(span.end_us)
+        record = SessionRecord(
+            start_ts=start_ts,
+            end_ts=end_ts,
+            duration_sec=(span.end_us - span.start_us) // 1_000_000,
+            process_name=row["process_name"],
+            exe_path=row["exe_path"],
+            window_title=row["window_title"],
+            # Events logged before categories were stored per event fall back
+            # to the context's latest category.
+            category=span.category or row["category"],
+            intent_tag=next((intents[e] for e in span.event_ids if e in intents), None),
+        )
+        sessions.append((record, span.event_ids))
+    db.replace_event_sessions(categories, sessions)
+    db.bump_data_version()
+    return len(sessions)
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable
+
+from where_did_my_time_go.metrics import registry as metrics
+from where_did_my_time_go.query import SESSION_COLUMNS, SessionQuery
+from where_did_my_time_go.storage import DB_PATH, Database, SessionRecord, to_micros
+
+QUEUE_SIZE = 1000
+BATCH_SIZE = 200
+# A batch is written once it is full or this long after its first session.
+FLUSH_SEC = 2.0
+RETRY_SEC = 5.0
+SOCKET_TIMEOUT_SEC = 5.0
+# catch_up: a session that doesn't fit in the queue is re-read from the
+# database once the sink keeps up again. drop: it is never exported.
+OVERFLOW_POLICIES = ("catch_up", "drop")
+
+
+def _lines(records: Iterable[SessionRecord]) -> bytes:
+    return "".join(json.dumps(asdict(record)) + "\n" for record in records).encode("utf-8")
+
+
+# Sinks receive batches of closed sessions in start order, on the exporter's
+# thread. A sink that raises OSError gets the same batch again later.
+class Sink:
+    def __init__(self, name: str) -> None:
+        # Keys the stored watermark, so keep it stable across restarts.
+        self.name = name
+
+    def write(self, records: list[SessionRecord]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlSink(Sink):
+    # Appends one JSON object per line.
+    def __init__(self, path: Path, name: str | None = None) -> None:
+        super().__init__(name or f"jsonl:{path}")
+        self._path = path
+
+    def write(self, records: list[SessionRecord]) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open("ab") as handle:
+            handle.write(_lines(records))
+
+
+class FileDropSink(Sink):
+    # One JSONL file per batch. Files appear under their final name only once
+    # complete, so a collector can pick up every *.jsonl it sees.
+    def __init__(self, directory: Path, name: str | None = None) -> None:
+        super().__init__(name or f"dir:{directory}")
+        self._directory = directory
+
+    def write(self, records: list[SessionRecord]) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        target = self._directory / f"sessions-{to_micros(records[0].start_ts)}.jsonl"
+        partial = target.with_name(target.name + ".part")
+        partial.write_bytes(_lines(records))
+        os.replace(partial, target)
+
+
+class SocketSink(Sink):
+    # Newline-delimited JSON over a local TCP or Unix socket, reconnecting
+    # on the next batch after a failure.
+    def __init__(self, address: tuple[str, int] | str, name: str | None = None) -> None:
+        if isinstance(address, tuple):
+            default = f"tcp:{address[0]}:{address[1]}"
+        else:
+            default = f"unix:{address}"
+        super().__init__(name or default)
+        self._address = address
+        self._socket: socket.socket | None = None
+
+    def write(self, records: list[SessionRecord]) -> None:
+        if self._socket is None:
+            self._socket = self._connect()
+        try:
+            self._socket.sendall(_lines(records))
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _connect(self) -> socket.socket:
+        if isinstance(self._address, tuple):
+            return socket.create_connection(self._address, timeout=SOCKET_TIMEOUT_SEC)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(SOCKET_TIMEOUT_SEC)
+        try:
+            sock.connect(self._address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+
+def sink_from_spec(spec: str) -> Sink:
+    # "jsonl:<file>", "dir:<directory>", "tcp:<host>:<port>" or "unix:<path>".
+    kind, _, target = spec.strip().partition(":")
+    if not target:
+        raise ValueError(f"sink needs a target: {spec!r}")
+    if kind == "jsonl":
+        return JsonlSink(Path(target), spec.strip())
+    if kind == "dir":
+        return FileDropSink(Path(target), spec.strip())
+    if kind == "tcp":
+        host, _, port = target.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"expected tcp:<host>:<port>: {spec!r}")
+        return SocketSink((host, int(port)), spec.strip())
+    if kind == "unix":
+        return SocketSink(target, spec.strip())
+    raise ValueError(f"unknown sink {kind!r}")
+
+
+# Feeds one sink from the tracker's session-close events. submit() runs on the
+# tracker thread and only ever puts into a bounded queue; batching, writing and
+# retrying happen on this thread. The id of the last exported session is the
+# watermark: it is stored in the database after each batch, and anything
+# closed after it but not exported (dropped, or queued when the app exited) is
+# read back from the sessions table. Ids, unlike start times, are unique and
+# follow the order sessions close in even when the clock steps back. Start
+# exporters before the tracker, so every session already stored is closed.
+class SessionExporter(threading.Thread):
+    def __init__(
+        self,
+        sink: Sink,
+        db_path: Path = DB_PATH,
+        queue_size: int = QUEUE_SIZE,
+        batch_size: int = BATCH_SIZE,
+        flush_sec: float = FLUSH_SEC,
+        overflow: str = "catch_up",
+        put_timeout: float = 0.0,
+        retry_sec: float = RETRY_SEC,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+        super().__init__(name=f"export {sink.name}", daemon=True)
+        self._sink = sink
+        self._db = Database(db_path, check_same_thread=False)
+        self._queue: queue.Queue[tuple[int, SessionRecord] | None] = queue.Queue(maxsize=queue_size)
+        self._batch_size = batch_size
+        self._flush_sec = flush_sec
+        self._overflow = overflow
+        # Above 0 the tracker waits this long for room before dropping.
+        self._put_timeout = put_timeout
+        self._retry_sec = retry_sec
+        self._stop_event = threading.Event()
+        self._key = f"export_after_id:{sink.name}"
+        latest = self._db.select(SessionQuery(columns=("session_id",), order_by=("-session_id",), limit=1))
+        started = latest[0][0] if latest else 0
+        stored = self._db.get_meta(self._key)
+        if stored is None:
+            # A new sink gets sessions from now on, not the whole history.
+            self._db.set_meta(self._key, str(started))
+        self.watermark = int(stored) if stored is not None else started
+        self._closed_through = started
+        self._behind = stored is not None
+        self.exported = 0
+        self.dropped = 0
+        # Why the last write or read failed; cleared by the next batch that
+        # gets through. The tray shows it, as it does backup failures.
+        self.last_error = ""
+
+    def submit(self, session_id: int, record: SessionRecord) -> None:
+        self._closed_through = max(self._closed_through, session_id)
+        try:
+            self._queue.put(
+                (session_id, record), block=self._put_timeout > 0, timeout=self._put_timeout or None
+            )
+        except queue.Full:
+            self.dropped += 1
+            metrics.increment("export.dropped")
+            if self._overflow == "catch_up":
+                self._behind = True
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            if self._behind:
+                self._behind = False
+                self._catch_up()
+            else:
+                self._write(self._take())
+        # Whatever is still queued gets one attempt; the rest is picked up
+        # from the watermark on the next start.
+        pending: list[tuple[int, SessionRecord]] = []
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not None:
+                pending.append(record)
+        self._write(pending, retry=False)
+        self._sink.close()
+        self._db.close()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        if self.is_alive():
+            self.join(timeout)
+
+    def _take(self) -> list[tuple[int, SessionRecord]]:
+        try:
+            first = self._queue.get(timeout=self._flush_sec)
+        except queue.Empty:
+            return []
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self._flush_sec
+        while len(batch) < self._batch_size and not self._stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                record = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if record is None:
+                break
+            batch.append(record)
+        return batch
+
+    def _catch_up(self) -> None:
+        through = self._closed_through
+        while not self._stop_event.is_set():
+            query = SessionQuery(
+                after_id=self.watermark,
+                columns=("session_id", *SESSION_COLUMNS),
+                order_by=("session_id",),
+                limit=self._batch_size,
+            )
+            try:
+                rows = [
+                    (row[0], SessionRecord(*row[1:])) for row in self._db.iter_select(query) if row[0] <= through
+                ]
+            except sqlite3.Error as exc:
+                metrics.increment("export.read_failed")
+                self.last_error = f"export to {self._sink.name} can't read sessions: {exc}"
+                self._behind = True
+                self._stop_event.wait(self._retry_sec)
+                return
+            if not rows or not self._write(rows) or len(rows) < self._batch_size:
+                return
+
+    def _write(self, batch: list[tuple[int, SessionRecord]], retry: bool = True) -> bool:
+        batch = [(session_id, record) for session_id, record in batch if session_id > self.watermark]
+        if not batch:
+            return True
+        records = [record for _, record in batch]
+        while True:
+            try:
+                with metrics.timer("export.write"):
+                    self._sink.write(records)
+                break
+            except OSError as exc:
+                metrics.increment("export.failed")
+                self.last_error = f"export to {self._sink.name} failed, retrying: {exc}"
+                # Stopping leaves the batch to the next start's catch-up.
+                if not retry or self._stop_event.wait(self._retry_sec):
+                    return False
+        self.watermark = batch[-1][0]
+        self.exported += len(batch)
+        self.last_error = ""
+        try:
+            self._db.set_meta(self._key, str(self.watermark))
+        except sqlite3.Error:
+            # Stored with the next batch; until then a restart re-sends these.
+            pass
+        return True
+
+
+# Fans the tracker's session-close events out to one exporter per sink, so a
+# slow sink only holds back its own queue.
+class ExportHub:
+    def __init__(self, specs: Iterable[str], db_path: Path = DB_PATH) -> None:
+        self.exporters: list[SessionExporter] = []
+        # Sinks that could not be set up, with the reason, for the tray.
+        self.errors: list[str] = []
+        for spec in specs:
+            try:
+                self.exporters.append(SessionExporter(sink_from_spec(spec), db_path))
+            except (ValueError, OSError, sqlite3.Error) as exc:
+                metrics.increment("export.sink_failed")
+                self.errors.append(f"export sink {spec!r} not started: {exc}")
+
+    def start(self) -> None:
+        for exporter in self.exporters:
+            exporter.start()
+
+    def submit(self, session_id: int, record: SessionRecord) -> None:
+        for exporter in self.exporters:
+            exporter.submit(session_id, record)
+
+    def stop(self) -> None:
+        for exporter in self.exporters:
+            exporter.stop()
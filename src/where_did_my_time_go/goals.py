@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from where_did_my_time_go.live_totals import DayTotals
+from where_did_my_time_go.settings import Settings, SettingsStore
+from where_did_my_time_go.storage import Database
+
+
+def parse_budgets(text: str) -> dict[str, int]:
+    # "Social=45, Video=30" -> {"Social": 45, "Video": 30} (minutes)
+    budgets = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        category, sep, minutes = part.partition("=")
+        if not sep or not category.strip() or not minutes.strip().isdigit():
+            raise ValueError(f"expected Category=minutes, got {part.strip()!r}")
+        budgets[category.strip()] = int(minutes)
+    return budgets
+
+
+def format_budgets(budgets: dict[str, int]) -> str:
+    return ", ".join(f"{category}={minutes}" for category, minutes in budgets.items())
+
+
+def focus_windows(day_start: datetime, settings: Settings) -> list[tuple[float, float]]:
+    # The epoch ranges of one local day that count towards budgets. A window
+    # that wraps midnight counts its morning and evening ends.
+    day_end = day_start + timedelta(days=1)
+    if not settings.budgets_focus_only:
+        return [(day_start.timestamp(), day_end.timestamp())]
+    start = datetime.combine(day_start.date(), settings.focus_start)
+    end = datetime.combine(day_start.date(), settings.focus_end)
+    if settings.focus_start <= settings.focus_end:
+        return [(start.timestamp(), end.timestamp())]
+    return [(day_start.timestamp(), end.timestamp()), (start.timestamp(), day_end.timestamp())]
+
+
+@dataclass(slots=True)
+class BudgetAlert:
+    category: str
+    limit_sec: int
+    spent_sec: int
+
+
+# Per-category totals for today's budget windows, kept by DayTotals so that
+# checking a budget never touches the database. The counters are seeded from
+# storage once, and again only when the budget windows change.
+class GoalTracker(DayTotals):
+    def __init__(self, settings: SettingsStore, db: Database, clock: Callable[[], float] = time.time) -> None:
+        self._settings = settings
+        self._seen = settings.current
+        self._limits = _limits(self._seen)
+        # category -> the limit it was alerted for.
+        self._alerted: dict[str, int] = {}
+        super().__init__(db, clock)
+
+    def evaluate(self, now: float | None = None) -> BudgetAlert | None:
+        # Only the category being credited can cross its limit, so this is a
+        # couple of dict lookups per call.
+        now = self._clock() if now is None else now
+        if self._settings.current is not self._seen:
+            self._refresh_settings(now)
+        category = self._category
+        if category is None:
+            return None
+        limit = self._limits.get(category)
+        if limit is None or self._alerted.get(category) == limit:
+            return None
+        spent = self.spent(category, now)
+        if spent < limit:
+            return None
+        self._alerted[category] = limit
+        return BudgetAlert(category, limit, spent)
+
+    def _refresh_settings(self, now: float) -> None:
+        settings = self._settings.current
+        previous = self._seen
+        self._seen = settings
+        self._limits = _limits(settings)
+        if (previous.focus_start, previous.focus_end, previous.budgets_focus_only) != (
+            settings.focus_start,
+            settings.focus_end,
+            settings.budgets_focus_only,
+        ):
+            self._seed(now)
+
+    def _day_windows(self, day_start: datetime) -> list[tuple[float, float]]:
+        return focus_windows(day_start, self._seen)
+
+    def _new_day(self) -> None:
+        self._alerted = {}
+
+
+def _limits(settings: Settings) -> dict[str, int]:
+    return {category: minutes * 60 for category, minutes in settings.budgets.items() if minutes > 0}
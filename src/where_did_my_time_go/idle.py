@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Callable
 
 
-@dataclass
+@dataclass(slots=True)
 class IdleStatus:
     idle_seconds: int
     is_idle: bool
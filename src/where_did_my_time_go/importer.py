@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from where_did_my_time_go.rules import AppContext, Rule, apply_rules
+from where_did_my_time_go.storage import Database, SessionRecord
+
+CSV_COLUMNS = [
+    "start_ts",
+    "end_ts",
+    "duration_sec",
+    "process_name",
+    "exe_path",
+    "window_title",
+    "category",
+    "intent_tag",
+]
+
+
+@dataclass
+class ImportResult:
+    read: int = 0
+    inserted: int = 0
+
+    @property
+    def skipped(self) -> int:
+        return self.read - self.inserted
+
+
+def read_csv(path: Path) -> Iterator[SessionRecord]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+        for row in reader:
+            yield SessionRecord(
+                start_ts=row["start_ts"],
+                end_ts=row["end_ts"],
+                duration_sec=int(row["duration_sec"] or 0),
+                process_name=row["process_name"],
+                exe_path=row["exe_path"],
+                window_title=row["window_title"],
+                category=row["category"],
+                intent_tag=row["intent_tag"] or None,
+            )
+
+
+def read_database(path: Path) -> Iterator[SessionRecord]:
+    source = Database(path, read_only=True)
+    try:
+        yield from source.iter_session_records()
+    finally:
+        source.close()
+
+
+def reclassify(records: Iterable[SessionRecord], rules: list[Rule]) -> Iterator[SessionRecord]:
+    rules = sorted(rules, key=lambda r: (r.priority, r.rule_id))
+    cache: dict[tuple[str, str], str] = {}
+    for record in records:
+        if record.category != "Idle":
+            key = (record.process_name, record.window_title)
+            category = cache.get(key)
+            if category is None:
+                category = cache[key] = apply_rules(rules, AppContext(*key))
+            record.category = category
+        yield record
+
+
+def import_sessions(
+    db: Database,
+    records: Iterable[SessionRecord],
+    reclassify_with_rules: bool = False,
+    chunk_size: int = 20000,
+) -> ImportResult:
+    result = ImportResult()
+
+    def counted(items: Iterable[SessionRecord]) -> Iterator[SessionRecord]:
+        for item in items:
+            result.read += 1
+            yield item
+
+    records = counted(records)
+    if reclassify_with_rules:
+        rules = [Rule(**dict(row)) for row in db.list_rules()]
+        records = reclassify(records, rules)
+    result.inserted = db.add_sessions(records, chunk_size)
+    if result.inserted:
+        db.bump_data_version()
+    return result
+
+
+def import_path(db: Database, path: Path, reclassify_with_rules: bool = False) -> ImportResult:
+    records = read_csv(path) if path.suffix.lower() == ".csv" else read_database(path)
+    return import_sessions(db, records, reclassify_with_rules)
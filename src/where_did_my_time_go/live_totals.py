@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from where_did_my_time_go.storage import Database
+
+IDLE = "Idle"
+
+
+def _overlap(windows: list[tuple[float, float]], start: float, end: float) -> float:
+    return sum(max(0.0, min(end, window_end) - max(start, window_start)) for window_start, window_end in windows)
+
+
+@dataclass(slots=True)
+class TodayStats:
+    active_sec: int
+    idle_sec: int
+    top_category: str | None
+    top_sec: int
+
+
+# Running per-category totals for the current local day. The tracker reports
+# each switch of what is being credited (a category, "Idle" or None while
+# paused); closed stretches are folded into the counters and the open one is
+# added on read, so reading a total never touches the database. Storage is
+# read to seed the counters and on reconcile(), which replaces them with what
+# was recorded before the open stretch began.
+class DayTotals:
+    def __init__(self, db: Database, clock: Callable[[], float] = time.time) -> None:
+        self._db = db
+        self._clock = clock
+        self._windows: list[tuple[float, float]] = []
+        self._day_start = 0.0
+        self._day_end = 0.0
+        self._counters: dict[str, float] = {}
+        self._category: str | None = None
+        self._since = 0.0
+        self._seeded_until = 0.0
+        self._seed(clock())
+
+    def switch(self, category: str | None, at: float) -> None:
+        self._roll_day(at)
+        if self._category is not None and at > self._since:
+            self._counters[self._category] = self._counters.get(self._category, 0.0) + _overlap(
+                self._windows, self._since, at
+            )
+        self._category = category
+        # Time before the seed is already counted from storage.
+        self._since = max(at, self._seeded_until)
+
+    def spent(self, category: str, now: float | None = None) -> int:
+        now = self._clock() if now is None else now
+        self._roll_day(now)
+        spent = self._counters.get(category, 0.0)
+        if category == self._category and now > self._since:
+            spent += _overlap(self._windows, self._since, now)
+        return int(spent)
+
+    def totals(self, now: float | None = None) -> dict[str, int]:
+        now = self._clock() if now is None else now
+        self._roll_day(now)
+        totals = dict(self._counters)
+        if self._category is not None and now > self._since:
+            totals[self._category] = totals.get(self._category, 0.0) + _overlap(self._windows, self._since, now)
+        return {category: int(seconds) for category, seconds in totals.items()}
+
+    def stats(self, now: float | None = None) -> TodayStats:
+        totals = self.totals(now)
+        idle = totals.pop(IDLE, 0)
+        top_category, top_sec = max(totals.items(), key=lambda item: (item[1], item[0]), default=(None, 0))
+        return TodayStats(sum(totals.values()), idle, top_category, top_sec)
+
+    def reconcile(self, now: float | None = None) -> None:
+        # Picks up what the switches can't see: imports, edits, retention and
+        # time recorded while this process was not listening.
+        self._seed(self._clock() if now is None else now)
+
+    def _day_windows(self, day_start: datetime) -> list[tuple[float, float]]:
+        return [(day_start.timestamp(), (day_start + timedelta(days=1)).timestamp())]
+
+    def _new_day(self) -> None:
+        pass
+
+    def _roll_day(self, now: float) -> None:
+        if now >= self._day_end:
+            self._start_day(now)
+            self._new_day()
+
+    def _start_day(self, now: float) -> None:
+        day_start = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._day_start = day_start.timestamp()
+        self._day_end = (day_start + timedelta(days=1)).timestamp()
+        self._windows = self._day_windows(day_start)
+        self._counters = {}
+        self._since = max(self._since, self._day_start)
+
+    def _seed(self, now: float) -> None:
+        self._start_day(now)
+        # The open stretch is counted in memory, so storage is read only up
+        # to where it began; the session row it is extending is skipped.
+        until = min(self._since, now) if self._category is not None else now
+        earliest = self._day_start - 86400
+        for start, end, category, _, _ in self._db.fetch_spans_overlapping(
+            _iso(self._day_start), _iso(until), _iso(earliest)
+        ):
+            self._counters[category] = self._counters.get(category, 0.0) + _overlap(
+                self._windows, start, min(end, until)
+            )
+        self._seeded_until = until
+        if self._category is None:
+            self._since = max(self._since, now)
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, Iterator
+
+# Upper bounds in milliseconds; the last bucket catches everything slower.
+BUCKET_BOUNDS_MS = (0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0, 1000.0, float("inf"))
+METRICS_ENV_VAR = "WDMTG_METRICS"
+
+_DISABLED_TIMER = nullcontext()
+
+
+class Histogram:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * len(BUCKET_BOUNDS_MS)
+
+    def observe(self, value_ms: float) -> None:
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+        for index, bound in enumerate(BUCKET_BOUNDS_MS):
+            if value_ms <= bound:
+                self.buckets[index] += 1
+                break
+
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        threshold = fraction * self.count
+        seen = 0
+        for bound, hits in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += hits
+            if seen >= threshold:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 4) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 4),
+            "buckets": {
+                ("inf" if bound == float("inf") else str(bound)): hits
+                for bound, hits in zip(BUCKET_BOUNDS_MS, self.buckets)
+            },
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+        self._histograms: dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value_ms: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    def timer(self, name: str):
+        if not self.enabled:
+            return _DISABLED_TIMER
+        return self._timer(name)
+
+    @contextmanager
+    def _timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "timestamp": time.time(),
+                "counters": dict(sorted(self._counters.items())),
+                "histograms": {
+                    name: histogram.to_dict()
+                    for name, histogram in sorted(self._histograms.items())
+                },
+            }
+
+
+registry = MetricsRegistry(enabled=os.environ.get(METRICS_ENV_VAR, "") not in ("", "0"))
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            with registry._timer(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrumented(prefix: str) -> Callable[[type], type]:
+    def decorator(cls: type) -> type:
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.isfunction(value):
+                continue
+            if inspect.isgeneratorfunction(value):
+                continue
+            setattr(cls, attr, timed(f"{prefix}.{attr}")(value))
+        return cls
+
+    return decorator
+
+
+class SnapshotWriter(threading.Thread):
+    def __init__(self, path: Path, interval_sec: float = 60.0, metrics: MetricsRegistry | None = None) -> None:
+        super().__init__(name="metrics-snapshot", daemon=True)
+        self._path = path
+        self._interval = interval_sec
+        self._metrics = metrics or registry
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            if self._metrics.enabled:
+                self.write()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def write(self) -> None:
+        tmp_path = self._path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._metrics.snapshot(), indent=2), encoding="utf-8")
+        os.replace(tmp_path, self._path)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from where_did_my_time_go.storage import APP_DIR
+
+PROFILE_ENV_VAR = "WDMTG_PROFILE"
+PROFILE_DIR = APP_DIR / "profiles"
+
+_INACTIVE_SECTION = nullcontext()
+
+
+class Profiler:
+    def __init__(self, output_dir: Path, keep_runs: int = 10, top_n: int = 30) -> None:
+        self._output_dir = output_dir
+        self._keep_runs = keep_runs
+        self._top_n = top_n
+        self._lock = threading.Lock()
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._started_tracemalloc = False
+        self.active = False
+
+    def start(self) -> None:
+        with self._lock:
+            if self.active:
+                return
+            self._profiles = {}
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._started_tracemalloc = True
+            self._baseline = tracemalloc.take_snapshot()
+            self.active = True
+
+    def stop(self) -> Path | None:
+        with self._lock:
+            if not self.active:
+                return None
+            self.active = False
+            profiles = self._profiles
+            self._profiles = {}
+            current = tracemalloc.take_snapshot()
+            baseline = self._baseline
+            self._baseline = None
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+        return self._dump(profiles, baseline, current)
+
+    def section(self, name: str):
+        if not self.active:
+            return _INACTIVE_SECTION
+        return self._section(name)
+
+    @contextmanager
+    def _section(self, name: str) -> Iterator[None]:
+        with self._lock:
+            profile = self._profiles.get(name)
+            if profile is None:
+                profile = self._profiles[name] = cProfile.Profile()
+        try:
+            profile.enable()
+            enabled = True
+        except ValueError:
+            # Another profiler is already active on this interpreter; skip
+            # this section rather than interrupt the caller.
+            enabled = False
+        try:
+            yield
+        finally:
+            if enabled:
+                profile.disable()
+
+    def _dump(
+        self,
+        profiles: dict[str, cProfile.Profile],
+        baseline: tracemalloc.Snapshot | None,
+        current: tracemalloc.Snapshot,
+    ) -> Path:
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        summary = io.StringIO()
+        summary.write(f"Profile run {stamp}\n")
+        for name, profile in sorted(profiles.items()):
+            profile.dump_stats(str(self._output_dir / f"{stamp}-{name}.prof"))
+            summary.write(f"\n=== {name}: top {self._top_n} by cumulative time ===\n")
+            stats = pstats.Stats(profile, stream=summary)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self._top_n)
+
+        summary.write(f"\n=== allocations: top {self._top_n} growth by line ===\n")
+        if baseline is not None:
+            top = current.compare_to(baseline, "lineno")[: self._top_n]
+        else:
+            top = current.statistics("lineno")[: self._top_n]
+        for stat in top:
+            summary.write(f"{stat}\n")
+
+        summary_path = self._output_dir / f"{stamp}-summary.txt"
+        summary_path.write_text(summary.getvalue(), encoding="utf-8")
+        self._rotate()
+        return summary_path
+
+    def _rotate(self) -> None:
+        summaries = sorted(self._output_dir.glob("*-summary.txt"))
+        for stale in summaries[: max(0, len(summaries) - self._keep_runs)]:
+            stamp = stale.name[: -len("-summary.txt")]
+            for path in self._output_dir.glob(f"{stamp}-*"):
+                path.unlink(missing_ok=True)
+
+
+profiler = Profiler(PROFILE_DIR)
+
+
+def start_from_environment() -> None:
+    if os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0"):
+        profiler.start()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable
+
+# unixepoch() is SQLite 3.38+ and much cheaper than the strftime fallback.
+EPOCH_SQL = (
+    "unixepoch({})"
+    if sqlite3.sqlite_version_info >= (3, 38, 0)
+    else "CAST(strftime('%s', {}) AS INTEGER)"
+)
+
+# Row order of ungrouped results, the same as SessionRecord's fields.
+SESSION_COLUMNS = (
+    "start_ts",
+    "end_ts",
+    "duration_sec",
+    "process_name",
+    "exe_path",
+    "window_title",
+    "category",
+    "intent_tag",
+)
+# What an ungrouped query may select instead; epochs are whole seconds.
+SELECT_COLUMNS = {
+    **{column: f"s.{column}" for column in ("session_id", *SESSION_COLUMNS)},
+    "start_epoch": EPOCH_SQL.format("s.start_ts"),
+    "end_epoch": EPOCH_SQL.format("s.end_ts"),
+}
+GROUP_COLUMNS = {
+    "category": "s.category",
+    "process_name": "s.process_name",
+    "intent_tag": "s.intent_tag",
+    # UTC day, as stored.
+    "day": "substr(s.start_ts, 1, 10)",
+}
+_ORDER_COLUMNS = {
+    "session_id": "s.session_id",
+    "start_ts": "s.start_ts",
+    "end_ts": "s.end_ts",
+    "duration_sec": "s.duration_sec",
+    "total": "total",
+    "count": "count",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class SessionQuery:
+    # Sessions belong to the range they start in, as in the day rollups, on
+    # every surface: a session crossing midnight counts whole on its first day.
+    start_ts: str | None = None
+    end_ts: str | None = None
+    # Resume from a watermark: only sessions inserted after this one.
+    after_id: int | None = None
+    categories: tuple[str, ...] = ()
+    exclude_categories: tuple[str, ...] = ()
+    # Case-insensitive substring filters.
+    category_like: str = ""
+    process_like: str = ""
+    title_like: str = ""
+    process: str | None = None
+    # Full-text match over title, process and exe path.
+    search: str = ""
+    intent_tag: str | None = None
+    min_duration: int = 0
+    # Grouped rows are the group columns followed by total and count; an
+    # aggregate without groups is one (total, count) row.
+    group_by: tuple[str, ...] = ()
+    aggregate: bool = False
+    # Columns of ungrouped rows; SESSION_COLUMNS when empty.
+    columns: tuple[str, ...] = ()
+    # Column names, "-" for descending.
+    order_by: tuple[str, ...] = ()
+    limit: int | None = None
+    # Rows to skip; needs a limit and a stable order_by to page through.
+    offset: int = 0
+
+
+SearchClause = Callable[[str], tuple[str, str, tuple[str, ...]]]
+
+
+def compile_query(query: SessionQuery, search_clause: SearchClause) -> tuple[str, tuple]:
+    # Values only ever appear as parameters, so queries of the same shape
+    # compile to the same text and reuse the connection's prepared statement.
+    # Every range bound is put on start_ts, the leading column of
+    # idx_sessions_dedupe, so ranged queries search the index.
+    source = "sessions AS s"
+    where: list[str] = []
+    params: list = []
+    if query.search:
+        source, clause, search_params = search_clause(query.search)
+        where.append(clause)
+        params.extend(search_params)
+    if query.start_ts is not None:
+        where.append("s.start_ts >= ?")
+        params.append(query.start_ts)
+    if query.end_ts is not None:
+        where.append("s.start_ts < ?")
+        params.append(query.end_ts)
+    if query.after_id is not None:
+        where.append("s.session_id > ?")
+        params.append(query.after_id)
+    if query.categories:
+        where.append(f"s.category IN ({', '.join('?' * len(query.categories))})")
+        params.extend(query.categories)
+    if query.exclude_categories:
+        where.append(f"s.category NOT IN ({', '.join('?' * len(query.exclude_categories))})")
+        params.extend(query.exclude_categories)
+    for column, text in (
+        ("s.category", query.category_like),
+        ("s.process_name", query.process_like),
+        ("s.window_title", query.title_like),
+    ):
+        if text.strip():
+            where.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(text.strip())}%")
+    if query.process is not None:
+        where.append("s.process_name = ?")
+        params.append(query.process)
+    if query.intent_tag is not None:
+        where.append("s.intent_tag = ?")
+        params.append(query.intent_tag)
+    if query.min_duration:
+        where.append("s.duration_sec >= ?")
+        params.append(query.min_duration)
+
+    groups = [_lookup(GROUP_COLUMNS, column, "group by") for column in query.group_by]
+    if groups or query.aggregate:
+        select = ", ".join([*groups, "COALESCE(SUM(s.duration_sec), 0) AS total", "COUNT(*) AS count"])
+    else:
+        select = ", ".join(
+            _lookup(SELECT_COLUMNS, column, "select") for column in query.columns or SESSION_COLUMNS
+        )
+    sql = f"SELECT {select} FROM {source}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if groups:
+        sql += f" GROUP BY {', '.join(groups)}"
+    if query.order_by:
+        order = []
+        for key in query.order_by:
+            column = key.removeprefix("-")
+            if query.group_by and column in GROUP_COLUMNS:
+                expression = GROUP_COLUMNS[column]
+            else:
+                expression = _lookup(_ORDER_COLUMNS, column, "order by")
+            order.append(f"{expression} {'DESC' if key.startswith('-') else 'ASC'}")
+        sql += f" ORDER BY {', '.join(order)}"
+    if query.limit is not None:
+        sql += " LIMIT ?"
+        params.append(query.limit)
+        if query.offset:
+            sql += " OFFSET ?"
+            params.append(query.offset)
+    return sql, tuple(params)
+
+
+def _lookup(columns: dict[str, str], name: str, what: str) -> str:
+    try:
+        return columns[name]
+    except KeyError:
+        raise ValueError(f"cannot {what} {name!r}") from None
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
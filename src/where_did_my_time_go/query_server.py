@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import hmac
+import json
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Iterator
+from urllib.parse import parse_qs, urlsplit
+
+from where_did_my_time_go.metrics import registry as metrics
+from where_did_my_time_go.query import SESSION_COLUMNS, SessionQuery
+from where_did_my_time_go.ranges import resolve_range
+from where_did_my_time_go.report_cache import ReportCache
+from where_did_my_time_go.storage import APP_DIR, DB_PATH, Database
+
+HOST = "127.0.0.1"
+# Created on first start; clients send it as "Authorization: Bearer <token>".
+TOKEN_PATH = APP_DIR / "api_token"
+# Requests served at once; one more gets 503 instead of queueing.
+MAX_REQUESTS = 4
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+TOP_LIMIT = 10
+# Session rows encoded per write while streaming.
+ROWS_PER_WRITE = 200
+RETRY_AFTER_SEC = 1
+
+StatusSource = Callable[[], dict]
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def load_token(path: Path = TOKEN_PATH) -> str:
+    try:
+        token = path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        token = ""
+    if token:
+        return token
+    path.parent.mkdir(parents=True, exist_ok=True)
+    token = secrets.token_urlsafe(32)
+    # Readable by this user only, where the platform honours the mode.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        handle.write(token)
+    return token
+
+
+class ReadPool:
+    # Read-only connections, one per request slot. They never take a write
+    # lock, and in WAL mode they read a snapshot without waiting on the tracker.
+    def __init__(self, db_path: Path, size: int) -> None:
+        self._idle: queue.Queue[Database] = queue.Queue()
+        self._all: list[Database] = []
+        for _ in range(size):
+            db = Database(db_path, check_same_thread=False, read_only=True)
+            self._all.append(db)
+            self._idle.put(db)
+
+    @contextmanager
+    def connection(self) -> Iterator[Database]:
+        db = self._idle.get()
+        try:
+            yield db
+        finally:
+            self._idle.put(db)
+
+    def close(self) -> None:
+        for db in self._all:
+            db.close()
+
+
+class QueryServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        db_path: Path = DB_PATH,
+        port: int = 0,
+        status: StatusSource | None = None,
+        max_requests: int = MAX_REQUESTS,
+        host: str = HOST,
+        token: str = "",
+    ) -> None:
+        self.pool = ReadPool(db_path, max_requests)
+        self.status = status
+        self.token = token
+        self._slots = threading.BoundedSemaphore(max_requests)
+        self._thread: threading.Thread | None = None
+        try:
+            super().__init__((host, port), QueryHandler)
+        except OSError:
+            self.pool.close()
+            raise
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def allowed_host(self, host: str | None) -> bool:
+        # A page on any website can reach 127.0.0.1 through a name it
+        # controls (DNS rebinding); the Host header then carries that name.
+        return host in (f"127.0.0.1:{self.port}", f"localhost:{self.port}")
+
+    def process_request(self, request, client_address) -> None:
+        # Refuse rather than queue: a dashboard polling too hard should back
+        # off, not pile up threads and connections in the tracking process.
+        if not self._slots.acquire(blocking=False):
+            try:
+                request.sendall(
+                    b"HTTP/1.0 503 Service Unavailable\r\n"
+                    b"Content-Type: application/json\r\n"
+                    + f"Retry-After: {RETRY_AFTER_SEC}\r\n\r\n".encode()
+                    + b'{"error": "busy"}'
+                )
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address) -> None:
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.serve_forever, name="query-server", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self.pool.close()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    # HTTP/1.0: the connection closes after each response, so streamed bodies
+    # need no Content-Length or chunking.
+    protocol_version = "HTTP/1.0"
+    server: QueryServer
+
+    def do_GET(self) -> None:
+        if not self.server.allowed_host(self.headers.get("Host")):
+            self._send_json(403, {"error": "unexpected Host header"})
+            return
+        if self.server.token and not hmac.compare_digest(
+            self.headers.get("Authorization", ""), f"Bearer {self.server.token}"
+        ):
+            self._send_json(401, {"error": "missing or wrong token"})
+            return
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = ROUTES.get(url.path.rstrip("/") or "/")
+        if route is None:
+            self._send_json(404, {"error": f"no endpoint {url.path}"})
+            return
+        try:
+            route(self, params)
+        except BadRequest as exc:
+            self._send_json(400, {"error": str(exc)})
+        except sqlite3.Error as exc:
+            self._send_json(500, {"error": str(exc)})
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _summary(self, params: dict[str, str]) -> None:
+        start, end = _range(params)
+        by = params.get("by", "category")
+        if by not in ("category", "app"):
+            raise BadRequest("by must be category or app")
+        with self.server.pool.connection() as db:
+            # Closed days come from the day rollups when the tracker has built
+            # them; read-only, the rest is summed without being stored. Like
+            # the other endpoints, a session counts in the range it starts in.
+            totals = ReportCache(db, store=False).totals(start, end)
+        grouped = totals.by_category() if by == "category" else totals.by_app()
+        rows = [
+            {"name": name, "total_sec": total}
+            for name, total in sorted(grouped.items(), key=lambda item: item[1], reverse=True)
+        ]
+        self._send_json(
+            200,
+            {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "by": by,
+                "total_sec": sum(grouped.values()),
+                "rows": rows,
+            },
+        )
+
+    def _top_apps(self, params: dict[str, str]) -> None:
+        start, end = _range(params)
+        query = SessionQuery(
+            start.isoformat(),
+            end.isoformat(),
+            group_by=("process_name",),
+            order_by=("-total", "process_name"),
+            limit=_int(params, "limit", TOP_LIMIT, 1, MAX_PAGE_SIZE),
+        )
+        with self.server.pool.connection() as db:
+            rows = [
+                {"process_name": process_name, "total_sec": int(total), "sessions": count}
+                for process_name, total, count in db.iter_select(query)
+            ]
+        self._send_json(200, {"start": start.isoformat(), "end": end.isoformat(), "rows": rows})
+
+    def _sessions(self, params: dict[str, str]) -> None:
+        start, end = _range(params)
+        limit = _int(params, "limit", PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        offset = _int(params, "offset", 0, 0, None)
+        query = SessionQuery(
+            start.isoformat(),
+            end.isoformat(),
+            category_like=params.get("category", ""),
+            process_like=params.get("app", ""),
+            search=params.get("search", ""),
+            order_by=("start_ts",),
+            # One row past the page says whether there is a next one.
+            limit=limit + 1,
+            offset=offset,
+        )
+        with self.server.pool.connection() as db:
+            rows = db.iter_select(query)
+            # Fetch the first row before the status line so a bad search
+            # still gets a proper error response.
+            first = next(rows, None)
+            self._start_json(200)
+            self.wfile.write(b'{"rows": [')
+            next_offset = None
+            written = 0
+            chunk: list[str] = []
+            for index, row in enumerate(chain([first] if first else [], rows)):
+                if index == limit:
+                    next_offset = offset + limit
+                    break
+                chunk.append(json.dumps(dict(zip(SESSION_COLUMNS, row))))
+                if len(chunk) == ROWS_PER_WRITE:
+                    written = self._write_rows(chunk, written)
+                    chunk = []
+            self._write_rows(chunk, written)
+        self.wfile.write(f'], "next_offset": {json.dumps(next_offset)}}}'.encode())
+
+    def _write_rows(self, chunk: list[str], written: int) -> int:
+        if chunk:
+            self.wfile.write(((", " if written else "") + ", ".join(chunk)).encode())
+        return written + len(chunk)
+
+    def _status(self, params: dict[str, str]) -> None:
+        if self.server.status is None:
+            self._send_json(200, {"tracking": None, "session": None})
+            return
+        self._send_json(200, self.server.status())
+
+    def _start_json(self, code: int) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+    def _send_json(self, code: int, payload: dict) -> None:
+        self._start_json(code)
+        self.wfile.write(json.dumps(payload).encode())
+
+
+ROUTES: dict[str, Callable[[QueryHandler, dict[str, str]], None]] = {
+    "/summary": QueryHandler._summary,
+    "/top-apps": QueryHandler._top_apps,
+    "/sessions": QueryHandler._sessions,
+    "/status": QueryHandler._status,
+}
+
+
+def _int(params: dict[str, str], key: str, default: int, low: int, high: int | None) -> int:
+    if key not in params:
+        return default
+    try:
+        value = int(params[key])
+    except ValueError:
+        raise BadRequest(f"{key} must be an integer") from None
+    if value < low or (high is not None and value > high):
+        raise BadRequest(f"{key} must be between {low} and {high}" if high else f"{key} must be at least {low}")
+    return value
+
+
+def _range(params: dict[str, str]) -> tuple[datetime, datetime]:
+    # The same parameters and presets as the CLI's --range/--days/--start/--end.
+    try:
+        return resolve_range(
+            params.get("range", "today"),
+            int(params["days"]) if "days" in params else None,
+            date.fromisoformat(params["start"]) if "start" in params else None,
+            date.fromisoformat(params["end"]) if "end" in params else None,
+        )
+    except ValueError as exc:
+        raise BadRequest(str(exc)) from None
+
+
+def core_status(core) -> StatusSource:
+    # Reads the tracker's state from the request thread; active_session is
+    # replaced whole, never mutated, so one read sees a consistent session.
+    def status() -> dict:
+        active = core.active_session
+        session = None
+        if active is not None:
+            started = datetime.fromisoformat(active.start_ts)
+            session = {
+                "session_id": active.session_id,
+                "start_ts": active.start_ts,
+                "elapsed_sec": max(0, int((datetime.now(timezone.utc) - started).total_seconds())),
+                "process_name": active.process_name,
+                "window_title": active.window_title,
+                "category": active.category,
+            }
+        return {"tracking": not core.paused, "session": session}
+
+    return status
+
+
+def start_server(
+    port: int, status: StatusSource | None = None, db_path: Path = DB_PATH, token_path: Path = TOKEN_PATH
+) -> tuple[QueryServer | None, str]:
+    # The server, or None and why it isn't running. port 0 in the settings
+    # means off, which is not an error.
+    if port <= 0:
+        return None, ""
+    try:
+        server = QueryServer(db_path, port, status, token=load_token(token_path))
+    except (OSError, sqlite3.Error) as exc:
+        metrics.increment("query_server.start_failed")
+        return None, str(exc)
+    server.start()
+    return server, ""
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+# Presets are whole UTC days, except week, which is the last 7 days up to now.
+PRESETS = ("today", "yesterday", "week", "all")
+
+
+def resolve_range(
+    preset: str = "today",
+    days: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    now: datetime | None = None,
+) -> tuple[datetime, datetime]:
+    # start (with end, inclusive) wins over days, which wins over the preset.
+    if preset not in PRESETS:
+        raise ValueError(f"range must be one of {', '.join(PRESETS)}")
+    if days is not None and days < 0:
+        raise ValueError("days must be at least 0")
+    now = now or datetime.now(timezone.utc)
+    today = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
+    if start is not None:
+        first = datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc)
+        last = end or now.date()
+        return first, datetime.combine(last, datetime.min.time(), tzinfo=timezone.utc) + timedelta(days=1)
+    if days is not None:
+        return now - timedelta(days=days), now
+    if preset == "yesterday":
+        return today - timedelta(days=1), today
+    if preset == "week":
+        return now - timedelta(days=7), now
+    if preset == "all":
+        return datetime(1970, 1, 1, tzinfo=timezone.utc), now
+    return today, today + timedelta(days=1)
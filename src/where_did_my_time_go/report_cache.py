@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from where_did_my_time_go.storage import Database
+
+
+@dataclass
+class ReportTotals:
+    by_context: dict[tuple[str, str], int] = field(default_factory=dict)
+
+    def add(self, category: str, process_name: str, total: int) -> None:
+        key = (category, process_name)
+        self.by_context[key] = self.by_context.get(key, 0) + int(total)
+
+    def filtered(self, category_filter: str = "", app_filter: str = "") -> ReportTotals:
+        category_filter = category_filter.lower().strip()
+        app_filter = app_filter.lower().strip()
+        result = ReportTotals()
+        for (category, process_name), total in self.by_context.items():
+            if category_filter and category_filter not in category.lower():
+                continue
+            if app_filter and app_filter not in process_name.lower():
+                continue
+            result.by_context[(category, process_name)] = total
+        return result
+
+    def by_category(self) -> dict[str, int]:
+        totals: dict[str, int] = {}
+        for (category, _), total in self.by_context.items():
+            totals[category] = totals.get(category, 0) + total
+        return totals
+
+    def by_app(self) -> dict[str, int]:
+        totals: dict[str, int] = {}
+        for (_, process_name), total in self.by_context.items():
+            totals[process_name] = totals.get(process_name, 0) + total
+        return totals
+
+
+class ReportCache:
+    # With store=False (read-only connections) days missing from the cache
+    # are summed on the fly instead of being written back.
+    def __init__(self, db: Database, store: bool = True) -> None:
+        self._db = db
+        self._store = store
+
+    def totals(self, start: datetime, end: datetime, now: datetime | None = None) -> ReportTotals:
+        now = now or datetime.now(timezone.utc)
+        # Open-ended ranges ("all") would otherwise cache a rollup row for
+        # every day back to 1970.
+        first = self._db.first_session_start()
+        if first is None:
+            return ReportTotals()
+        start = max(start, _floor_day(datetime.fromisoformat(first)))
+        if start >= end:
+            return ReportTotals()
+        today_start = _floor_day(now)
+        first_closed = _ceil_day(start)
+        closed_end = min(_floor_day(end), today_start)
+
+        result = ReportTotals()
+        if first_closed >= closed_end:
+            self._add_live(result, start, end)
+            return result
+
+        if start < first_closed:
+            self._add_live(result, start, first_closed)
+        self._add_closed_days(result, first_closed, closed_end)
+        if closed_end < end:
+            self._add_live(result, closed_end, end)
+        return result
+
+    def daily_totals(self, start: datetime, end: datetime, now: datetime | None = None) -> dict[str, ReportTotals]:
+        # Totals per UTC day ("YYYY-MM-DD") for day-aligned bounds; days
+        # without sessions are left out. Closed days come from the rollups in
+        # one range read, today from one live aggregate.
+        now = now or datetime.now(timezone.utc)
+        first = self._db.first_session_start()
+        if first is None:
+            return {}
+        start = max(start, _floor_day(datetime.fromisoformat(first)))
+        today_start = _floor_day(now)
+        result: dict[str, ReportTotals] = {}
+        closed_end = min(end, today_start)
+        if start < closed_end:
+            for day, category, process_name, total in self._closed_rows(start, closed_end):
+                result.setdefault(day, ReportTotals()).add(category, process_name, total)
+        if start <= today_start < end:
+            today = ReportTotals()
+            self._add_live(today, today_start, today_start + timedelta(days=1))
+            if today.by_context:
+                result[today_start.date().isoformat()] = today
+        return result
+
+    def _add_live(self, result: ReportTotals, start: datetime, end: datetime) -> None:
+        for row in self._db.aggregate_range(start.isoformat(), end.isoformat()):
+            result.add(row["category"], row["process_name"], row["total"])
+
+    def _add_closed_days(self, result: ReportTotals, start: datetime, end: datetime) -> None:
+        for _, category, process_name, total in self._closed_rows(start, end):
+            result.add(category, process_name, total)
+
+    def _closed_rows(self, start: datetime, end: datetime) -> Iterator[tuple[str, str, str, int]]:
+        days = []
+        day = start
+        while day < end:
+            days.append(day.date().isoformat())
+            day += timedelta(days=1)
+        version = self._db.data_version()
+        cached = self._db.cached_rollup_days(days[0], days[-1], version)
+        missing = [day for day in days if day not in cached]
+        if missing and self._store:
+            self._db.rebuild_day_rollups(missing, version)
+            cached.update(missing)
+        for row in self._db.fetch_day_rollups(days[0], days[-1]):
+            if row["day"] in cached:
+                yield row["day"], row["category"], row["process_name"], row["total"]
+        for day in missing if not self._store else ():
+            day_start = datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+            end_ts = (day_start + timedelta(days=1)).isoformat()
+            for row in self._db.aggregate_range(day_start.isoformat(), end_ts):
+                yield day, row["category"], row["process_name"], row["total"]
+
+
+def _floor_day(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+
+
+def _ceil_day(value: datetime) -> datetime:
+    floor = _floor_day(value)
+    return floor if floor == value else floor + timedelta(days=1)
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
 import csv
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from PySide6.QtCharts import QBarCategoryAxis, QBarSeries, QBarSet, QChart, QChartView, QPieSeries
+from PySide6.QtCharts import (
+    QBarCategoryAxis,
+    QBarSeries,
+    QBarSet,
+    QChart,
+    QChartView,
+    QPieSeries,
+    QValueAxis,
+)
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
 from PySide6.QtWidgets import (
     QAbstractItemView,
     QComboBox,
@@ -14,13 +24,68 @@ from PySide6.QtWidgets import (
     QLabel,
     QLineEdit,
     QPushButton,
+    QTableView,
     QTableWidget,
     QTableWidgetItem,
     QVBoxLayout,
     QWidget,
 )
 
+from where_did_my_time_go.chart_model import BarChartModel, PieChartModel
+from where_did_my_time_go.comparison import PERIODS, compare_periods, format_change, sparkline
+from where_did_my_time_go.query import SESSION_COLUMNS, SessionQuery
+from where_did_my_time_go.report_cache import ReportCache
 from where_did_my_time_go.storage import Database
+from where_did_my_time_go.utils import format_duration
+
+HEADERS = ["Start", "End", "Duration", "Process", "Exe Path", "Title", "Category", "Intent"]
+COMPARE_HEADERS = ["Name", "This period", "Previous", "Change", "Trend"]
+SEARCH_LIMIT = 1000
+
+
+# Serves the session table straight from the row tuples instead of keeping a
+# QTableWidgetItem per cell.
+class SessionTableModel(QAbstractTableModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self._rows: list[tuple] = []
+        self._sort: tuple[int, Qt.SortOrder] | None = None
+
+    def set_rows(self, rows: list[tuple]) -> None:
+        self.beginResetModel()
+        self._rows = rows
+        if self._sort is not None:
+            self._sort_rows(*self._sort)
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        return "" if value is None else str(value)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder) -> None:
+        self.layoutAboutToBeChanged.emit()
+        self._sort = (column, order)
+        self._sort_rows(column, order)
+        self.layoutChanged.emit()
+
+    def _sort_rows(self, column: int, order: Qt.SortOrder) -> None:
+        self._rows.sort(
+            key=lambda row: "" if row[column] is None else row[column],
+            reverse=order == Qt.DescendingOrder,
+        )
 
 
 class ReportsWidget(QWidget):
@@ -28,6 +93,7 @@ class ReportsWidget(QWidget):
         super().__init__()
         self._db = Database()
         self._db.initialize()
+        self._cache = ReportCache(self._db)
 
         self.range_combo = QComboBox()
         self.range_combo.addItems(["Today", "Yesterday", "Last 7 Days", "Custom"])
@@ -44,21 +110,14 @@ class ReportsWidget(QWidget):
         self.category_filter.setPlaceholderText("Filter by category")
         self.app_filter = QLineEdit()
         self.app_filter.setPlaceholderText("Filter by app/process")
+        self.title_search = QLineEdit()
+        self.title_search.setPlaceholderText("Search window titles")
+        self.search_label = QLabel("")
         self.export_button = QPushButton("Export CSV")
 
-        self.table = QTableWidget(0, 8)
-        self.table.setHorizontalHeaderLabels(
-            [
-                "Start",
-                "End",
-                "Duration",
-                "Process",
-                "Exe Path",
-                "Title",
-                "Category",
-                "Intent",
-            ]
-        )
+        self.table_model = SessionTableModel()
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setSortingEnabled(True)
 
@@ -67,12 +126,35 @@ class ReportsWidget(QWidget):
         self.category_chart.addSeries(self.category_series)
         self.category_chart.setTitle("Category Breakdown")
         self.category_view = QChartView(self.category_chart)
+        self.category_model = PieChartModel(self.category_chart, self.category_series)
 
+        # The series, set and axes are built once; refreshes only change values.
         self.app_chart = QChart()
         self.app_series = QBarSeries()
+        self.app_set = QBarSet("Apps")
+        self.app_series.append(self.app_set)
         self.app_chart.addSeries(self.app_series)
         self.app_chart.setTitle("Top Apps")
+        self.app_axis = QBarCategoryAxis()
+        self.app_value_axis = QValueAxis()
+        self.app_value_axis.setLabelFormat("%d")
+        self.app_chart.addAxis(self.app_axis, Qt.AlignBottom)
+        self.app_chart.addAxis(self.app_value_axis, Qt.AlignLeft)
+        self.app_series.attachAxis(self.app_axis)
+        self.app_series.attachAxis(self.app_value_axis)
         self.app_view = QChartView(self.app_chart)
+        self.app_model = BarChartModel(self.app_chart, self.app_set, self.app_axis, self.app_value_axis)
+
+        self.compare_combo = QComboBox()
+        self.compare_combo.addItems([f"{name} vs previous" for name in PERIODS])
+        self.compare_combo.setCurrentIndex(list(PERIODS).index("Week"))
+        self.compare_by = QComboBox()
+        self.compare_by.addItems(["Category", "App"])
+        self.compare_label = QLabel("")
+        self.compare_table = QTableWidget(0, len(COMPARE_HEADERS))
+        self.compare_table.setHorizontalHeaderLabels(COMPARE_HEADERS)
+        self.compare_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.compare_table.verticalHeader().setVisible(False)
 
         range_layout = QHBoxLayout()
         range_layout.addWidget(QLabel("Range"))
@@ -85,12 +167,23 @@ class ReportsWidget(QWidget):
         filter_layout = QHBoxLayout()
         filter_layout.addWidget(self.category_filter)
         filter_layout.addWidget(self.app_filter)
+        filter_layout.addWidget(self.title_search)
+        filter_layout.addWidget(self.search_label)
+
+        compare_layout = QHBoxLayout()
+        compare_layout.addWidget(QLabel("Compare"))
+        compare_layout.addWidget(self.compare_combo)
+        compare_layout.addWidget(self.compare_by)
+        compare_layout.addWidget(self.compare_label)
+        compare_layout.addStretch()
 
         layout = QVBoxLayout(self)
         layout.addLayout(range_layout)
         layout.addLayout(filter_layout)
         layout.addWidget(self.category_view)
         layout.addWidget(self.app_view)
+        layout.addLayout(compare_layout)
+        layout.addWidget(self.compare_table)
         layout.addWidget(self.table)
 
         self.range_combo.currentTextChanged.connect(self.refresh)
@@ -98,11 +191,14 @@ class ReportsWidget(QWidget):
         self.end_date.dateChanged.connect(self.refresh)
         self.category_filter.textChanged.connect(self.refresh)
         self.app_filter.textChanged.connect(self.refresh)
+        self.title_search.textChanged.connect(self.refresh)
         self.export_button.clicked.connect(self.export_csv)
+        self.compare_combo.currentIndexChanged.connect(self.refresh_comparison)
+        self.compare_by.currentIndexChanged.connect(self.refresh_comparison)
 
         self.refresh()
 
-    def _get_range(self) -> tuple[str, str]:
+    def _get_bounds(self) -> tuple[datetime, datetime]:
         now = datetime.now(timezone.utc)
         selection = self.range_combo.currentText()
         if selection == "Today":
@@ -119,93 +215,80 @@ class ReportsWidget(QWidget):
             end = datetime.combine(self.end_date.date().toPython(), datetime.min.time()) + timedelta(days=1)
             start = start.replace(tzinfo=timezone.utc)
             end = end.replace(tzinfo=timezone.utc)
-        return start.isoformat(), end.isoformat()
+        return start, end
 
     def refresh(self) -> None:
-        start, end = self._get_range()
-        rows = self._db.fetch_sessions(start, end)
-
-        category_filter = self.category_filter.text().lower().strip()
-        app_filter = self.app_filter.text().lower().strip()
-
-        filtered = []
-        for row in rows:
-            if category_filter and category_filter not in row["category"].lower():
-                continue
-            if app_filter and app_filter not in row["process_name"].lower():
-                continue
-            filtered.append(row)
-
-        self.table.setRowCount(len(filtered))
-        for row_idx, row in enumerate(filtered):
-            values = [
-                row["start_ts"],
-                row["end_ts"],
-                str(row["duration_sec"]),
-                row["process_name"],
-                row["exe_path"],
-                row["window_title"],
-                row["category"],
-                row["intent_tag"] or "",
+        start_dt, end_dt = self._get_bounds()
+        query = self._query(start_dt, end_dt)
+        if query.search:
+            # The newest matches first, capped like the search results.
+            rows = self._db.select(replace(query, order_by=("-start_ts",), limit=SEARCH_LIMIT))
+            total, count = self._db.select(replace(query, aggregate=True, order_by=()))[0]
+            self.search_label.setText(f"{count} matches, {format_duration(int(total))}")
+        else:
+            rows = self._db.select(query)
+            self.search_label.setText("")
+        self.table_model.set_rows(rows)
+
+        totals = self._cache.totals(start_dt, end_dt).filtered(query.category_like, query.process_like)
+
+        self.category_model.update(totals.by_category())
+        self.app_model.update(totals.by_app())
+        self.refresh_comparison()
+
+    def refresh_comparison(self) -> None:
+        # Periods end with today whatever range is picked above; the
+        # category and app filters still apply.
+        period_days = list(PERIODS.values())[self.compare_combo.currentIndex()]
+        comparison = compare_periods(
+            self._cache,
+            period_days,
+            by=self.compare_by.currentText().lower(),
+            category_filter=self.category_filter.text(),
+            app_filter=self.app_filter.text(),
+        )
+        current, previous = comparison.current_total, comparison.previous_total
+        self.compare_label.setText(f"{format_duration(current)} so far vs {format_duration(previous)}")
+        self.compare_table.setRowCount(len(comparison.rows))
+        for index, row in enumerate(comparison.rows):
+            sign = "-" if row.delta_sec < 0 else "+"
+            change = f"{sign}{format_duration(abs(row.delta_sec))}"
+            if format_change(row):
+                change += f" ({format_change(row)})"
+            cells = [
+                row.name or "(none)",
+                format_duration(row.current_sec),
+                format_duration(row.previous_sec),
+                change,
+                sparkline(row.daily),
             ]
-            for col, value in enumerate(values):
-                item = QTableWidgetItem(value)
-                self.table.setItem(row_idx, col, item)
-
-        self.category_series.clear()
-        totals = {}
-        for row in filtered:
-            totals[row["category"]] = totals.get(row["category"], 0) + row["duration_sec"]
-        for category, total in totals.items():
-            self.category_series.append(category, float(total))
-
-        self.app_series.clear()
-        app_totals = {}
-        for row in filtered:
-            app_totals[row["process_name"]] = app_totals.get(row["process_name"], 0) + row["duration_sec"]
-        top_apps = sorted(app_totals.items(), key=lambda item: item[1], reverse=True)[:10]
-        bar_set = QBarSet("Apps")
-        labels = []
-        for app, total in top_apps:
-            bar_set.append(total)
-            labels.append(app)
-        self.app_series.append(bar_set)
-        axis = QBarCategoryAxis()
-        axis.append(labels)
-        self.app_chart.removeAxis(self.app_chart.axisX()) if self.app_chart.axisX() else None
-        self.app_chart.createDefaultAxes()
-        self.app_chart.setAxisX(axis, self.app_series)
+            for column, text in enumerate(cells):
+                self.compare_table.setItem(index, column, QTableWidgetItem(text))
+
+    def _query(self, start: datetime, end: datetime) -> SessionQuery:
+        return SessionQuery(
+            start.isoformat(),
+            end.isoformat(),
+            category_like=self.category_filter.text().strip(),
+            process_like=self.app_filter.text().strip(),
+            search=self.title_search.text().strip(),
+            order_by=("start_ts",),
+        )
+
+    def release(self) -> None:
+        # Called while the window sits in the tray; the next refresh reloads.
+        self.table_model.set_rows([])
+        self.category_model.clear()
+        self.app_model.clear()
+        self.compare_table.setRowCount(0)
 
     def export_csv(self) -> None:
-        start, end = self._get_range()
-        rows = self._db.fetch_sessions(start, end)
+        # Exports what the table shows, without its cap on search results.
+        query = self._query(*self._get_bounds())
         path, _ = QFileDialog.getSaveFileName(self, "Export CSV", str(Path.home() / "sessions.csv"), "CSV Files (*.csv)")
         if not path:
             return
         with open(path, "w", newline="", encoding="utf-8") as handle:
             writer = csv.writer(handle)
-            writer.writerow(
-                [
-                    "start_ts",
-                    "end_ts",
-                    "duration_sec",
-                    "process_name",
-                    "exe_path",
-                    "window_title",
-                    "category",
-                    "intent_tag",
-                ]
-            )
-            for row in rows:
-                writer.writerow(
-                    [
-                        row["start_ts"],
-                        row["end_ts"],
-                        row["duration_sec"],
-                        row["process_name"],
-                        row["exe_path"],
-                        row["window_title"],
-                        row["category"],
-                        row["intent_tag"],
-                    ]
-                )
+            writer.writerow(SESSION_COLUMNS)
+            writer.writerows(self._db.iter_select(query))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.storage import Database
+
+
+@dataclass
+class RollupResult:
+    databases: int = 0
+    sessions: int = 0
+    by_category: dict[str, int] = field(default_factory=dict)
+    by_app: dict[str, int] = field(default_factory=dict)
+    by_day: dict[tuple[str, str], int] = field(default_factory=dict)
+    errors: list[tuple[str, str]] = field(default_factory=list)
+
+    def merge(self, other: RollupResult) -> None:
+        self.databases += other.databases
+        self.sessions += other.sessions
+        _add_totals(self.by_category, other.by_category)
+        _add_totals(self.by_app, other.by_app)
+        _add_totals(self.by_day, other.by_day)
+        self.errors.extend(other.errors)
+
+
+def _add_totals(target: dict, source: dict) -> None:
+    for key, total in source.items():
+        target[key] = target.get(key, 0) + total
+
+
+def aggregate_database(path: str, start_ts: str, end_ts: str) -> RollupResult:
+    result = RollupResult()
+    try:
+        db = Database(Path(path), read_only=True)
+    except Exception as exc:
+        result.errors.append((path, str(exc)))
+        return result
+    try:
+        # Each query streams grouped rows from SQLite, so memory stays bounded
+        # by the number of distinct categories/apps/days, not sessions.
+        query = SessionQuery(start_ts, end_ts)
+        for category, total, count in db.iter_select(replace(query, group_by=("category",))):
+            result.by_category[category] = int(total)
+            result.sessions += count
+        for process_name, total, _ in db.iter_select(replace(query, group_by=("process_name",))):
+            result.by_app[process_name] = int(total)
+        for day, category, total, _ in db.iter_select(replace(query, group_by=("day", "category"))):
+            result.by_day[(day, category)] = int(total)
+        result.databases = 1
+    except Exception as exc:
+        result = RollupResult(errors=[(path, str(exc))])
+    finally:
+        db.close()
+    return result
+
+
+def iter_partials(
+    paths: Iterable[Path], start_ts: str, end_ts: str, workers: int | None = None
+) -> Iterator[RollupResult]:
+    paths = [str(path) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            yield aggregate_database(path, start_ts, end_ts)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = [pool.submit(aggregate_database, path, start_ts, end_ts) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def aggregate_many(
+    paths: Iterable[Path], start_ts: str, end_ts: str, workers: int | None = None
+) -> RollupResult:
+    merged = RollupResult()
+    for partial in iter_partials(paths, start_ts, end_ts, workers):
+        merged.merge(partial)
+    return merged
@@ -16,7 +16,7 @@ DEFAULT_CATEGORIES = [
 ]
 
 
-@dataclass
+@dataclass(slots=True)
 class Rule:
     rule_id: int
     enabled: bool
@@ -27,7 +27,7 @@ class Rule:
     priority: int
 
 
-@dataclass
+@dataclass(slots=True)
 class AppContext:
     process_name: str
     window_title: str
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import threading
+from dataclasses import asdict, dataclass
+from typing import Callable
 
+from PySide6.QtCore import QObject, QThread, QTimer, Signal, Slot
 from PySide6.QtWidgets import (
     QAbstractItemView,
+    QApplication,
     QCheckBox,
     QComboBox,
     QDialog,
@@ -20,8 +24,11 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from where_did_my_time_go.context_catalog import ContextCatalog, RulePreview, preview_rule
 from where_did_my_time_go.rules import DEFAULT_CATEGORIES, AppContext, Rule, apply_rules
 from where_did_my_time_go.storage import Database
+from where_did_my_time_go.suggestions import Suggestion, SuggestionEngine
+from where_did_my_time_go.utils import format_duration
 from where_did_my_time_go.win_api import get_foreground_app
 
 
@@ -35,8 +42,18 @@ class RuleFormData:
     priority: int
 
 
+PREVIEW_DAYS = 30
+# Preview shortly after typing stops rather than on every keystroke.
+PREVIEW_DELAY_MS = 150
+
+
 class RuleDialog(QDialog):
-    def __init__(self, parent: QWidget | None = None, data: RuleFormData | None = None) -> None:
+    def __init__(
+        self,
+        parent: QWidget | None = None,
+        data: RuleFormData | None = None,
+        preview: Callable[[RuleFormData], RulePreview] | None = None,
+    ) -> None:
         super().__init__(parent)
         self.setWindowTitle("Rule")
         self.enabled_check = QCheckBox("Enabled")
@@ -61,8 +78,12 @@ class RuleDialog(QDialog):
         buttons.accepted.connect(self.accept)
         buttons.rejected.connect(self.reject)
 
+        self.preview_label = QLabel("")
+        self.preview_label.setWordWrap(True)
+
         layout = QVBoxLayout(self)
         layout.addLayout(form)
+        layout.addWidget(self.preview_label)
         layout.addWidget(buttons)
 
         if data:
@@ -73,6 +94,38 @@ class RuleDialog(QDialog):
             self.category.setCurrentText(data.category)
             self.priority.setText(str(data.priority))
 
+        self._preview = preview
+        if preview is not None:
+            self._preview_timer = QTimer(self)
+            self._preview_timer.setSingleShot(True)
+            self._preview_timer.setInterval(PREVIEW_DELAY_MS)
+            self._preview_timer.timeout.connect(self.update_preview)
+            self.enabled_check.toggled.connect(self._preview_timer.start)
+            self.match_type.currentTextChanged.connect(self._preview_timer.start)
+            self.process_pattern.textChanged.connect(self._preview_timer.start)
+            self.title_pattern.textChanged.connect(self._preview_timer.start)
+            self.category.currentTextChanged.connect(self._preview_timer.start)
+            self.priority.textChanged.connect(self._preview_timer.start)
+            self.update_preview()
+
+    def update_preview(self) -> None:
+        try:
+            data = self.data()
+        except ValueError:
+            self.preview_label.setText("Priority must be a number.")
+            return
+        result = self._preview(data)
+        if not result.changes:
+            self.preview_label.setText(f"No recorded time in the last {result.days} days would change category.")
+            return
+        lines = [
+            f"Would recategorize {format_duration(result.total)} over the last {result.days} days "
+            f"({result.contexts} contexts):"
+        ]
+        for (old, new), seconds in sorted(result.changes.items(), key=lambda item: -item[1])[:5]:
+            lines.append(f"{old} → {new}: {format_duration(seconds)}")
+        self.preview_label.setText("\n".join(lines))
+
     def data(self) -> RuleFormData:
         return RuleFormData(
             enabled=self.enabled_check.isChecked(),
@@ -84,11 +137,39 @@ class RuleDialog(QDialog):
         )
 
 
+SUGGESTION_LIMIT = 15
+
+
+# Scans on its own thread and connection; the index it builds persists, so
+# only the first scan of a long history takes a while.
+class SuggestionWorker(QObject):
+    progress = Signal(int)
+    finished = Signal(object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._db = Database(check_same_thread=False)
+        self._db.initialize()
+        self._engine = SuggestionEngine(self._db)
+        self.stopping = threading.Event()
+
+    @Slot()
+    def run(self) -> None:
+        self._engine.scan(self.stopping.is_set, self.progress.emit)
+        if self.stopping.is_set():
+            return
+        rules = [Rule(**dict(row)) for row in self._db.list_rules()]
+        self.finished.emit(self._engine.suggestions(rules, SUGGESTION_LIMIT))
+
+
 class RulesWidget(QWidget):
+    suggest_requested = Signal()
+
     def __init__(self) -> None:
         super().__init__()
         self._db = Database()
         self._db.initialize()
+        self._catalog = ContextCatalog(self._db)
 
         self.table = QTableWidget(0, 7)
         self.table.setHorizontalHeaderLabels(
@@ -109,6 +190,7 @@ class RulesWidget(QWidget):
         edit_button = QPushButton("Edit")
         delete_button = QPushButton("Delete")
         test_button = QPushButton("Test on Current App")
+        self.suggest_button = QPushButton("Suggest Rules")
 
         button_layout = QHBoxLayout()
         button_layout.addWidget(add_button)
@@ -116,15 +198,29 @@ class RulesWidget(QWidget):
         button_layout.addWidget(delete_button)
         button_layout.addStretch()
         button_layout.addWidget(test_button)
+        button_layout.addWidget(self.suggest_button)
+
+        self.suggestion_label = QLabel("")
+        self.suggestion_table = QTableWidget(0, 5)
+        self.suggestion_table.setHorizontalHeaderLabels(["Process", "Title Contains", "Time", "Share", "Example"])
+        self.suggestion_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.suggestion_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.suggestion_table.hide()
+        self.suggestion_table.cellDoubleClicked.connect(self.accept_suggestion)
+        self._suggestions: list[Suggestion] = []
+        self._suggestion_thread: QThread | None = None
 
         layout = QVBoxLayout(self)
         layout.addLayout(button_layout)
         layout.addWidget(self.table)
+        layout.addWidget(self.suggestion_label)
+        layout.addWidget(self.suggestion_table)
 
-        add_button.clicked.connect(self.add_rule)
+        add_button.clicked.connect(lambda: self.add_rule())
         edit_button.clicked.connect(self.edit_rule)
         delete_button.clicked.connect(self.delete_rule)
         test_button.clicked.connect(self.test_rule)
+        self.suggest_button.clicked.connect(self.suggest_rules)
 
         self.refresh()
 
@@ -151,19 +247,31 @@ class RulesWidget(QWidget):
         rule_id_item = selected[-1]
         return int(rule_id_item.text())
 
-    def add_rule(self) -> None:
-        dialog = RuleDialog(self)
-        if dialog.exec() == QDialog.Accepted:
-            data = dialog.data()
-            self._db.add_rule(
-                data.enabled,
-                data.match_type,
-                data.process_pattern,
-                data.title_pattern,
-                data.category,
-                data.priority,
-            )
-            self.refresh()
+    def _preview_for(self, rule_id: int | None) -> Callable[[RuleFormData], RulePreview]:
+        # The catalog is read once per dialog; each keystroke only re-matches
+        # the distinct contexts in memory. A new rule sorts after existing
+        # ones of the same priority, like apply_rules.
+        rules = [Rule(**dict(row)) for row in self._db.list_rules()]
+        if rule_id is None:
+            rule_id = max((rule.rule_id for rule in rules), default=0) + 1
+        contexts = self._catalog.contexts(PREVIEW_DAYS)
+        return lambda data: preview_rule(Rule(rule_id, **asdict(data)), rules, contexts, PREVIEW_DAYS)
+
+    def add_rule(self, data: RuleFormData | None = None) -> bool:
+        dialog = RuleDialog(self, data, preview=self._preview_for(None))
+        if dialog.exec() != QDialog.Accepted:
+            return False
+        data = dialog.data()
+        self._db.add_rule(
+            data.enabled,
+            data.match_type,
+            data.process_pattern,
+            data.title_pattern,
+            data.category,
+            data.priority,
+        )
+        self.refresh()
+        return True
 
     def edit_rule(self) -> None:
         rule_id = self._selected_rule_id()
@@ -181,7 +289,7 @@ class RulesWidget(QWidget):
             category=row["category"],
             priority=row["priority"],
         )
-        dialog = RuleDialog(self, data)
+        dialog = RuleDialog(self, data, preview=self._preview_for(rule_id))
         if dialog.exec() == QDialog.Accepted:
             updated = dialog.data()
             self._db.update_rule(
@@ -207,3 +315,61 @@ class RulesWidget(QWidget):
         rules = [Rule(**dict(row)) for row in self._db.list_rules()]
         category = apply_rules(rules, AppContext(app.process_name, app.window_title))
         QMessageBox.information(self, "Rule Test", f"Current app matches category: {category}")
+
+    def suggest_rules(self) -> None:
+        if self._suggestion_thread is None:
+            self._suggestion_thread = QThread()
+            self._suggestion_worker = SuggestionWorker()
+            self._suggestion_worker.moveToThread(self._suggestion_thread)
+            self.suggest_requested.connect(self._suggestion_worker.run)
+            self._suggestion_worker.progress.connect(self._on_suggestion_progress)
+            self._suggestion_worker.finished.connect(self._on_suggestions)
+            self._suggestion_thread.start()
+            QApplication.instance().aboutToQuit.connect(self._stop_suggestions)
+        self.suggest_button.setEnabled(False)
+        self.suggestion_label.setText("Scanning uncategorized time...")
+        self.suggest_requested.emit()
+
+    def _on_suggestion_progress(self, scanned: int) -> None:
+        self.suggestion_label.setText(f"Scanning uncategorized time... {scanned:,} new sessions")
+
+    def _on_suggestions(self, suggestions: list[Suggestion]) -> None:
+        self._suggestions = suggestions
+        self.suggest_button.setEnabled(True)
+        if not suggestions:
+            self.suggestion_label.setText("No suggestions: no uncategorized time left that a rule would catch.")
+            self.suggestion_table.hide()
+            return
+        self.suggestion_label.setText("Suggested rules for time in \"Other\" (double-click to add):")
+        self.suggestion_table.setRowCount(len(suggestions))
+        for row_idx, suggestion in enumerate(suggestions):
+            values = [
+                suggestion.rule.process_pattern or "",
+                suggestion.rule.title_pattern or "",
+                format_duration(suggestion.seconds),
+                f"{suggestion.share:.0%}",
+                suggestion.example,
+            ]
+            for col, value in enumerate(values):
+                self.suggestion_table.setItem(row_idx, col, QTableWidgetItem(value))
+        self.suggestion_table.show()
+
+    def accept_suggestion(self, row: int, _column: int = 0) -> None:
+        rule = self._suggestions[row].rule
+        data = RuleFormData(
+            enabled=True,
+            match_type=rule.match_type,
+            process_pattern=rule.process_pattern,
+            title_pattern=rule.title_pattern,
+            category=rule.category,
+            priority=rule.priority,
+        )
+        if self.add_rule(data):
+            # Drops suggestions the new rule now covers; the scan itself is
+            # incremental, so this is quick.
+            self.suggest_rules()
+
+    def _stop_suggestions(self) -> None:
+        self._suggestion_worker.stopping.set()
+        self._suggestion_thread.quit()
+        self._suggestion_thread.wait()
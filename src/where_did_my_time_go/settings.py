@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import time
 from typing import Iterable
 
@@ -13,10 +13,19 @@ DEFAULT_SETTINGS = {
     "idle_threshold_min": 3,
     "retention_days": 0,
     "close_to_tray": True,
+    "start_minimized": False,
+    "storage_mode": "sessions",
     "focus_start": "09:00",
     "focus_end": "17:00",
     "prompts_enabled": True,
     "distraction_categories": json.dumps(["Social", "Video", "Gaming"]),
+    "budgets": json.dumps({}),
+    "budgets_focus_only": True,
+    "backup_interval_hours": 24,
+    "backup_keep": 7,
+    "backup_quick_check": True,
+    "api_port": 0,
+    "export_sinks": json.dumps([]),
 }
 
 
@@ -26,10 +35,23 @@ class Settings:
     idle_threshold_min: int
     retention_days: int
     close_to_tray: bool
+    start_minimized: bool
+    storage_mode: str
     focus_start: time
     focus_end: time
     prompts_enabled: bool
     distraction_categories: list[str]
+    # Daily limit in minutes per category.
+    budgets: dict[str, int] = field(default_factory=dict)
+    budgets_focus_only: bool = True
+    # 0 turns scheduled backups off.
+    backup_interval_hours: int = 24
+    backup_keep: int = 7
+    backup_quick_check: bool = True
+    # Loopback port of the read-only query API; 0 keeps it off.
+    api_port: int = 0
+    # Where closed sessions are pushed; see exporter.sink_from_spec.
+    export_sinks: list[str] = field(default_factory=list)
 
 
 class SettingsStore:
@@ -40,6 +62,8 @@ class SettingsStore:
             idle_threshold_min=3,
             retention_days=0,
             close_to_tray=True,
+            start_minimized=False,
+            storage_mode="sessions",
             focus_start=time(9, 0),
             focus_end=time(17, 0),
             prompts_enabled=True,
@@ -66,10 +90,19 @@ class SettingsStore:
             "idle_threshold_min": self._settings.idle_threshold_min,
             "retention_days": self._settings.retention_days,
             "close_to_tray": int(self._settings.close_to_tray),
+            "start_minimized": int(self._settings.start_minimized),
+            "storage_mode": self._settings.storage_mode,
             "focus_start": self._settings.focus_start.strftime("%H:%M"),
             "focus_end": self._settings.focus_end.strftime("%H:%M"),
             "prompts_enabled": int(self._settings.prompts_enabled),
             "distraction_categories": json.dumps(self._settings.distraction_categories),
+            "budgets": json.dumps(self._settings.budgets),
+            "budgets_focus_only": int(self._settings.budgets_focus_only),
+            "backup_interval_hours": self._settings.backup_interval_hours,
+            "backup_keep": self._settings.backup_keep,
+            "backup_quick_check": int(self._settings.backup_quick_check),
+            "api_port": self._settings.api_port,
+            "export_sinks": json.dumps(self._settings.export_sinks),
         }
         for key, value in data.items():
             self._db.set_setting(key, str(value))
@@ -84,16 +117,34 @@ class SettingsStore:
         focus_end: time,
         prompts_enabled: bool,
         distraction_categories: Iterable[str],
+        start_minimized: bool = False,
+        storage_mode: str = "sessions",
+        budgets: dict[str, int] | None = None,
+        budgets_focus_only: bool = True,
+        backup_interval_hours: int = 24,
+        backup_keep: int = 7,
+        backup_quick_check: bool = True,
+        api_port: int = 0,
+        export_sinks: Iterable[str] = (),
     ) -> None:
         self._settings = Settings(
             sampling_interval_sec=sampling_interval_sec,
             idle_threshold_min=idle_threshold_min,
             retention_days=retention_days,
             close_to_tray=close_to_tray,
+            start_minimized=start_minimized,
+            storage_mode=storage_mode,
             focus_start=focus_start,
             focus_end=focus_end,
             prompts_enabled=prompts_enabled,
             distraction_categories=list(distraction_categories),
+            budgets=dict(budgets or {}),
+            budgets_focus_only=budgets_focus_only,
+            backup_interval_hours=backup_interval_hours,
+            backup_keep=backup_keep,
+            backup_quick_check=backup_quick_check,
+            api_port=api_port,
+            export_sinks=list(export_sinks),
         )
         self.save()
 
@@ -112,6 +163,10 @@ class SettingsStore:
             self._settings.retention_days = int(value)
         elif key == "close_to_tray":
             self._settings.close_to_tray = self._parse_bool(value)
+        elif key == "start_minimized":
+            self._settings.start_minimized = self._parse_bool(value)
+        elif key == "storage_mode":
+            self._settings.storage_mode = value
         elif key == "focus_start":
             hour, minute = [int(part) for part in value.split(":")]
             self._settings.focus_start = time(hour, minute)
@@ -122,3 +177,17 @@ class SettingsStore:
             self._settings.prompts_enabled = self._parse_bool(value)
         elif key == "distraction_categories":
             self._settings.distraction_categories = json.loads(value)
+        elif key == "budgets":
+            self._settings.budgets = json.loads(value)
+        elif key == "budgets_focus_only":
+            self._settings.budgets_focus_only = self._parse_bool(value)
+        elif key == "backup_interval_hours":
+            self._settings.backup_interval_hours = int(value)
+        elif key == "backup_keep":
+            self._settings.backup_keep = int(value)
+        elif key == "backup_quick_check":
+            self._settings.backup_quick_check = self._parse_bool(value)
+        elif key == "api_port":
+            self._settings.api_port = int(value)
+        elif key == "export_sinks":
+            self._settings.export_sinks = json.loads(value)
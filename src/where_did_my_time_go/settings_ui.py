@@ -4,15 +4,19 @@ from datetime import time
 
 from PySide6.QtWidgets import (
     QCheckBox,
+    QComboBox,
     QFormLayout,
     QGroupBox,
     QLineEdit,
+    QMessageBox,
     QPushButton,
     QTimeEdit,
     QVBoxLayout,
     QWidget,
 )
 
+from where_did_my_time_go.eventlog import STORAGE_MODES
+from where_did_my_time_go.goals import format_budgets, parse_budgets
 from where_did_my_time_go.rules import DEFAULT_CATEGORIES
 from where_did_my_time_go.settings import SettingsStore
 
@@ -26,10 +30,33 @@ class SettingsWidget(QWidget):
         self.idle_threshold = QLineEdit()
         self.retention_days = QLineEdit()
         self.close_to_tray = QCheckBox("Close to tray")
+        self.start_minimized = QCheckBox("Start minimized to tray")
+        self.storage_mode = QComboBox()
+        self.storage_mode.addItems(list(STORAGE_MODES))
+        self.storage_mode.setToolTip(
+            "events: log focus changes only and write far less often (applies after restart)"
+        )
 
         self.focus_start = QTimeEdit()
         self.focus_end = QTimeEdit()
         self.prompts_enabled = QCheckBox("Enable prompts")
+        self.budgets = QLineEdit()
+        self.budgets.setPlaceholderText("Social=45, Video=30")
+        self.budgets.setToolTip("Daily limits in minutes; the tray warns once a category reaches its limit")
+        self.budgets_focus_only = QCheckBox("Budgets count focus hours only")
+        self.backup_interval = QLineEdit()
+        self.backup_keep = QLineEdit()
+        self.backup_quick_check = QCheckBox("Check each backup for corruption")
+        self.api_port = QLineEdit()
+        self.api_port.setToolTip(
+            "Serves read-only summary, top-apps, sessions and status JSON on 127.0.0.1 (applies after restart)"
+        )
+        self.export_sinks = QLineEdit()
+        self.export_sinks.setPlaceholderText("jsonl:C:\\exports\\sessions.jsonl; tcp:127.0.0.1:9000")
+        self.export_sinks.setToolTip(
+            "Push each closed session to jsonl:<file>, dir:<folder>, tcp:<host>:<port> or unix:<path>, "
+            "separated by ';' (applies after restart)"
+        )
         self.category_checks = []
 
         self.save_button = QPushButton("Save Settings")
@@ -40,12 +67,24 @@ class SettingsWidget(QWidget):
         tracking_layout.addRow("Idle threshold (min)", self.idle_threshold)
         tracking_layout.addRow("Retention days (0=keep)", self.retention_days)
         tracking_layout.addRow("", self.close_to_tray)
+        tracking_layout.addRow("", self.start_minimized)
+        tracking_layout.addRow("Storage mode", self.storage_mode)
+        tracking_layout.addRow("Query API port (0=off)", self.api_port)
+        tracking_layout.addRow("Export sessions to", self.export_sinks)
 
         focus_group = QGroupBox("Focus Mode")
         focus_layout = QFormLayout(focus_group)
         focus_layout.addRow("Start", self.focus_start)
         focus_layout.addRow("End", self.focus_end)
         focus_layout.addRow("", self.prompts_enabled)
+        focus_layout.addRow("Daily budgets (min)", self.budgets)
+        focus_layout.addRow("", self.budgets_focus_only)
+
+        backup_group = QGroupBox("Backups")
+        backup_layout = QFormLayout(backup_group)
+        backup_layout.addRow("Every (hours, 0=off)", self.backup_interval)
+        backup_layout.addRow("Keep", self.backup_keep)
+        backup_layout.addRow("", self.backup_quick_check)
 
         categories_group = QGroupBox("Distraction Categories")
         categories_layout = QVBoxLayout(categories_group)
@@ -59,6 +98,7 @@ class SettingsWidget(QWidget):
         layout = QVBoxLayout(self)
         layout.addWidget(tracking_group)
         layout.addWidget(focus_group)
+        layout.addWidget(backup_group)
         layout.addWidget(categories_group)
         layout.addWidget(self.save_button)
 
@@ -71,22 +111,45 @@ class SettingsWidget(QWidget):
         self.idle_threshold.setText(str(data.idle_threshold_min))
         self.retention_days.setText(str(data.retention_days))
         self.close_to_tray.setChecked(data.close_to_tray)
+        self.start_minimized.setChecked(data.start_minimized)
+        self.storage_mode.setCurrentText(data.storage_mode)
         self.focus_start.setTime(data.focus_start)
         self.focus_end.setTime(data.focus_end)
         self.prompts_enabled.setChecked(data.prompts_enabled)
+        self.budgets.setText(format_budgets(data.budgets))
+        self.budgets_focus_only.setChecked(data.budgets_focus_only)
+        self.backup_interval.setText(str(data.backup_interval_hours))
+        self.backup_keep.setText(str(data.backup_keep))
+        self.backup_quick_check.setChecked(data.backup_quick_check)
+        self.api_port.setText(str(data.api_port))
+        self.export_sinks.setText("; ".join(data.export_sinks))
         for check in self.category_checks:
             check.setChecked(check.text() in data.distraction_categories)
 
     def save_settings(self) -> None:
+        try:
+            budgets = parse_budgets(self.budgets.text())
+        except ValueError as exc:
+            QMessageBox.warning(self, "Daily budgets", str(exc))
+            return
         self._settings.update(
             sampling_interval_sec=int(self.sampling_interval.text() or "1"),
             idle_threshold_min=int(self.idle_threshold.text() or "3"),
             retention_days=int(self.retention_days.text() or "0"),
             close_to_tray=self.close_to_tray.isChecked(),
+            start_minimized=self.start_minimized.isChecked(),
+            storage_mode=self.storage_mode.currentText(),
             focus_start=self.focus_start.time().toPython(),
             focus_end=self.focus_end.time().toPython(),
             prompts_enabled=self.prompts_enabled.isChecked(),
             distraction_categories=[
                 check.text() for check in self.category_checks if check.isChecked()
             ],
+            budgets=budgets,
+            budgets_focus_only=self.budgets_focus_only.isChecked(),
+            backup_interval_hours=int(self.backup_interval.text() or "0"),
+            backup_keep=max(1, int(self.backup_keep.text() or "1")),
+            backup_quick_check=self.backup_quick_check.isChecked(),
+            api_port=int(self.api_port.text() or "0"),
+            export_sinks=[spec.strip() for spec in self.export_sinks.text().split(";") if spec.strip()],
         )
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, time as time_of_day, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from where_did_my_time_go.clock import VirtualClock
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.settings import Settings
+from where_did_my_time_go.storage import Database
+from where_did_my_time_go.tracker_core import TrackerCore
+
+SOAK_START = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+
+@dataclass(slots=True)
+class ScriptedApp:
+    process_name: str
+    window_title: str
+    exe_path: str
+
+
+DEFAULT_APPS = [
+    ("code.exe", "{} - Visual Studio Code", "C:/Program Files/VS Code/code.exe"),
+    ("chrome.exe", "YouTube - video {}", "C:/Program Files/Google/chrome.exe"),
+    ("chrome.exe", "Pull request #{} - GitHub", "C:/Program Files/Google/chrome.exe"),
+    ("slack.exe", "#channel-{} - Slack", "C:/Users/me/AppData/slack.exe"),
+    ("outlook.exe", "Inbox ({}) - Outlook", "C:/Program Files/Office/outlook.exe"),
+    ("spotify.exe", "Track {}", "C:/Users/me/AppData/spotify.exe"),
+]
+
+
+# Deterministic stand-in for win_api, driven by a VirtualClock. Focus hops
+# between a fixed set of apps with varying titles, and now and then the user
+# walks away for a while.
+class ScriptedDesktop:
+    def __init__(
+        self,
+        clock: VirtualClock,
+        seed: int = 0,
+        mean_focus_sec: float = 120.0,
+        idle_chance: float = 0.03,
+        idle_sec: tuple[int, int] = (300, 2400),
+        titles: int = 40,
+    ) -> None:
+        self._clock = clock
+        self._random = random.Random(seed)
+        self._mean_focus_sec = mean_focus_sec
+        self._idle_chance = idle_chance
+        self._idle_sec = idle_sec
+        self._titles = titles
+        self._app = self._pick()
+        self._next_switch = clock.monotonic()
+        self._idle_since: float | None = None
+        self._idle_until = 0.0
+        self.switches = 0
+
+    def foreground(self) -> ScriptedApp:
+        now = self._clock.monotonic()
+        if now >= self._next_switch:
+            self._app = self._pick()
+            self._next_switch = now + max(1.0, self._random.expovariate(1 / self._mean_focus_sec))
+            self.switches += 1
+            if self._random.random() < self._idle_chance:
+                self._idle_since = now
+                self._idle_until = now + self._random.randint(*self._idle_sec)
+        return self._app
+
+    def idle_seconds(self) -> int:
+        now = self._clock.monotonic()
+        if self._idle_since is None:
+            return 0
+        if now >= self._idle_until:
+            self._idle_since = None
+            return 0
+        return int(now - self._idle_since)
+
+    def _pick(self) -> ScriptedApp:
+        process_name, title, exe_path = self._random.choice(DEFAULT_APPS)
+        return ScriptedApp(process_name, title.format(self._random.randrange(self._titles)), exe_path)
+
+
+def simulated_settings(storage_mode: str = "sessions") -> SimpleNamespace:
+    return SimpleNamespace(
+        current=Settings(
+            sampling_interval_sec=1,
+            idle_threshold_min=3,
+            retention_days=0,
+            close_to_tray=True,
+            start_minimized=False,
+            storage_mode=storage_mode,
+            focus_start=time_of_day(9, 0),
+            focus_end=time_of_day(17, 0),
+            prompts_enabled=True,
+            distraction_categories=["Video"],
+        )
+    )
+
+
+def rss_bytes() -> int | None:
+    # Linux only; the soak harness targets CI boxes.
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * 4096
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class HourSample:
+    ticks: int
+    cpu_per_tick: float
+    rows: int
+    db_bytes: int
+    rss_bytes: int | None
+    blocks: int
+    # Bytes allocated above the live heap, summed over ticks; tracing only.
+    allocated: int = 0
+
+
+# Runs the real tracking loop, storage, classification and idle handling on
+# a VirtualClock against a ScriptedDesktop, one simulated hour at a time.
+# Alongside the database it counts the focus/idle states the tracker saw, so
+# the resulting rows can be checked against what actually happened.
+class Soak:
+    def __init__(
+        self,
+        db_path: Path,
+        storage_mode: str = "sessions",
+        seed: int = 0,
+        trace: bool = False,
+    ) -> None:
+        self.db_path = db_path
+        self.clock = VirtualClock(SOAK_START)
+        self.desktop = ScriptedDesktop(self.clock, seed=seed)
+        self.settings = simulated_settings(storage_mode)
+        self.db = Database(db_path, check_same_thread=False)
+        self.core = TrackerCore(
+            self.settings,
+            self.db,
+            foreground=self._foreground,
+            idle_seconds=self._idle_seconds,
+            clock=self.clock,
+        )
+        self.trace = trace
+        self.samples: list[HourSample] = []
+        self.transitions = 0
+        self._state: tuple[str, str] | None = None
+        self._idle = False
+        self._app: ScriptedApp | None = None
+
+    def _idle_seconds(self) -> int:
+        seconds = self.desktop.idle_seconds()
+        self._idle = seconds >= self.settings.current.idle_threshold_min * 60
+        return seconds
+
+    def _foreground(self) -> ScriptedApp:
+        self._app = self.desktop.foreground()
+        return self._app
+
+    def _observe(self) -> None:
+        state = ("Idle", "") if self._idle else (self._app.process_name, self._app.window_title)
+        if state != self._state:
+            self.transitions += 1
+            self._state = state
+
+    def run_hour(self) -> HourSample:
+        ticks = allocated = 0
+        end = self.clock.monotonic() + 3600
+        cpu = time.process_time()
+        while self.clock.monotonic() < end:
+            if self.trace:
+                tracemalloc.reset_peak()
+                live = tracemalloc.get_traced_memory()[0]
+            interval = self.core.tick()
+            if self.trace:
+                allocated += tracemalloc.get_traced_memory()[1] - live
+            self._observe()
+            self.clock.sleep(interval)
+            ticks += 1
+        cpu = time.process_time() - cpu
+        sample = HourSample(
+            ticks=ticks,
+            cpu_per_tick=cpu / ticks,
+            rows=self.db.select(SessionQuery(SOAK_START.isoformat(), aggregate=True))[0][1],
+            db_bytes=self.db.size_bytes(),
+            rss_bytes=rss_bytes(),
+            blocks=sys.getallocatedblocks(),
+            allocated=allocated,
+        )
+        self.samples.append(sample)
+        return sample
+
+    def finish(self) -> str:
+        # Pausing closes whatever is open at the current virtual time.
+        self.core.pause()
+        return self.clock.now().isoformat()
+
+    def sessions(self) -> list[tuple[str, str, int]]:
+        # An idle stretch back-dated by a tick can start together with the
+        # zero-length session it cuts off; insertion order breaks the tie.
+        rows = sorted(
+            self.db.fetch_sessions(SOAK_START.isoformat(), "9999"),
+            key=lambda row: (row["start_ts"], row["session_id"]),
+        )
+        return [(row["start_ts"], row["end_ts"], row["duration_sec"]) for row in rows]
+
+
+def accounting_errors(sessions: list[tuple[str, str, int]], start_ts: str, end_ts: str) -> list[str]:
+    # Sessions must tile [start_ts, end_ts] exactly: each starts where the
+    # previous one ended, and durations add up to the wall time.
+    errors = []
+    cursor = datetime.fromisoformat(start_ts)
+    for start, end, _ in sessions:
+        begin = datetime.fromisoformat(start)
+        if begin > cursor:
+            errors.append(f"gap of {(begin - cursor).total_seconds()}s before {start}")
+        elif begin < cursor:
+            errors.append(f"overlap of {(cursor - begin).total_seconds()}s at {start}")
+        cursor = datetime.fromisoformat(end)
+    if cursor != datetime.fromisoformat(end_ts):
+        errors.append(f"last session ends at {cursor.isoformat()}, not {end_ts}")
+    wall = int((datetime.fromisoformat(end_ts) - datetime.fromisoformat(start_ts)).total_seconds())
+    total = sum(duration for _, _, duration in sessions)
+    if total != wall:
+        errors.append(f"durations add up to {total}s of {wall}s")
+    return errors
@@ -4,14 +4,26 @@ import sqlite3
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
+
+from where_did_my_time_go.metrics import instrumented
+from where_did_my_time_go.query import EPOCH_SQL, SessionQuery, compile_query
 
 APP_DIR = Path.home() / "AppData" / "Roaming" / "WhereDidMyTimeGo"
 DB_PATH = APP_DIR / "data.db"
 SCHEMA_VERSION = 1
-
-
-@dataclass
+_FTS_INSERT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS sessions_fts_insert AFTER INSERT ON sessions BEGIN
+    INSERT INTO sessions_fts (rowid, window_title, process_name, exe_path)
+    VALUES (new.session_id, new.window_title, new.process_name, new.exe_path);
+END
+"""
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Bound parameters per IN (...) lookup, under SQLite's default limit.
+_LOOKUP_BATCH = 500
+
+@dataclass(slots=True)
 class SessionRecord:
     start_ts: str
     end_ts: str
@@ -23,14 +35,37 @@ class SessionRecord:
     intent_tag: str | None
 
 
+@instrumented("db")
 class Database:
-    def __init__(self, db_path: Path | None = None) -> None:
-        APP_DIR.mkdir(parents=True, exist_ok=True)
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        check_same_thread: bool = True,
+        read_only: bool = False,
+    ) -> None:
         path = db_path or DB_PATH
-        self._conn = sqlite3.connect(path)
+        if read_only:
+            uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+        else:
+            APP_DIR.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=check_same_thread)
         self._conn.row_factory = sqlite3.Row
+        self._fts_enabled = False
+        if read_only:
+            # initialize() can't run here; search whatever index the tracker built.
+            self._fts_enabled = (
+                self._conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sessions_fts'"
+                ).fetchone()
+                is not None
+            )
 
     def initialize(self) -> None:
+        # WAL lets a backup read one snapshot while the tracker keeps writing,
+        # and commits append instead of rewriting pages through a journal.
+        # The mode is stored in the file, so setting it once is enough.
+        self._conn.execute("PRAGMA journal_mode=WAL")
         self._conn.execute(
             "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
         )
@@ -70,14 +105,189 @@ class Database:
             )
             """
         )
+        # The dedupe index leads with start_ts, so it also serves range scans;
+        # a separate start_ts index would only slow every insert down.
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_dedupe "
+            "ON sessions (start_ts, process_name, window_title)"
+        )
+        self._conn.execute("DROP INDEX IF EXISTS idx_sessions_start")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rollup_days (
+                day TEXT PRIMARY KEY,
+                data_version INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS day_rollups (
+                day TEXT NOT NULL,
+                category TEXT NOT NULL,
+                process_name TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                PRIMARY KEY (day, category, process_name)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS timeline_days (
+                day TEXT PRIMARY KEY,
+                data_version INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS timeline_buckets (
+                resolution INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                seconds INTEGER NOT NULL,
+                PRIMARY KEY (resolution, bucket, category)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS catalog_days (
+                day TEXT PRIMARY KEY,
+                data_version INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS context_catalog (
+                day TEXT NOT NULL,
+                process_name TEXT NOT NULL,
+                title TEXT NOT NULL,
+                category TEXT NOT NULL,
+                seconds INTEGER NOT NULL,
+                PRIMARY KEY (day, process_name, title, category)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS suggestion_index (
+                process_name TEXT NOT NULL,
+                token TEXT NOT NULL,
+                seconds INTEGER NOT NULL,
+                sessions INTEGER NOT NULL,
+                sample_title TEXT NOT NULL,
+                PRIMARY KEY (process_name, token)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS contexts (
+                context_id INTEGER PRIMARY KEY,
+                process_name TEXT NOT NULL,
+                exe_path TEXT NOT NULL,
+                window_title TEXT NOT NULL,
+                category TEXT NOT NULL,
+                UNIQUE (process_name, exe_path, window_title)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS focus_events (
+                event_id INTEGER PRIMARY KEY,
+                ts_us INTEGER NOT NULL,
+                kind INTEGER NOT NULL,
+                context_id INTEGER,
+                session_id INTEGER,
+                category TEXT
+            )
+            """
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(focus_events)")}
+        if "category" not in columns:
+            self._conn.execute("ALTER TABLE focus_events ADD COLUMN category TEXT")
+        self._fts_enabled = self._create_search_index()
         current_version = self.get_meta("schema_version")
         if current_version is None:
             self.set_meta("schema_version", str(SCHEMA_VERSION))
         self._conn.commit()
 
+    def _create_search_index(self) -> bool:
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sessions_fts'"
+        ).fetchone()
+        try:
+            self._conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS sessions_fts USING fts5(
+                    window_title, process_name, exe_path,
+                    content='sessions', content_rowid='session_id'
+                )
+                """
+            )
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; search falls back to LIKE scans.
+            return False
+        self._conn.execute(_FTS_INSERT_TRIGGER)
+        self._conn.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS sessions_fts_delete AFTER DELETE ON sessions BEGIN
+                INSERT INTO sessions_fts (sessions_fts, rowid, window_title, process_name, exe_path)
+                VALUES ('delete', old.session_id, old.window_title, old.process_name, old.exe_path);
+            END;
+            CREATE TRIGGER IF NOT EXISTS sessions_fts_update
+            AFTER UPDATE OF window_title, process_name, exe_path ON sessions BEGIN
+                INSERT INTO sessions_fts (sessions_fts, rowid, window_title, process_name, exe_path)
+                VALUES ('delete', old.session_id, old.window_title, old.process_name, old.exe_path);
+                INSERT INTO sessions_fts (rowid, window_title, process_name, exe_path)
+                VALUES (new.session_id, new.window_title, new.process_name, new.exe_path);
+            END;
+            """
+        )
+        if not exists:
+            self._conn.execute("INSERT INTO sessions_fts (sessions_fts) VALUES ('rebuild')")
+        return True
+
     def close(self) -> None:
         self._conn.close()
 
+    def backup_to(self, target: Path, pages: int, on_step: Callable[[int, int], None]) -> None:
+        # Copies the database a few pages at a time; on_step(done, total) runs
+        # between steps and may sleep to let writers in, or raise to abort.
+        # A write by another connection would restart a stepped copy from the
+        # first page, so in WAL mode the copy reads from one read transaction
+        # held for its whole length, which writers don't wait on. Without WAL
+        # that transaction would block them, so the copy is one step instead.
+        wal = self._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        dest = sqlite3.connect(target)
+        try:
+            if wal:
+                self._conn.execute("BEGIN")
+                self._conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            self._conn.backup(
+                dest,
+                pages=pages if wal else -1,
+                progress=lambda _status, remaining, total: on_step(total - remaining, total),
+            )
+            # The copy inherits WAL mode; make it a single self-contained file.
+            dest.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            if wal:
+                self._conn.rollback()
+            dest.close()
+
+    def size_bytes(self) -> int:
+        # Committed size, including pages still waiting in the WAL file.
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        return page_count * self._conn.execute("PRAGMA page_size").fetchone()[0]
+
+    def quick_check(self) -> list[str]:
+        # ["ok"] when no problems are found.
+        return [row[0] for row in self._conn.execute("PRAGMA quick_check")]
+
     def set_meta(self, key: str, value: str) -> None:
         self._conn.execute(
             "INSERT INTO meta (key, value) VALUES (?, ?) "
@@ -121,9 +331,105 @@ class Database:
                 record.intent_tag,
             ),
         )
+        self._invalidate_days(record.start_ts, record.end_ts)
         self._conn.commit()
         return int(cursor.lastrowid)
 
+    def add_sessions(self, records: Iterable[SessionRecord], chunk_size: int = 20000) -> int:
+        inserted = 0
+        chunk: list[tuple] = []
+        for record in records:
+            chunk.append(
+                (
+                    record.start_ts,
+                    record.end_ts,
+                    record.duration_sec,
+                    record.process_name,
+                    record.exe_path,
+                    record.window_title,
+                    record.category,
+                    record.intent_tag,
+                )
+            )
+            if len(chunk) >= chunk_size:
+                inserted += self._insert_chunk(chunk)
+                chunk = []
+        if chunk:
+            inserted += self._insert_chunk(chunk)
+        return inserted
+
+    def _insert_chunk(self, chunk: list[tuple]) -> int:
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        # Inserting in start order keeps the index appends local.
+        chunk.sort(key=lambda row: row[0])
+        with self._conn:
+            # BEGIN IMMEDIATE takes the write lock up front, so the dedupe read
+            # and the inserts see the same rows even with a tracker writing, and
+            # the trigger swap below is atomic for other connections.
+            cursor.execute("BEGIN IMMEDIATE")
+            # Dedupe on (start_ts, process_name, window_title) against stored
+            # rows sharing a start time with the chunk, and within the chunk.
+            # Looking up the chunk's own start times keeps unsorted input from
+            # scanning most of the table for every chunk.
+            starts = list(dict.fromkeys(row[0] for row in chunk))
+            seen = set()
+            for offset in range(0, len(starts), _LOOKUP_BATCH):
+                batch = starts[offset : offset + _LOOKUP_BATCH]
+                cursor.execute(
+                    "SELECT start_ts, process_name, window_title FROM sessions "
+                    f"WHERE start_ts IN ({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                seen.update(cursor.fetchall())
+            fresh = []
+            for row in chunk:
+                key = (row[0], row[3], row[5])
+                if key not in seen:
+                    seen.add(key)
+                    fresh.append(row)
+            if not fresh:
+                return 0
+            first_id = cursor.execute("SELECT COALESCE(MAX(session_id), 0) FROM sessions").fetchone()[0]
+            if self._fts_enabled:
+                # Indexing the batch with one INSERT ... SELECT is several times
+                # faster than the per-row trigger.
+                cursor.execute("DROP TRIGGER IF EXISTS sessions_fts_insert")
+            cursor.executemany(
+                """
+                INSERT INTO sessions (
+                    start_ts, end_ts, duration_sec, process_name, exe_path,
+                    window_title, category, intent_tag
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                fresh,
+            )
+            if self._fts_enabled:
+                cursor.execute(
+                    """
+                    INSERT INTO sessions_fts (rowid, window_title, process_name, exe_path)
+                    SELECT session_id, window_title, process_name, exe_path
+                    FROM sessions WHERE session_id > ?
+                    """,
+                    (first_id,),
+                )
+                cursor.execute(_FTS_INSERT_TRIGGER)
+        return len(fresh)
+
+    def iter_session_records(self) -> Iterator[SessionRecord]:
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            """
+            SELECT start_ts, end_ts, duration_sec, process_name, exe_path,
+                   window_title, category, intent_tag
+            FROM sessions
+            ORDER BY start_ts ASC
+            """
+        )
+        for row in cursor:
+            yield SessionRecord(*row)
+
     def update_session_intent(self, session_id: int, intent_tag: str) -> None:
         self._conn.execute(
             "UPDATE sessions SET intent_tag=? WHERE session_id=?",
@@ -132,11 +438,180 @@ class Database:
         self._conn.commit()
 
     def update_session_end(self, session_id: int, end_ts: str, duration_sec: int) -> None:
-        self._conn.execute(
-            "UPDATE sessions SET end_ts=?, duration_sec=? WHERE session_id=?",
+        self._set_session_end(session_id, end_ts, duration_sec)
+        self._conn.commit()
+
+    def _set_session_end(self, session_id: int, end_ts: str, duration_sec: int) -> None:
+        row = self._conn.execute(
+            "UPDATE sessions SET end_ts=?, duration_sec=? WHERE session_id=? RETURNING start_ts",
             (end_ts, duration_sec, session_id),
-        )
+        ).fetchone()
+        if row:
+            self._invalidate_days(row["start_ts"], end_ts)
+
+    def _invalidate_days(self, start_ts: str, end_ts: str) -> None:
+        # A row written into a day that is already closed and cached (a
+        # session growing past midnight, idle back-dated after a resume) would
+        # otherwise go unseen until data_version moves. Rollups and the catalog
+        # only count the start day, timeline occupancy every day overlapped;
+        # dropping the whole span for all three keeps it simple.
+        days = (day_key(start_ts), day_key(end_ts))
+        for table in ("rollup_days", "catalog_days", "timeline_days"):
+            self._conn.execute(f"DELETE FROM {table} WHERE day >= ? AND day <= ?", days)
+
+    def context_id(self, process_name: str, exe_path: str, window_title: str, category: str) -> int:
+        row = self._conn.execute(
+            """
+            INSERT INTO contexts (process_name, exe_path, window_title, category)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (process_name, exe_path, window_title)
+            DO UPDATE SET category=excluded.category
+            RETURNING context_id
+            """,
+            (process_name, exe_path, window_title, category),
+        ).fetchone()
         self._conn.commit()
+        return int(row["context_id"])
+
+    def fetch_contexts(self) -> list[sqlite3.Row]:
+        return list(self._conn.execute("SELECT * FROM contexts").fetchall())
+
+    def last_focus_event(self) -> sqlite3.Row | None:
+        return self._conn.execute(
+            "SELECT * FROM focus_events ORDER BY event_id DESC LIMIT 1"
+        ).fetchone()
+
+    def fetch_focus_events(self) -> list[tuple[int, int, int, int | None, int | None, str | None]]:
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            """
+            SELECT event_id, ts_us, kind, context_id, session_id, category
+            FROM focus_events ORDER BY event_id
+            """
+        )
+        return cursor.fetchall()
+
+    def append_focus_event(
+        self, ts: str, kind: int, context_id: int | None, record: SessionRecord | None = None
+    ) -> int | None:
+        # Closing the previous event's session, opening the next one and
+        # logging the transition commit together, so a crash can't leave the
+        # log and the derived rows disagreeing.
+        with self._conn:
+            self._close_event_session(ts)
+            session_id = None
+            if record is not None:
+                session_id = int(
+                    self._conn.execute(
+                        """
+                        INSERT INTO sessions (
+                            start_ts, end_ts, duration_sec, process_name, exe_path,
+                            window_title, category, intent_tag
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            record.start_ts,
+                            record.end_ts,
+                            record.duration_sec,
+                            record.process_name,
+                            record.exe_path,
+                            record.window_title,
+                            record.category,
+                            record.intent_tag,
+                        ),
+                    ).lastrowid
+                )
+                self._invalidate_days(record.start_ts, record.end_ts)
+            # The event keeps the category it was classified with; the context
+            # row only holds the latest one.
+            self._conn.execute(
+                """
+                INSERT INTO focus_events (ts_us, kind, context_id, session_id, category)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (to_micros(ts), kind, context_id, session_id, record.category if record else None),
+            )
+        return session_id
+
+    def checkpoint_event_session(self, end_ts: str) -> None:
+        with self._conn:
+            self._close_event_session(end_ts)
+
+    def open_event_session_end(self) -> str | None:
+        row = self._conn.execute(
+            """
+            SELECT s.end_ts FROM sessions AS s
+            WHERE s.session_id = (SELECT session_id FROM focus_events ORDER BY event_id DESC LIMIT 1)
+            """
+        ).fetchone()
+        return row["end_ts"] if row else None
+
+    def _close_event_session(self, end_ts: str) -> None:
+        row = self._conn.execute(
+            """
+            SELECT s.session_id, s.start_ts FROM sessions AS s
+            WHERE s.session_id = (SELECT session_id FROM focus_events ORDER BY event_id DESC LIMIT 1)
+            """
+        ).fetchone()
+        if row is None:
+            return
+        start = datetime.fromisoformat(row["start_ts"])
+        duration = max(0, int((datetime.fromisoformat(end_ts) - start).total_seconds()))
+        self._set_session_end(row["session_id"], end_ts, duration)
+
+    def replace_event_sessions(
+        self,
+        categories: dict[int, str],
+        sessions: list[tuple[SessionRecord, list[int]]],
+    ) -> None:
+        with self._conn:
+            # categories holds reclassified contexts only; their events take the
+            # new category so later rebuilds keep it.
+            updates = [(category, context_id) for context_id, category in categories.items()]
+            self._conn.executemany("UPDATE contexts SET category=? WHERE context_id=?", updates)
+            self._conn.executemany("UPDATE focus_events SET category=? WHERE context_id=?", updates)
+            self._conn.execute(
+                """
+                DELETE FROM sessions WHERE session_id IN (
+                    SELECT session_id FROM focus_events WHERE session_id IS NOT NULL
+                )
+                """
+            )
+            self._conn.execute("UPDATE focus_events SET session_id=NULL")
+            for record, event_ids in sessions:
+                session_id = self._conn.execute(
+                    """
+                    INSERT INTO sessions (
+                        start_ts, end_ts, duration_sec, process_name, exe_path,
+                        window_title, category, intent_tag
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        record.start_ts,
+                        record.end_ts,
+                        record.duration_sec,
+                        record.process_name,
+                        record.exe_path,
+                        record.window_title,
+                        record.category,
+                        record.intent_tag,
+                    ),
+                ).lastrowid
+                self._conn.executemany(
+                    "UPDATE focus_events SET session_id=? WHERE event_id=?",
+                    [(session_id, event_id) for event_id in event_ids],
+                )
+
+    def event_session_intents(self) -> dict[int, str]:
+        rows = self._conn.execute(
+            """
+            SELECT e.event_id, s.intent_tag FROM focus_events AS e
+            JOIN sessions AS s ON s.session_id = e.session_id
+            WHERE s.intent_tag IS NOT NULL
+            """
+        ).fetchall()
+        return {row["event_id"]: row["intent_tag"] for row in rows}
 
     def add_rule(
         self,
@@ -154,6 +629,7 @@ class Database:
             """,
             (int(enabled), match_type, process_pattern, title_pattern, category, priority),
         )
+        self._bump_rules_version()
         self._conn.commit()
         return int(cursor.lastrowid)
 
@@ -175,12 +651,25 @@ class Database:
             """,
             (int(enabled), match_type, process_pattern, title_pattern, category, priority, rule_id),
         )
+        self._bump_rules_version()
         self._conn.commit()
 
     def delete_rule(self, rule_id: int) -> None:
         self._conn.execute("DELETE FROM rules WHERE rule_id=?", (rule_id,))
+        self._bump_rules_version()
         self._conn.commit()
 
+    def rules_version(self) -> int:
+        value = self.get_meta("rules_version")
+        return int(value) if value else 0
+
+    def _bump_rules_version(self) -> None:
+        # Lets the tracker keep its parsed rules until one actually changes.
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('rules_version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value=CAST(value AS INTEGER) + 1"
+        )
+
     def list_rules(self) -> list[sqlite3.Row]:
         rows = self._conn.execute(
             "SELECT * FROM rules ORDER BY priority ASC, rule_id ASC"
@@ -198,65 +687,287 @@ class Database:
         ).fetchall()
         return list(rows)
 
-    def summarize_today(self, day_start: str, day_end: str) -> list[sqlite3.Row]:
+    def first_session_start(self) -> str | None:
+        row = self._conn.execute("SELECT MIN(start_ts) AS first FROM sessions").fetchone()
+        return row["first"] if row else None
+
+    def select(self, query: SessionQuery) -> list[tuple]:
+        # Plain tuples: SESSION_COLUMNS, or the group columns then total and
+        # count. sqlite3.Row costs several times more per row.
+        return list(self.iter_select(query))
+
+    def iter_select(self, query: SessionQuery) -> Iterator[tuple]:
+        sql, params = compile_query(query, self._search_clause)
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        yield from cursor.execute(sql, params)
+
+    def explain(self, query: SessionQuery) -> list[str]:
+        sql, params = compile_query(query, self._search_clause)
+        return [row[3] for row in self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def _search_clause(self, text: str) -> tuple[str, str, tuple[str, ...]]:
+        if self._fts_enabled:
+            return (
+                "sessions_fts JOIN sessions AS s ON s.session_id = sessions_fts.rowid",
+                "sessions_fts MATCH ?",
+                (fts_query(text),),
+            )
+        pattern = f"%{text.strip()}%"
+        return (
+            "sessions AS s",
+            "(s.window_title LIKE ? OR s.process_name LIKE ? OR s.exe_path LIKE ?)",
+            (pattern, pattern, pattern),
+        )
+
+    def cleanup_retention(self, days: int) -> int:
+        if days <= 0:
+            return 0
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        cutoff_ts = cutoff.isoformat()
+        cursor = self._conn.execute(
+            "DELETE FROM sessions WHERE end_ts < ?",
+            (cutoff_ts,),
+        )
+        # Keep the focus log in step so a rebuild can't resurrect expired rows.
+        self._conn.execute("DELETE FROM focus_events WHERE ts_us < ?", (to_micros(cutoff_ts),))
+        self._conn.commit()
+        if cursor.rowcount > 0:
+            self.bump_data_version()
+        return cursor.rowcount
+
+    def data_version(self) -> int:
+        value = self.get_meta("data_version")
+        return int(value) if value else 0
+
+    def bump_data_version(self) -> int:
+        version = self.data_version() + 1
+        self.set_meta("data_version", str(version))
+        return version
+
+    def aggregate_range(self, start_ts: str, end_ts: str) -> list[sqlite3.Row]:
         rows = self._conn.execute(
             """
-            SELECT category, SUM(duration_sec) AS total
+            SELECT category, process_name, SUM(duration_sec) AS total
             FROM sessions
-            WHERE start_ts >= ? AND end_ts <= ?
-            GROUP BY category
+            WHERE start_ts >= ? AND start_ts < ?
+            GROUP BY category, process_name
             """,
-            (day_start, day_end),
+            (start_ts, end_ts),
         ).fetchall()
         return list(rows)
 
-    def top_apps(self, start_ts: str, end_ts: str, limit: int = 10) -> list[sqlite3.Row]:
+    def cached_rollup_days(self, first_day: str, last_day: str, data_version: int) -> set[str]:
+        rows = self._conn.execute(
+            "SELECT day FROM rollup_days WHERE day >= ? AND day <= ? AND data_version=?",
+            (first_day, last_day, data_version),
+        ).fetchall()
+        return {row["day"] for row in rows}
+
+    def fetch_day_rollups(self, first_day: str, last_day: str) -> list[sqlite3.Row]:
         rows = self._conn.execute(
             """
-            SELECT process_name, SUM(duration_sec) AS total
-            FROM sessions
-            WHERE start_ts >= ? AND end_ts <= ?
-            GROUP BY process_name
-            ORDER BY total DESC
-            LIMIT ?
+            SELECT day, category, process_name, total
+            FROM day_rollups
+            WHERE day >= ? AND day <= ?
             """,
-            (start_ts, end_ts, limit),
+            (first_day, last_day),
         ).fetchall()
         return list(rows)
 
-    def total_idle(self, start_ts: str, end_ts: str) -> int:
-        row = self._conn.execute(
+    def rebuild_day_rollups(self, days: Iterable[str], data_version: int) -> None:
+        for day in days:
+            start_ts, end_ts = date_range_for_day(datetime.fromisoformat(day))
+            self._conn.execute("DELETE FROM day_rollups WHERE day=?", (day,))
+            self._conn.execute(
+                """
+                INSERT INTO day_rollups (day, category, process_name, total)
+                SELECT ?, category, process_name, SUM(duration_sec)
+                FROM sessions
+                WHERE start_ts >= ? AND start_ts < ?
+                GROUP BY category, process_name
+                """,
+                (day, start_ts, end_ts),
+            )
+            self._conn.execute(
+                "INSERT INTO rollup_days (day, data_version) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET data_version=excluded.data_version",
+                (day, data_version),
+            )
+        self._conn.commit()
+
+    def fetch_context_durations(self, start_ts: str, end_ts: str) -> list[tuple[str, str, str, int]]:
+        # (process_name, window_title, category, seconds) for sessions started
+        # in the range, excluding the tracker's own Idle rows.
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
             """
-            SELECT COALESCE(SUM(duration_sec), 0) AS total
+            SELECT process_name, window_title, category, SUM(duration_sec)
             FROM sessions
-            WHERE start_ts >= ? AND end_ts <= ? AND category = 'Idle'
+            WHERE start_ts >= ? AND start_ts < ? AND process_name != 'Idle'
+            GROUP BY process_name, window_title, category
             """,
             (start_ts, end_ts),
-        ).fetchone()
-        return int(row["total"]) if row else 0
+        )
+        return cursor.fetchall()
 
-    def total_active(self, start_ts: str, end_ts: str) -> int:
-        row = self._conn.execute(
+    def cached_catalog_days(self, first_day: str, last_day: str, data_version: int) -> set[str]:
+        rows = self._conn.execute(
+            "SELECT day FROM catalog_days WHERE day >= ? AND day <= ? AND data_version=?",
+            (first_day, last_day, data_version),
+        ).fetchall()
+        return {row["day"] for row in rows}
+
+    def store_catalog_day(self, day: str, rows: list[tuple[str, str, str, int]], data_version: int) -> None:
+        # rows are (process_name, title, category, seconds) with titles
+        # already normalized.
+        with self._conn:
+            self._conn.execute("DELETE FROM context_catalog WHERE day=?", (day,))
+            self._conn.executemany(
+                "INSERT INTO context_catalog (day, process_name, title, category, seconds) VALUES (?, ?, ?, ?, ?)",
+                [(day, *row) for row in rows],
+            )
+            self._conn.execute(
+                "INSERT INTO catalog_days (day, data_version) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET data_version=excluded.data_version",
+                (day, data_version),
+            )
+
+    def fetch_catalog(self, first_day: str, last_day: str) -> list[tuple[str, str, str, int]]:
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
             """
-            SELECT COALESCE(SUM(duration_sec), 0) AS total
+            SELECT process_name, title, category, SUM(seconds)
+            FROM context_catalog
+            WHERE day >= ? AND day <= ?
+            GROUP BY process_name, title, category
+            """,
+            (first_day, last_day),
+        )
+        return cursor.fetchall()
+
+    def suggestion_state(self) -> tuple[int, int]:
+        # (last session_id scanned, data_version the index was built against)
+        watermark = self.get_meta("suggestions_watermark")
+        version = self.get_meta("suggestions_data_version")
+        return int(watermark or 0), int(version) if version else -1
+
+    def reset_suggestions(self, data_version: int) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM suggestion_index")
+            self._conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                [("suggestions_watermark", "0"), ("suggestions_data_version", str(data_version))],
+            )
+
+    def fetch_sessions_after(self, session_id: int, limit: int) -> list[tuple[int, str, str, str, str, int]]:
+        # (session_id, end_ts, process_name, window_title, category, duration_sec)
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            """
+            SELECT session_id, end_ts, process_name, window_title, category, duration_sec
             FROM sessions
-            WHERE start_ts >= ? AND end_ts <= ? AND category != 'Idle'
+            WHERE session_id > ?
+            ORDER BY session_id
+            LIMIT ?
             """,
-            (start_ts, end_ts),
-        ).fetchone()
-        return int(row["total"]) if row else 0
+            (session_id, limit),
+        )
+        return cursor.fetchall()
+
+    def add_suggestion_batch(self, rows: list[tuple[str, str, int, int, str]], watermark: int) -> None:
+        # rows are (process_name, token, seconds, sessions, sample_title). The
+        # watermark moves in the same transaction, so an interrupted scan
+        # never counts a batch twice.
+        with self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO suggestion_index (process_name, token, seconds, sessions, sample_title)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(process_name, token) DO UPDATE SET
+                    seconds=seconds + excluded.seconds,
+                    sessions=sessions + excluded.sessions
+                """,
+                rows,
+            )
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('suggestions_watermark', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                (str(watermark),),
+            )
 
-    def cleanup_retention(self, days: int) -> int:
-        if days <= 0:
-            return 0
-        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-        cutoff_ts = cutoff.isoformat()
-        cursor = self._conn.execute(
-            "DELETE FROM sessions WHERE end_ts < ?",
-            (cutoff_ts,),
+    def fetch_suggestion_index(self) -> list[tuple[str, str, int, int, str]]:
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        cursor.execute("SELECT process_name, token, seconds, sessions, sample_title FROM suggestion_index")
+        return cursor.fetchall()
+
+    def fetch_spans_overlapping(
+        self, start_ts: str, end_ts: str, earliest_ts: str
+    ) -> list[tuple[int, int, str, str, str]]:
+        # Sessions overlapping [start_ts, end_ts) as epoch seconds. Only those
+        # starting at or after earliest_ts are considered, which keeps the
+        # lookup on the start_ts index.
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            f"""
+            SELECT {EPOCH_SQL.format("start_ts")}, {EPOCH_SQL.format("end_ts")},
+                   category, process_name, window_title
+            FROM sessions
+            WHERE start_ts >= ? AND start_ts < ? AND end_ts > ?
+            ORDER BY start_ts
+            """,
+            (earliest_ts, end_ts, start_ts),
         )
-        self._conn.commit()
-        return cursor.rowcount
+        return cursor.fetchall()
+
+    def cached_timeline_days(self, first_day: str, last_day: str, data_version: int) -> set[str]:
+        rows = self._conn.execute(
+            "SELECT day FROM timeline_days WHERE day >= ? AND day <= ? AND data_version=?",
+            (first_day, last_day, data_version),
+        ).fetchall()
+        return {row["day"] for row in rows}
+
+    def store_timeline_day(
+        self,
+        day: str,
+        day_start: int,
+        buckets: dict[int, list[tuple[int, str, int]]],
+        data_version: int,
+    ) -> None:
+        # buckets maps a resolution in seconds to (bucket, category, seconds).
+        with self._conn:
+            for resolution, rows in buckets.items():
+                self._conn.execute(
+                    "DELETE FROM timeline_buckets WHERE resolution=? AND bucket >= ? AND bucket < ?",
+                    (resolution, day_start, day_start + 86400),
+                )
+                self._conn.executemany(
+                    "INSERT INTO timeline_buckets (resolution, bucket, category, seconds) VALUES (?, ?, ?, ?)",
+                    [(resolution, *row) for row in rows],
+                )
+            self._conn.execute(
+                "INSERT INTO timeline_days (day, data_version) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET data_version=excluded.data_version",
+                (day, data_version),
+            )
+
+    def fetch_timeline_buckets(self, resolution: int, start: int, end: int) -> list[tuple[int, str, int]]:
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            """
+            SELECT bucket, category, seconds FROM timeline_buckets
+            WHERE resolution=? AND bucket >= ? AND bucket < ?
+            """,
+            (resolution, start, end),
+        )
+        return cursor.fetchall()
 
     def ensure_default_rules(self) -> None:
         if self.list_rules():
@@ -289,5 +1000,24 @@ def date_range_for_days(days: int) -> tuple[str, str]:
     return start.isoformat(), now.isoformat()
 
 
+def fts_query(text: str) -> str:
+    # Quote each word so user input can't inject FTS5 syntax, and match it as
+    # a prefix so results update while the user is still typing.
+    tokens = [token.replace('"', '""') for token in text.split()]
+    return " ".join(f'"{token}"*' for token in tokens) or '""'
+
+
+def to_micros(value: str) -> int:
+    return (datetime.fromisoformat(value) - _EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value: int) -> str:
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+def day_key(value: str) -> str:
+    return value[:10]
+
+
 def to_iso(dt: datetime) -> str:
     return dt.astimezone(timezone.utc).isoformat()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from where_did_my_time_go.context_catalog import normalize_title
+from where_did_my_time_go.rules import AppContext, Rule, apply_rules
+from where_did_my_time_go.storage import Database, to_iso
+
+UNCATEGORIZED = "Other"
+# Token under which the index keeps each process's total.
+PROCESS_TOTAL = ""
+BATCH_SIZE = 5000
+# Sessions that ended this recently may still be growing.
+SETTLE = timedelta(hours=1)
+MAX_TOKENS_PER_TITLE = 12
+# A token in nearly all of one process's time adds nothing over a rule on the
+# process, a token nearly all in one process gets that process too, and one
+# found in nearly all uncategorized time is too generic to suggest.
+DOMINANT_SHARE = 0.9
+# Title rules are more specific, so they go ahead of process-only rules.
+TITLE_PRIORITY = 5
+PROCESS_PRIORITY = 10
+_TOKEN = re.compile(r"[^\W\d_][\w.+#&'-]*")
+_STOPWORDS = frozenset(
+    "and are but for from has have how new not of off on one our the this that was what when with you your "
+    "untitled window page tab home".split()
+)
+
+
+def title_tokens(title: str) -> set[str]:
+    tokens: set[str] = set()
+    for token in _TOKEN.findall(normalize_title(title).lower()):
+        token = token.strip(".-'")
+        if len(token) < 3 or token in _STOPWORDS:
+            continue
+        tokens.add(token)
+        if len(tokens) == MAX_TOKENS_PER_TITLE:
+            break
+    return tokens
+
+
+def _index_rows(rows: list[tuple[int, str, str, str, str, int]]) -> list[tuple[str, str, int, int, str]]:
+    index: dict[tuple[str, str], list] = {}
+    for _, _, process_name, title, category, seconds in rows:
+        if category != UNCATEGORIZED or not seconds:
+            continue
+        for token in (PROCESS_TOTAL, *title_tokens(title)):
+            entry = index.get((process_name, token))
+            if entry is None:
+                index[(process_name, token)] = [seconds, 1, title]
+            else:
+                entry[0] += seconds
+                entry[1] += 1
+    return [(process_name, token, *entry) for (process_name, token), entry in index.items()]
+
+
+@dataclass(slots=True)
+class Suggestion:
+    # The category is left empty for the user to pick.
+    rule: Rule
+    seconds: int
+    sessions: int
+    # Share of all indexed uncategorized time the rule would cover.
+    share: float
+    example: str
+
+
+def _noop(*_args) -> None:
+    pass
+
+
+# Builds a (process, title token) index over "Other" sessions and turns it
+# into candidate rules. Scans resume after the last session_id they indexed,
+# so repeat runs only read new rows. A data_version change (import, rebuild,
+# retention) rewrites history and restarts the index.
+class SuggestionEngine:
+    def __init__(
+        self,
+        db: Database,
+        batch_size: int = BATCH_SIZE,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        self._db = db
+        self._batch_size = batch_size
+        self._clock = clock
+
+    def scan(self, should_stop: Callable[[], bool] = lambda: False, on_progress=_noop) -> int:
+        version = self._db.data_version()
+        watermark, indexed_version = self._db.suggestion_state()
+        if indexed_version != version:
+            self._db.reset_suggestions(version)
+            watermark = 0
+        cutoff = to_iso(self._clock() - SETTLE)
+        scanned = 0
+        while not should_stop():
+            rows = self._db.fetch_sessions_after(watermark, self._batch_size)
+            # Stop at the first session that may still grow; it and everything
+            # after it are picked up by a later scan.
+            settled = []
+            for row in rows:
+                if row[1] >= cutoff:
+                    break
+                settled.append(row)
+            if not settled:
+                break
+            watermark = settled[-1][0]
+            self._db.add_suggestion_batch(_index_rows(settled), watermark)
+            scanned += len(settled)
+            on_progress(scanned)
+            if len(settled) < self._batch_size:
+                break
+        return scanned
+
+    def suggestions(self, rules: list[Rule], limit: int = 10) -> list[Suggestion]:
+        totals: dict[str, tuple[int, int, str]] = {}
+        hosts: dict[str, list[tuple[str, int, int, str]]] = {}
+        for process_name, token, seconds, sessions, sample in self._db.fetch_suggestion_index():
+            if token == PROCESS_TOTAL:
+                totals[process_name] = (seconds, sessions, sample)
+            else:
+                hosts.setdefault(token, []).append((process_name, seconds, sessions, sample))
+        uncategorized = sum(seconds for seconds, _, _ in totals.values())
+        if not uncategorized:
+            return []
+
+        candidates: list[tuple[Suggestion, AppContext]] = []
+        for process_name, (seconds, sessions, sample) in totals.items():
+            rule = Rule(0, True, "substring", process_name, None, "", PROCESS_PRIORITY)
+            candidates.append(
+                (
+                    Suggestion(rule, seconds, sessions, seconds / uncategorized, sample),
+                    AppContext(process_name, sample),
+                )
+            )
+        for token, processes in hosts.items():
+            seconds = sum(host[1] for host in processes)
+            sessions = sum(host[2] for host in processes)
+            top_process, top_seconds, _, sample = max(processes, key=lambda host: host[1])
+            process_pattern = None
+            if top_seconds >= DOMINANT_SHARE * seconds:
+                if seconds >= DOMINANT_SHARE * totals[top_process][0]:
+                    continue
+                process_pattern = top_process
+            elif seconds >= DOMINANT_SHARE * uncategorized:
+                # In nearly every title everywhere; says nothing.
+                continue
+            rule = Rule(0, True, "substring", process_pattern, token, "", TITLE_PRIORITY)
+            candidates.append(
+                (
+                    Suggestion(rule, seconds, sessions, seconds / uncategorized, sample),
+                    AppContext(top_process, sample),
+                )
+            )
+
+        candidates.sort(
+            key=lambda item: (-item[0].seconds, item[0].rule.process_pattern or "", item[0].rule.title_pattern or "")
+        )
+        result = []
+        for suggestion, sample in candidates:
+            # Time logged before a matching rule existed stays in "Other";
+            # don't suggest what the current rules already catch.
+            if apply_rules(rules, sample) != UNCATEGORIZED:
+                continue
+            result.append(suggestion)
+            if len(result) == limit:
+                break
+        return result
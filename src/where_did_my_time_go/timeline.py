@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+
+from where_did_my_time_go.storage import Database
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+RAW = 0
+RESOLUTIONS = (MINUTE, HOUR)
+# Seconds of history per pixel at which each level takes over: raw sessions
+# while one pixel covers under half a minute, then minute buckets, then hours.
+# A viewport therefore never holds more than a couple of items per pixel and
+# lane.
+RAW_MAX_SEC_PER_PX = 30
+MINUTE_MAX_SEC_PER_PX = 120
+# How far before a viewport to look for sessions still running inside it.
+# Longer sessions are clipped to this.
+LOOKBACK = 7 * DAY
+
+
+def choose_resolution(start: int, end: int, width_px: int) -> int:
+    per_px = (end - start) / max(1, width_px)
+    if per_px < RAW_MAX_SEC_PER_PX:
+        return RAW
+    if per_px < MINUTE_MAX_SEC_PER_PX:
+        return MINUTE
+    return HOUR
+
+
+def day_occupancy(
+    spans: list[tuple[int, int, str]], day_start: int
+) -> dict[int, list[tuple[int, str, int]]]:
+    # Seconds each category was in focus per minute and per hour of one day.
+    # Coverage is marked per second, so overlapping rows of a category count
+    # once and sessions crossing bucket or day edges split exactly.
+    day_end = day_start + DAY
+    by_category: dict[str, list[tuple[int, int]]] = {}
+    for start, end, category in spans:
+        start, end = max(start, day_start), min(end, day_end)
+        if end > start:
+            by_category.setdefault(category, []).append((start - day_start, end - day_start))
+    result: dict[int, list[tuple[int, str, int]]] = {resolution: [] for resolution in RESOLUTIONS}
+    for category, offsets in by_category.items():
+        bounds = np.asarray(offsets, dtype=np.int64)
+        edges = np.zeros(DAY + 1, dtype=np.int32)
+        np.add.at(edges, bounds[:, 0], 1)
+        np.add.at(edges, bounds[:, 1], -1)
+        covered = (np.cumsum(edges[:-1]) > 0).astype(np.int32)
+        for resolution in RESOLUTIONS:
+            totals = covered.reshape(-1, resolution).sum(axis=1)
+            for index in np.flatnonzero(totals):
+                result[resolution].append((day_start + int(index) * resolution, category, int(totals[index])))
+    return result
+
+
+@dataclass(slots=True)
+class Viewport:
+    start: int
+    end: int
+    resolution: int
+    # RAW: (start, end, category, process_name, window_title) per session.
+    # Otherwise: (bucket_start, category, seconds) per occupied bucket.
+    items: list[tuple] = field(default_factory=list)
+
+    @property
+    def categories(self) -> list[str]:
+        index = 2 if self.resolution == RAW else 1
+        return sorted({item[index] for item in self.items})
+
+
+# Multi-resolution index behind the Timeline tab. Closed days are reduced to
+# per-minute and per-hour occupancy once and cached in SQLite under the
+# data_version stamp; the current day is computed from raw rows on demand.
+class TimelineIndex:
+    def __init__(self, db: Database, clock=time.time) -> None:
+        self._db = db
+        self._clock = clock
+
+    def fetch(self, start: int, end: int, width_px: int) -> Viewport:
+        resolution = choose_resolution(start, end, width_px)
+        if resolution == RAW:
+            items = [
+                (max(row[0], start), min(row[1], end), row[2], row[3], row[4])
+                for row in self._spans(start, end)
+            ]
+            return Viewport(start, end, RAW, items)
+
+        first_day = start // DAY * DAY
+        last_day = (end - 1) // DAY * DAY
+        today = int(self._clock()) // DAY * DAY
+        items: list[tuple] = []
+        closed_end = min(last_day + DAY, today)
+        if first_day < closed_end:
+            self._ensure_cached(first_day, closed_end)
+            bucket_start = start // resolution * resolution
+            items.extend(self._db.fetch_timeline_buckets(resolution, bucket_start, min(end, closed_end)))
+        for day in range(max(first_day, today), last_day + DAY, DAY):
+            spans = [(row[0], row[1], row[2]) for row in self._spans(day, day + DAY)]
+            for bucket, category, seconds in day_occupancy(spans, day)[resolution]:
+                if bucket + resolution > start and bucket < end:
+                    items.append((bucket, category, seconds))
+        return Viewport(start, end, resolution, items)
+
+    def _spans(self, start: int, end: int) -> list[tuple[int, int, str, str, str]]:
+        return self._db.fetch_spans_overlapping(_iso(start), _iso(end), _iso(start - LOOKBACK))
+
+    def _ensure_cached(self, first_day: int, end_day: int) -> None:
+        version = self._db.data_version()
+        cached = self._db.cached_timeline_days(_day_key(first_day), _day_key(end_day - DAY), version)
+        for day in range(first_day, end_day, DAY):
+            if _day_key(day) in cached:
+                continue
+            spans = [(row[0], row[1], row[2]) for row in self._spans(day, day + DAY)]
+            self._db.store_timeline_day(_day_key(day), day, day_occupancy(spans, day), version)
+
+
+def _iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def _day_key(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).date().isoformat()
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import time
+import zlib
+from datetime import datetime
+
+from PySide6.QtCore import QObject, QPointF, QRectF, Qt, QThread, Signal, Slot
+from PySide6.QtGui import QColor, QMouseEvent, QPainter, QPaintEvent, QResizeEvent, QWheelEvent
+from PySide6.QtWidgets import QApplication, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+
+from where_did_my_time_go.storage import Database
+from where_did_my_time_go.timeline import DAY, HOUR, RAW, TimelineIndex, Viewport
+from where_did_my_time_go.utils import format_duration
+
+SPANS = {"Day": DAY, "Week": 7 * DAY, "Month": 30 * DAY}
+MIN_SPAN = 10 * 60
+MAX_SPAN = 366 * DAY
+AXIS_HEIGHT = 22
+LANE_LABEL_WIDTH = 110
+ALPHA_STEPS = 4
+# Candidate gridline spacings, smallest first.
+TICKS = [60, 300, 900, 1800, HOUR, 3 * HOUR, 6 * HOUR, 12 * HOUR, DAY, 7 * DAY, 30 * DAY]
+
+
+def category_color(category: str) -> QColor:
+    # crc32 rather than hash() so a category keeps its colour across runs.
+    return QColor.fromHsv(zlib.crc32(category.encode("utf-8")) % 360, 150, 210)
+
+
+# Runs viewport queries on its own thread with its own connection. Requests
+# that were superseded while queued are skipped, so fast pans never build up
+# a backlog.
+class TimelineFetcher(QObject):
+    fetched = Signal(int, object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._db = Database(check_same_thread=False)
+        self._db.initialize()
+        self._index = TimelineIndex(self._db)
+        self.latest = 0
+
+    @Slot(int, int, int, int)
+    def fetch(self, request_id: int, start: int, end: int, width: int) -> None:
+        if request_id != self.latest:
+            return
+        self.fetched.emit(request_id, self._index.fetch(start, end, width))
+
+
+class TimelineCanvas(QWidget):
+    view_changed = Signal()
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setMouseTracking(True)
+        self.setMinimumHeight(240)
+        now = int(time.time())
+        self.view_start = now - DAY
+        self.view_end = now
+        self.viewport: Viewport | None = None
+        self.lanes: list[str] = []
+        self._colors: dict[str, QColor] = {}
+        self._layout: tuple | None = None
+        self._drag_x: float | None = None
+
+    def set_span(self, span: int) -> None:
+        self.view_end = int(time.time())
+        self.view_start = self.view_end - span
+        self.view_changed.emit()
+
+    def set_viewport(self, viewport: Viewport | None) -> None:
+        self.viewport = viewport
+        self._layout = None
+        if viewport is not None:
+            # Lanes only ever get added, so rows don't jump while panning.
+            self.lanes.extend(category for category in viewport.categories if category not in self.lanes)
+        self.update()
+
+    def _x(self, timestamp: float) -> float:
+        width = self.width() - LANE_LABEL_WIDTH
+        return LANE_LABEL_WIDTH + (timestamp - self.view_start) / (self.view_end - self.view_start) * width
+
+    def _time_at(self, x: float) -> float:
+        width = max(1, self.width() - LANE_LABEL_WIDTH)
+        return self.view_start + (x - LANE_LABEL_WIDTH) / width * (self.view_end - self.view_start)
+
+    def _lane_height(self) -> float:
+        return max(14.0, min(40.0, (self.height() - AXIS_HEIGHT) / max(1, len(self.lanes))))
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().base())
+        self._paint_axis(painter)
+        lane_height = self._lane_height()
+        lane_of = {category: index for index, category in enumerate(self.lanes)}
+        for index, category in enumerate(self.lanes):
+            top = AXIS_HEIGHT + index * lane_height
+            painter.setPen(self.palette().text().color())
+            painter.drawText(QRectF(4, top, LANE_LABEL_WIDTH - 8, lane_height), Qt.AlignVCenter, category)
+
+        viewport = self.viewport
+        if viewport is None:
+            return
+        scale = max(1, self.width() - LANE_LABEL_WIDTH) / (self.view_end - self.view_start)
+        layout = self._layout
+        if layout is None or layout[0] is not viewport or layout[1] != (scale, lane_height):
+            batches = self._lay_out(viewport, scale, lane_height)
+            layout = self._layout = (viewport, (scale, lane_height), self.view_start, batches)
+        origin, batches = layout[2], layout[3]
+        # Panning only shifts the cached layout; it is rebuilt when the data,
+        # the zoom or the lane height change.
+        painter.setClipRect(QRectF(LANE_LABEL_WIDTH, 0, self.width(), self.height()))
+        painter.translate(LANE_LABEL_WIDTH + (origin - self.view_start) * scale, 0)
+        painter.setPen(Qt.NoPen)
+        for (category, shade), rects in batches.items():
+            color = QColor(self._color(category))
+            color.setAlphaF(0.25 + 0.75 * shade / ALPHA_STEPS)
+            painter.setBrush(color)
+            painter.drawRects(rects)
+
+    def _lay_out(self, viewport: Viewport, scale: float, lane_height: float) -> dict[tuple[str, int], list[QRectF]]:
+        # Rects in pixels from view_start, grouped so each brush is set once.
+        origin = self.view_start
+        tops = {category: AXIS_HEIGHT + index * lane_height + 2 for index, category in enumerate(self.lanes)}
+        height = lane_height - 4
+        batches: dict[tuple[str, int], list[QRectF]] = {}
+        if viewport.resolution == RAW:
+            for start, end, category, _, _ in viewport.items:
+                left = (start - origin) * scale
+                rect = QRectF(left, tops[category], max(1.0, (end - start) * scale), height)
+                batches.setdefault((category, ALPHA_STEPS), []).append(rect)
+            return batches
+
+        resolution = viewport.resolution
+        columns: dict[tuple[str, int], int] = {}
+        binned = resolution * scale < 1
+        if binned:
+            # Zoomed far out, several buckets land in each pixel column; sum
+            # them so each lane paints at most one rect per pixel.
+            resolution = 1 / scale
+            for bucket, category, seconds in viewport.items:
+                column = (category, int((bucket - origin) * scale))
+                columns[column] = columns.get(column, 0) + seconds
+        else:
+            for bucket, category, seconds in viewport.items:
+                columns[(category, bucket)] = seconds
+        width = resolution * scale
+        # Partly occupied buckets are drawn lighter, and neighbouring buckets
+        # of the same shade merge into one rect.
+        run_category, run_shade, run_left, run_right = None, 0, 0.0, 0.0
+        for (category, position), seconds in sorted(columns.items()):
+            shade = min(ALPHA_STEPS, max(1, round(seconds / resolution * ALPHA_STEPS)))
+            left = position if binned else (position - origin) * scale
+            if category == run_category and shade == run_shade and left - run_right < 0.5:
+                run_right = left + width
+                continue
+            if run_category is not None:
+                rect = QRectF(run_left, tops[run_category], max(1.0, run_right - run_left), height)
+                batches.setdefault((run_category, run_shade), []).append(rect)
+            run_category, run_shade, run_left, run_right = category, shade, left, left + width
+        if run_category is not None:
+            rect = QRectF(run_left, tops[run_category], max(1.0, run_right - run_left), height)
+            batches.setdefault((run_category, run_shade), []).append(rect)
+        return batches
+
+    def _color(self, category: str) -> QColor:
+        color = self._colors.get(category)
+        if color is None:
+            color = self._colors[category] = category_color(category)
+        return color
+
+    def _paint_axis(self, painter: QPainter) -> None:
+        span = self.view_end - self.view_start
+        width = max(1, self.width() - LANE_LABEL_WIDTH)
+        step = next((tick for tick in TICKS if tick / span * width >= 80), TICKS[-1])
+        # Align gridlines to local time.
+        offset = datetime.now().astimezone().utcoffset().total_seconds()
+        first = int((self.view_start + offset) // step * step - offset)
+        painter.setPen(self.palette().mid().color())
+        label_format = "%H:%M" if step < DAY else "%b %d"
+        for tick in range(first, int(self.view_end) + step, step):
+            x = self._x(tick)
+            if x < LANE_LABEL_WIDTH:
+                continue
+            painter.drawLine(QPointF(x, AXIS_HEIGHT - 4), QPointF(x, self.height()))
+            painter.drawText(QPointF(x + 3, AXIS_HEIGHT - 8), datetime.fromtimestamp(tick).strftime(label_format))
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        # The level of detail depends on the width, so refetch.
+        if event.oldSize().width() != event.size().width():
+            self.view_changed.emit()
+
+    def wheelEvent(self, event: QWheelEvent) -> None:
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        anchor = self._time_at(event.position().x())
+        span = min(MAX_SPAN, max(MIN_SPAN, (self.view_end - self.view_start) * factor))
+        ratio = (anchor - self.view_start) / (self.view_end - self.view_start)
+        self.view_start = int(anchor - span * ratio)
+        self.view_end = int(self.view_start + span)
+        self.update()
+        self.view_changed.emit()
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        if event.button() == Qt.LeftButton:
+            self._drag_x = event.position().x()
+
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        x = event.position().x()
+        if self._drag_x is not None:
+            shift = int(self._time_at(self._drag_x) - self._time_at(x))
+            self._drag_x = x
+            if shift:
+                self.view_start += shift
+                self.view_end += shift
+                self.update()
+                self.view_changed.emit()
+            return
+        self.setToolTip(self._describe(x, event.position().y()))
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        self._drag_x = None
+
+    def _describe(self, x: float, y: float) -> str:
+        viewport = self.viewport
+        lane = int((y - AXIS_HEIGHT) // self._lane_height())
+        if viewport is None or x < LANE_LABEL_WIDTH or not 0 <= lane < len(self.lanes):
+            return ""
+        category = self.lanes[lane]
+        moment = self._time_at(x)
+        if viewport.resolution == RAW:
+            for start, end, item_category, process_name, title in viewport.items:
+                if item_category == category and start <= moment < end:
+                    return f"{process_name} - {title}\n{format_duration(end - start)}"
+            return ""
+        for bucket, item_category, seconds in viewport.items:
+            if item_category == category and bucket <= moment < bucket + viewport.resolution:
+                return f"{category}: {format_duration(seconds)}"
+        return ""
+
+
+class TimelineWidget(QWidget):
+    requested = Signal(int, int, int, int)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.canvas = TimelineCanvas()
+        self.level_label = QLabel("")
+
+        controls = QHBoxLayout()
+        for name, span in SPANS.items():
+            button = QPushButton(name)
+            button.clicked.connect(lambda _checked=False, span=span: self.canvas.set_span(span))
+            controls.addWidget(button)
+        controls.addStretch()
+        controls.addWidget(self.level_label)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(QLabel("Scroll to zoom, drag to pan"))
+        layout.addWidget(self.canvas, 1)
+
+        self._request_id = 0
+        self._thread = QThread()
+        self._fetcher = TimelineFetcher()
+        self._fetcher.moveToThread(self._thread)
+        self.requested.connect(self._fetcher.fetch)
+        self._fetcher.fetched.connect(self._on_fetched)
+        self._thread.start()
+        QApplication.instance().aboutToQuit.connect(self._stop)
+
+        self.canvas.view_changed.connect(self.refresh)
+        self.refresh()
+
+    def refresh(self) -> None:
+        self._request_id += 1
+        self._fetcher.latest = self._request_id
+        self.requested.emit(
+            self._request_id,
+            self.canvas.view_start,
+            self.canvas.view_end,
+            max(1, self.canvas.width() - LANE_LABEL_WIDTH),
+        )
+
+    def _on_fetched(self, request_id: int, viewport: Viewport) -> None:
+        if request_id != self._request_id:
+            return
+        self.canvas.set_viewport(viewport)
+        level = {RAW: "sessions", 60: "per minute", HOUR: "per hour"}[viewport.resolution]
+        self.level_label.setText(f"{len(viewport.items)} items, {level}")
+
+    def release(self) -> None:
+        self.canvas.set_viewport(None)
+
+    def _stop(self) -> None:
+        self._thread.quit()
+        self._thread.wait()
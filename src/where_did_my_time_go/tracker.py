@@ -1,185 +1,46 @@
 from __future__ import annotations
 
 import threading
-import time
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
 
 from PySide6.QtCore import QObject, QThread, Signal
 
-from where_did_my_time_go.idle import get_idle_status
-from where_did_my_time_go.rules import AppContext, Rule, apply_rules
+from where_did_my_time_go.daemon import DaemonClient
 from where_did_my_time_go.settings import SettingsStore
-from where_did_my_time_go.storage import Database, SessionRecord, utc_now_iso
-from where_did_my_time_go.win_api import ForegroundApp, get_foreground_app, get_idle_seconds
-
-
-@dataclass
-class ActiveSession:
-    session_id: int
-    start_ts: str
-    process_name: str
-    window_title: str
-    exe_path: str
-    category: str
+from where_did_my_time_go.tracker_core import TrackerCore
 
 
 class TrackerWorker(QObject):
     session_updated = Signal()
     prompt_needed = Signal(int, str)
     tracking_status = Signal(str)
+    # (category or None, epoch seconds it took over)
+    activity_changed = Signal(object, float)
 
-    def __init__(self, settings: SettingsStore) -> None:
+    def __init__(self, settings: SettingsStore, **providers) -> None:
         super().__init__()
-        self._settings = settings
-        self._db = Database()
-        self._db.initialize()
-        self._db.ensure_default_rules()
-        self._running = threading.Event()
-        self._running.set()
-        self._paused = threading.Event()
-        self._paused.clear()
-        self._active_session: ActiveSession | None = None
-        self._last_tick = time.monotonic()
+        self.core = TrackerCore(
+            settings,
+            **providers,
+            on_session_updated=self.session_updated.emit,
+            on_prompt=self.prompt_needed.emit,
+            on_status=self.tracking_status.emit,
+            on_activity=lambda category, at: self.activity_changed.emit(category, at.timestamp()),
+        )
 
     def stop(self) -> None:
-        self._running.clear()
+        self.core.stop()
 
     def pause(self) -> None:
-        self._paused.set()
-        self._close_active_session()
-        self.tracking_status.emit("Paused")
+        self.core.pause()
 
     def resume(self) -> None:
-        self._paused.clear()
-        self.tracking_status.emit("Running")
+        self.core.resume()
 
     def run(self) -> None:
-        self.tracking_status.emit("Running")
-        while self._running.is_set():
-            if self._paused.is_set():
-                time.sleep(0.5)
-                continue
-            interval = max(1, self._settings.current.sampling_interval_sec)
-            now = time.monotonic()
-            gap = now - self._last_tick
-            self._last_tick = now
-
-            idle_threshold = self._settings.current.idle_threshold_min * 60
-            idle_status = get_idle_status(get_idle_seconds, idle_threshold)
-            if idle_status.is_idle:
-                self._handle_idle_gap(int(gap))
-            else:
-                if gap > interval * 3:
-                    self._close_session_with_gap(int(gap))
-                self._track_foreground()
-
-            time.sleep(interval)
-
-    def _handle_idle_gap(self, gap: int) -> None:
-        self._close_active_session()
-        if gap > 0:
-            self._create_idle_session(gap)
-
-    def _close_session_with_gap(self, gap: int) -> None:
-        self._close_active_session()
-        self._create_idle_session(gap)
-
-    def _create_idle_session(self, duration: int) -> None:
-        end = datetime.now(timezone.utc)
-        start = end - timedelta(seconds=duration)
-        start_ts = start.isoformat()
-        end_ts = end.isoformat()
-        record = SessionRecord(
-            start_ts=start_ts,
-            end_ts=end_ts,
-            duration_sec=duration,
-            process_name="Idle",
-            exe_path="",
-            window_title="",
-            category="Idle",
-            intent_tag=None,
-        )
-        self._db.add_session(record)
-        self.session_updated.emit()
-
-    def _track_foreground(self) -> None:
-        app = get_foreground_app()
-        app_context = AppContext(app.process_name, app.window_title)
-        rules = [Rule(**dict(row)) for row in self._db.list_rules()]
-        category = apply_rules(rules, app_context)
-
-        if self._active_session is None:
-            self._start_session(app, category)
-            return
-        if (
-            app.process_name != self._active_session.process_name
-            or app.window_title != self._active_session.window_title
-        ):
-            self._close_active_session()
-            self._start_session(app, category)
-        else:
-            self._refresh_active_session()
-
-    def _refresh_active_session(self) -> None:
-        if not self._active_session:
-            return
-        end_ts = utc_now_iso()
-        start_dt = datetime.fromisoformat(self._active_session.start_ts)
-        end_dt = datetime.fromisoformat(end_ts)
-        duration = max(0, int((end_dt - start_dt).total_seconds()))
-        self._db.update_session_end(self._active_session.session_id, end_ts, duration)
-        self.session_updated.emit()
-
-    def _start_session(self, app: ForegroundApp, category: str) -> None:
-        start_ts = utc_now_iso()
-        record = SessionRecord(
-            start_ts=start_ts,
-            end_ts=start_ts,
-            duration_sec=0,
-            process_name=app.process_name or "Unknown",
-            exe_path=app.exe_path or "",
-            window_title=app.window_title or "",
-            category=category,
-            intent_tag=None,
-        )
-        session_id = self._db.add_session(record)
-        self._active_session = ActiveSession(
-            session_id=session_id,
-            start_ts=start_ts,
-            process_name=record.process_name,
-            window_title=record.window_title,
-            exe_path=record.exe_path,
-            category=record.category,
-        )
-        self.session_updated.emit()
-        if self._should_prompt(category):
-            self.prompt_needed.emit(session_id, category)
-
-    def _close_active_session(self) -> None:
-        if not self._active_session:
-            return
-        end_ts = utc_now_iso()
-        start_dt = datetime.fromisoformat(self._active_session.start_ts)
-        end_dt = datetime.fromisoformat(end_ts)
-        duration = max(0, int((end_dt - start_dt).total_seconds()))
-        self._db.update_session_end(self._active_session.session_id, end_ts, duration)
-        self._active_session = None
-        self.session_updated.emit()
-
-    def _should_prompt(self, category: str) -> bool:
-        settings = self._settings.current
-        if not settings.prompts_enabled:
-            return False
-        if category not in settings.distraction_categories:
-            return False
-        now = datetime.now().time()
-        if settings.focus_start <= settings.focus_end:
-            return settings.focus_start <= now <= settings.focus_end
-        return now >= settings.focus_start or now <= settings.focus_end
+        self.core.run()
 
     def set_intent_tag(self, session_id: int, intent: str) -> None:
-        self._db.update_session_intent(session_id, intent)
+        self.core.set_intent_tag(session_id, intent)
 
 
 class TrackerController:
@@ -206,3 +67,59 @@ class TrackerController:
 
     def resume(self) -> None:
         self._worker.resume()
+
+
+class RemoteWorker(QObject):
+    session_updated = Signal()
+    prompt_needed = Signal(int, str)
+    tracking_status = Signal(str)
+    activity_changed = Signal(object, float)
+
+    def __init__(self, client: DaemonClient) -> None:
+        super().__init__()
+        self._client = client
+
+    def set_intent_tag(self, session_id: int, intent: str) -> None:
+        self._client.send("intent", session_id, intent)
+
+    def dispatch(self, message: tuple) -> None:
+        # Runs on the reader thread; Qt queues the signals to the GUI thread.
+        kind = message[0]
+        if kind == "session":
+            self.session_updated.emit()
+        elif kind == "prompt":
+            self.prompt_needed.emit(message[1], message[2])
+        elif kind == "status":
+            self.tracking_status.emit(message[1])
+        elif kind == "activity":
+            self.activity_changed.emit(message[1], message[2])
+
+
+# Same surface as TrackerController, backed by a headless tracker daemon.
+# Stopping only detaches the UI; the daemon keeps tracking.
+class RemoteTrackerController:
+    def __init__(self, client: DaemonClient) -> None:
+        self._client = client
+        self._worker = RemoteWorker(client)
+        self._reader = threading.Thread(target=self._read, name="daemon-client", daemon=True)
+
+    @property
+    def worker(self) -> RemoteWorker:
+        return self._worker
+
+    def start(self) -> None:
+        self._client.send("subscribe")
+        self._reader.start()
+
+    def stop(self) -> None:
+        self._client.close()
+
+    def pause(self) -> None:
+        self._client.send("pause")
+
+    def resume(self) -> None:
+        self._client.send("resume")
+
+    def _read(self) -> None:
+        for message in self._client.messages():
+            self._worker.dispatch(message)
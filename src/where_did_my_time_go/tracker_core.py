@@ -0,0 +1,427 @@
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable
+
+from where_did_my_time_go.clock import SystemClock, TimeAccounting, system_clock
+from where_did_my_time_go.eventlog import EventLog
+from where_did_my_time_go.idle import get_idle_status
+from where_did_my_time_go.metrics import registry as metrics
+from where_did_my_time_go.profiling import profiler
+from where_did_my_time_go.rules import AppContext, Rule, apply_rules
+from where_did_my_time_go.settings import SettingsStore
+from where_did_my_time_go.storage import Database, SessionRecord, to_iso
+
+if TYPE_CHECKING:
+    from where_did_my_time_go.win_api import ForegroundApp
+
+
+@dataclass(slots=True)
+class ActiveSession:
+    session_id: int
+    start_ts: str
+    process_name: str
+    window_title: str
+    exe_path: str
+    category: str
+
+
+def _noop(*_args) -> None:
+    pass
+
+
+def _duration(start_ts: str, end_ts: str) -> int:
+    return max(0, int((datetime.fromisoformat(end_ts) - datetime.fromisoformat(start_ts)).total_seconds()))
+
+
+def _idle_record(start_ts: str, end_ts: str) -> SessionRecord:
+    return SessionRecord(
+        start_ts=start_ts,
+        end_ts=end_ts,
+        duration_sec=_duration(start_ts, end_ts),
+        process_name="Idle",
+        exe_path="",
+        window_title="",
+        category="Idle",
+        intent_tag=None,
+    )
+
+
+# The tracking loop without Qt, shared by the in-app QThread worker and the
+# headless daemon. Listeners are plain callables invoked on the tracker thread.
+class TrackerCore:
+    def __init__(
+        self,
+        settings: SettingsStore,
+        db: Database | None = None,
+        foreground: Callable[[], ForegroundApp] | None = None,
+        idle_seconds: Callable[[], int] | None = None,
+        clock: SystemClock = system_clock,
+        on_session_updated: Callable[[], None] = _noop,
+        on_prompt: Callable[[int, str], None] = _noop,
+        on_status: Callable[[str], None] = _noop,
+        on_activity: Callable[[str | None, datetime], None] = _noop,
+        on_session_closed: Callable[[int, SessionRecord], None] = _noop,
+    ) -> None:
+        if foreground is None or idle_seconds is None:
+            # win_api binds user32/kernel32 at import, so only load it when no
+            # provider was injected.
+            from where_did_my_time_go import win_api
+
+            foreground = foreground or win_api.get_foreground_app
+            idle_seconds = idle_seconds or win_api.get_idle_seconds
+        self._settings = settings
+        self._foreground = foreground
+        self._idle_seconds = idle_seconds
+        self._clock = clock
+        self.on_session_updated = on_session_updated
+        self.on_prompt = on_prompt
+        self.on_status = on_status
+        # Called with the category being credited ("Idle" while idle, None
+        # while paused) and the time it took over, only when it changes.
+        self.on_activity = on_activity
+        # Called with each finished session and its id, active or idle, once
+        # its end is written; listeners must return quickly. Sessions close in
+        # id order.
+        self.on_session_closed = on_session_closed
+        self._activity: str | None = None
+        # Built on one thread and looped on another, so opt out of sqlite's
+        # same-thread check; only the loop's thread uses it once run() starts.
+        self._db = db or Database(check_same_thread=False)
+        self._db.initialize()
+        self._db.ensure_default_rules()
+        self._events: EventLog | None = None
+        if settings.current.storage_mode == "events":
+            self._events = EventLog(self._db)
+            self._events.recover()
+        self._running = threading.Event()
+        self._running.set()
+        self._paused = threading.Event()
+        self._paused.clear()
+        self._active_session: ActiveSession | None = None
+        # (session_id, start_ts) of the open Idle row in sessions mode.
+        self._idle_session: tuple[int, str] | None = None
+        # (session_id, record) of whatever span is open, in either storage
+        # mode, and the last intent tag set on it.
+        self._open: tuple[int, SessionRecord] | None = None
+        self._open_intent: tuple[int, str] | None = None
+        self._rules: list[Rule] = []
+        self._rules_version = -1
+        # pause, resume and set_intent_tag arrive from the UI or IPC threads;
+        # while run() loops they are queued here and run between ticks.
+        self._commands: queue.SimpleQueue[Callable[[], None]] = queue.SimpleQueue()
+        self._loop_thread: int | None = None
+        # Session times are taken from here, not the wall clock directly. It
+        # never steps back, so sessions and the focus log stay in time order.
+        self._time = TimeAccounting(clock)
+
+    @property
+    def active_session(self) -> ActiveSession | None:
+        return self._active_session
+
+    @property
+    def paused(self) -> bool:
+        return self._paused.is_set()
+
+    def stop(self) -> None:
+        self._running.clear()
+
+    def pause(self) -> None:
+        self._call(self._pause)
+
+    def resume(self) -> None:
+        self._call(self._resume)
+
+    def set_intent_tag(self, session_id: int, intent: str) -> None:
+        self._call(lambda: self._set_intent_tag(session_id, intent))
+
+    def run(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self.on_status("Running")
+        while self._running.is_set():
+            self._run_commands()
+            if self._paused.is_set():
+                self._clock.sleep(0.5)
+                continue
+            self._clock.sleep(self.tick())
+        self._run_commands()
+        if self._events is not None:
+            end_ts = self._now_iso()
+            self._events.stop(end_ts)
+            self._finish_open(end_ts)
+        self._report_activity(None, self._time.now())
+        self._loop_thread = None
+        # Anything posted while the loop was finishing.
+        self._run_commands()
+
+    def _call(self, command: Callable[[], None]) -> None:
+        # Keeps the core's state and its connection to one thread at a time:
+        # the loop's while it runs, otherwise the caller's.
+        if self._loop_thread is None or self._loop_thread == threading.get_ident():
+            command()
+        else:
+            self._commands.put(command)
+
+    def _run_commands(self) -> None:
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            command()
+
+    def _pause(self) -> None:
+        self._paused.set()
+        self._close_active_session()
+        self._report_activity(None, self._time.now())
+        self.on_status("Paused")
+
+    def _resume(self) -> None:
+        self._paused.clear()
+        self.on_status("Running")
+
+    def tick(self) -> float:
+        interval = max(1, self._settings.current.sampling_interval_sec)
+        step = self._time.advance()
+        gap = step.elapsed
+        metrics.observe("tracker.drift", max(0.0, gap - step.suspended - interval) * 1000.0)
+
+        with metrics.timer("tracker.tick"), profiler.section("tracker"):
+            if step.jumped_from is not None:
+                # The wall clock stepped forward: end whatever is open where the
+                # old timeline stopped; the next session starts on the new one.
+                metrics.increment("tracker.clock_jump")
+                self._close_active_session(to_iso(step.jumped_from))
+            if step.suspended > interval:
+                metrics.increment("tracker.suspend_detected")
+            idle_threshold = self._settings.current.idle_threshold_min * 60
+            with metrics.timer("tracker.idle_check"):
+                idle_status = get_idle_status(self._idle_seconds, idle_threshold)
+            if idle_status.is_idle:
+                self._handle_idle_gap(int(gap))
+            else:
+                if gap > interval * 3:
+                    metrics.increment("tracker.gap_detected")
+                    self._close_session_with_gap(int(gap))
+                self._track_foreground()
+        return interval
+
+    def _now_iso(self) -> str:
+        return to_iso(self._time.now())
+
+    def _report_activity(self, category: str | None, at: datetime) -> None:
+        if category != self._activity:
+            self._activity = category
+            self.on_activity(category, at)
+
+    def _handle_idle_gap(self, gap: int) -> None:
+        if self._events is not None:
+            self._log_idle(gap)
+            return
+        now = self._time.now()
+        if self._idle_session is not None:
+            # One Idle row per idle stretch, extended like an active session.
+            session_id, start_ts = self._idle_session
+            end_ts = to_iso(now)
+            with metrics.timer("tracker.db_write"):
+                self._db.update_session_end(session_id, end_ts, _duration(start_ts, end_ts))
+            self.on_session_updated()
+            return
+        # The active session was last extended one tick ago, which is where
+        # the idle stretch starts, so the two meet without overlapping.
+        idle_start = now - timedelta(seconds=gap)
+        self._report_activity("Idle", idle_start)
+        start_ts = to_iso(idle_start)
+        self._close_active_session(start_ts)
+        self._idle_session = (self._create_idle_session(start_ts, to_iso(now), closed=False), start_ts)
+
+    def _close_session_with_gap(self, gap: int) -> None:
+        now = self._time.now()
+        self._report_activity("Idle", now - timedelta(seconds=gap))
+        start_ts = to_iso(now - timedelta(seconds=gap))
+        if self._events is not None:
+            self._active_session = None
+            with metrics.timer("tracker.db_write"):
+                session_id = self._events.idle(start_ts)
+            self._finish_open(start_ts)
+            self._open = (session_id, _idle_record(start_ts, start_ts))
+            return
+        self._close_active_session(start_ts)
+        self._create_idle_session(start_ts, to_iso(now), closed=True)
+
+    def _log_idle(self, gap: int) -> None:
+        now = self._time.now()
+        with metrics.timer("tracker.db_write"):
+            if self._events.is_idle:
+                if not self._events.checkpoint(to_iso(now)):
+                    return
+            else:
+                self._active_session = None
+                self._report_activity("Idle", now - timedelta(seconds=gap))
+                start_ts = to_iso(now - timedelta(seconds=gap))
+                session_id = self._events.idle(start_ts)
+                self._finish_open(start_ts)
+                self._open = (session_id, _idle_record(start_ts, start_ts))
+        self.on_session_updated()
+
+    def _create_idle_session(self, start_ts: str, end_ts: str, closed: bool) -> int:
+        record = _idle_record(start_ts, end_ts)
+        with metrics.timer("tracker.db_write"):
+            session_id = self._db.add_session(record)
+        if closed:
+            self.on_session_closed(session_id, record)
+        else:
+            self._open = (session_id, record)
+        self.on_session_updated()
+        return session_id
+
+    def _track_foreground(self) -> None:
+        with metrics.timer("tracker.foreground_lookup"):
+            app = self._foreground()
+        with metrics.timer("tracker.rules_fetch"):
+            rules = self._current_rules()
+        with metrics.timer("tracker.classification"):
+            category = apply_rules(rules, AppContext(app.process_name, app.window_title))
+
+        if self._idle_session is not None:
+            self._close_active_session()
+        if self._active_session is None:
+            self._start_session(app, category)
+            return
+        if (
+            app.process_name != self._active_session.process_name
+            or app.window_title != self._active_session.window_title
+        ):
+            if self._events is None:
+                self._close_active_session()
+            self._start_session(app, category)
+        else:
+            self._refresh_active_session()
+
+    def _current_rules(self) -> list[Rule]:
+        # Re-reading and re-allocating every rule each tick adds up over a day;
+        # only reload when the rules version stamp moves.
+        version = self._db.rules_version()
+        if version != self._rules_version:
+            self._rules = [Rule(**dict(row)) for row in self._db.list_rules()]
+            self._rules_version = version
+        return self._rules
+
+    def _session_duration(self, end_ts: str) -> int:
+        return _duration(self._active_session.start_ts, end_ts)
+
+    def _refresh_active_session(self) -> None:
+        if not self._active_session:
+            return
+        end_ts = self._now_iso()
+        with metrics.timer("tracker.db_write"):
+            if self._events is not None:
+                if not self._events.checkpoint(end_ts):
+                    return
+            else:
+                duration = self._session_duration(end_ts)
+                self._db.update_session_end(self._active_session.session_id, end_ts, duration)
+        self.on_session_updated()
+
+    def _start_session(self, app: ForegroundApp, category: str) -> None:
+        now = self._time.now()
+        self._report_activity(category, now)
+        start_ts = to_iso(now)
+        record = SessionRecord(
+            start_ts=start_ts,
+            end_ts=start_ts,
+            duration_sec=0,
+            process_name=app.process_name or "Unknown",
+            exe_path=app.exe_path or "",
+            window_title=app.window_title or "",
+            category=category,
+            intent_tag=None,
+        )
+        with metrics.timer("tracker.db_write"):
+            if self._events is not None:
+                # Appending the focus event also closes the previous session.
+                session_id = self._events.focus(
+                    start_ts, record.process_name, record.exe_path, record.window_title, category
+                )
+            else:
+                session_id = self._db.add_session(record)
+        # In events mode the focus event is also what ended the previous span.
+        self._finish_open(start_ts)
+        self._open = (session_id, record)
+        self._active_session = ActiveSession(
+            session_id=session_id,
+            start_ts=start_ts,
+            process_name=record.process_name,
+            window_title=record.window_title,
+            exe_path=record.exe_path,
+            category=record.category,
+        )
+        self.on_session_updated()
+        if self._should_prompt(category):
+            self.on_prompt(session_id, category)
+
+    def _close_active_session(self, end_ts: str | None = None) -> None:
+        end_ts = end_ts or self._now_iso()
+        if self._events is not None:
+            # Also ends an open idle span, which has no ActiveSession.
+            self._active_session = None
+            if self._events.is_open:
+                with metrics.timer("tracker.db_write"):
+                    self._events.stop(end_ts)
+                self._finish_open(end_ts)
+                self.on_session_updated()
+            return
+        if self._idle_session is not None:
+            session_id, start_ts = self._idle_session
+            self._idle_session = None
+            end_ts = max(end_ts, start_ts)
+            with metrics.timer("tracker.db_write"):
+                self._db.update_session_end(session_id, end_ts, _duration(start_ts, end_ts))
+            self._finish_open(end_ts)
+            self.on_session_updated()
+            return
+        if not self._active_session:
+            return
+        end_ts = max(end_ts, self._active_session.start_ts)
+        with metrics.timer("tracker.db_write"):
+            self._db.update_session_end(
+                self._active_session.session_id, end_ts, self._session_duration(end_ts)
+            )
+        self._active_session = None
+        self._finish_open(end_ts)
+        self.on_session_updated()
+
+    def _finish_open(self, end_ts: str) -> None:
+        if self._open is None:
+            return
+        session_id, record = self._open
+        self._open = None
+        end_ts = max(end_ts, record.start_ts)
+        intent = self._open_intent
+        self.on_session_closed(
+            session_id,
+            replace(
+                record,
+                end_ts=end_ts,
+                duration_sec=_duration(record.start_ts, end_ts),
+                intent_tag=intent[1] if intent and intent[0] == session_id else record.intent_tag,
+            )
+        )
+
+    def _should_prompt(self, category: str) -> bool:
+        settings = self._settings.current
+        if not settings.prompts_enabled:
+            return False
+        if category not in settings.distraction_categories:
+            return False
+        now = self._clock.now().astimezone().time()
+        if settings.focus_start <= settings.focus_end:
+            return settings.focus_start <= now <= settings.focus_end
+        return now >= settings.focus_start or now <= settings.focus_end
+
+    def _set_intent_tag(self, session_id: int, intent: str) -> None:
+        self._db.update_session_intent(session_id, intent)
+        self._open_intent = (session_id, intent)
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+from PySide6.QtCore import QTimer
 from PySide6.QtGui import QAction, QIcon
 from PySide6.QtWidgets import QMenu, QSystemTrayIcon
 
+from where_did_my_time_go.backup import BackupResult, BackupScheduler
+from where_did_my_time_go.exporter import ExportHub
+from where_did_my_time_go.goals import GoalTracker
+from where_did_my_time_go.live_totals import DayTotals
+from where_did_my_time_go.profiling import profiler
 from where_did_my_time_go.settings import SettingsStore
+from where_did_my_time_go.storage import Database
 from where_did_my_time_go.tracker import TrackerController
-from where_did_my_time_go.utils import optional_icon
+from where_did_my_time_go.utils import format_duration, optional_icon
+
+GOAL_CHECK_MS = 5000
+# The live totals follow the tracker's switches; storage is re-read now and
+# then to pick up imports, edits and anything the switches missed.
+RECONCILE_MS = 10 * 60 * 1000
 
 
 class TrayController:
@@ -15,36 +27,80 @@ class TrayController:
         main_window,
         tracker: TrackerController,
         settings: SettingsStore,
+        backups: BackupScheduler | None = None,
+        api_error: str = "",
+        exports: ExportHub | None = None,
     ) -> None:
         self._main_window = main_window
         self._tracker = tracker
         self._settings = settings
+        self._backups = backups
+        self._reported_backup: BackupResult | None = None
+        self._api_error = api_error
+        self._exports = exports
+        self._reported_exports: dict[int, str] = {}
 
         icon_path = optional_icon("icon.ico")
         self.tray = QSystemTrayIcon(QIcon(icon_path) if icon_path else QIcon(), app)
         menu = QMenu()
+        self.today_action = QAction("Today: -")
+        self.today_action.setEnabled(False)
+        self.top_action = QAction("Top: -")
+        self.top_action.setEnabled(False)
         open_action = QAction("Open")
         pause_action = QAction("Pause Tracking")
         resume_action = QAction("Resume Tracking")
+        self.profile_action = QAction("Profiling")
+        self.profile_action.setCheckable(True)
+        self.profile_action.setChecked(profiler.active)
         quit_action = QAction("Quit")
 
         open_action.triggered.connect(self.show_main)
         pause_action.triggered.connect(self._tracker.pause)
         resume_action.triggered.connect(self._tracker.resume)
+        self.profile_action.toggled.connect(self._toggle_profiling)
         quit_action.triggered.connect(self.quit)
 
+        menu.addAction(self.today_action)
+        menu.addAction(self.top_action)
+        menu.addSeparator()
         menu.addAction(open_action)
         menu.addAction(pause_action)
         menu.addAction(resume_action)
         menu.addSeparator()
+        menu.addAction(self.profile_action)
+        menu.addSeparator()
         menu.addAction(quit_action)
 
+        menu.aboutToShow.connect(self._update_stats)
         self.tray.setContextMenu(menu)
 
         tracker.worker.prompt_needed.connect(self._handle_prompt)
 
+        db = Database()
+        self.goals = GoalTracker(settings, db)
+        self.today = DayTotals(db)
+        tracker.worker.activity_changed.connect(self.goals.switch)
+        tracker.worker.activity_changed.connect(self.today.switch)
+        self._goal_timer = QTimer(self.tray)
+        self._goal_timer.setInterval(GOAL_CHECK_MS)
+        self._goal_timer.timeout.connect(self._check_goals)
+        self._goal_timer.timeout.connect(self._update_stats)
+        self._goal_timer.timeout.connect(self._check_backup)
+        self._goal_timer.timeout.connect(self._check_exports)
+        self._goal_timer.start()
+        self._reconcile_timer = QTimer(self.tray)
+        self._reconcile_timer.setInterval(RECONCILE_MS)
+        self._reconcile_timer.timeout.connect(self.today.reconcile)
+        self._reconcile_timer.start()
+        self._update_stats()
+
     def show(self) -> None:
         self.tray.show()
+        if self._api_error:
+            self.tray.showMessage("Query API not started", self._api_error, QSystemTrayIcon.Warning)
+        for error in self._exports.errors if self._exports else []:
+            self.tray.showMessage("Export not started", error, QSystemTrayIcon.Warning)
 
     def show_main(self) -> None:
         self._main_window.show()
@@ -53,6 +109,57 @@ class TrayController:
     def _handle_prompt(self, session_id: int, category: str) -> None:
         self._main_window.handle_prompt(session_id, category, self._tracker.worker.set_intent_tag)
 
+    def _check_goals(self) -> None:
+        alert = self.goals.evaluate()
+        if alert is None:
+            return
+        window = "during focus hours " if self._settings.current.budgets_focus_only else ""
+        self.tray.showMessage(
+            "Daily budget reached",
+            f"{alert.category}: {format_duration(alert.spent_sec)} {window}today "
+            f"(budget {format_duration(alert.limit_sec)})",
+            QSystemTrayIcon.Warning,
+        )
+
+    def _check_backup(self) -> None:
+        result = self._backups.last_result if self._backups else None
+        if result is None or result is self._reported_backup:
+            return
+        self._reported_backup = result
+        if result.error:
+            self.tray.showMessage("Backup failed", result.error, QSystemTrayIcon.Critical)
+        elif not result.ok:
+            self.tray.showMessage(
+                "Backup failed its integrity check",
+                "; ".join(result.problems[:3]),
+                QSystemTrayIcon.Critical,
+            )
+
+    def _check_exports(self) -> None:
+        # Once per new failure; a sink that recovers and fails again is
+        # reported again.
+        for index, exporter in enumerate(self._exports.exporters if self._exports else []):
+            error = exporter.last_error
+            if error and error != self._reported_exports.get(index):
+                self.tray.showMessage("Export failed", error, QSystemTrayIcon.Warning)
+            self._reported_exports[index] = error
+
+    def _update_stats(self) -> None:
+        stats = self.today.stats()
+        today = f"Today: {format_duration(stats.active_sec)} active, {format_duration(stats.idle_sec)} idle"
+        top = f"Top: {stats.top_category} {format_duration(stats.top_sec)}" if stats.top_category else "Top: -"
+        self.today_action.setText(today)
+        self.top_action.setText(top)
+        self.tray.setToolTip(f"Where Did My Time Go?\n{today}\n{top}")
+
+    def _toggle_profiling(self, enabled: bool) -> None:
+        if enabled:
+            profiler.start()
+            return
+        summary_path = profiler.stop()
+        if summary_path is not None:
+            self.tray.showMessage("Profiling stopped", f"Profile saved to {summary_path.parent}")
+
     def quit(self) -> None:
         self._tracker.stop()
         self.tray.hide()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from PySide6.QtCharts import QChart, QChartView, QDateTimeAxis, QLineSeries, QValueAxis
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QHBoxLayout,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from where_did_my_time_go.analytics import (
+    category_trends,
+    context_switch_rate,
+    hour_weekday_heatmap,
+    load_columns,
+    utc_offsets,
+)
+from where_did_my_time_go.storage import Database
+from where_did_my_time_go.utils import format_duration
+
+RANGES = {"Last 7 Days": 7, "Last 30 Days": 30, "Last 90 Days": 90, "Last 365 Days": 365}
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+class TrendsWidget(QWidget):
+    def __init__(self) -> None:
+        super().__init__()
+        self._db = Database()
+        self._db.initialize()
+
+        self.range_combo = QComboBox()
+        self.range_combo.addItems(list(RANGES))
+        self.range_combo.setCurrentText("Last 30 Days")
+        self.switch_label = QLabel("")
+
+        self.heatmap = QTableWidget(7, 24)
+        self.heatmap.setVerticalHeaderLabels(WEEKDAYS)
+        self.heatmap.setHorizontalHeaderLabels([str(hour) for hour in range(24)])
+        self.heatmap.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.heatmap.horizontalHeader().setDefaultSectionSize(36)
+
+        self.trend_chart = QChart()
+        self.trend_chart.setTitle("Active Time per Category (hours/day)")
+        self.trend_view = QChartView(self.trend_chart)
+        self.trend_view.setRenderHint(QPainter.Antialiasing)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Range"))
+        controls.addWidget(self.range_combo)
+        controls.addStretch()
+        controls.addWidget(self.switch_label)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(QLabel("Active Time by Weekday and Hour"))
+        layout.addWidget(self.heatmap)
+        layout.addWidget(self.trend_view)
+
+        self.range_combo.currentTextChanged.connect(self.refresh)
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        now = datetime.now(timezone.utc)
+        start = now - timedelta(days=RANGES[self.range_combo.currentText()])
+        columns = load_columns(self._db, start.isoformat(), now.isoformat()).without_categories(["Idle"])
+        offset = utc_offsets(columns.start)
+
+        heatmap = hour_weekday_heatmap(columns, offset)
+        peak = float(heatmap.max()) or 1.0
+        for weekday in range(7):
+            for hour in range(24):
+                seconds = int(heatmap[weekday, hour])
+                item = QTableWidgetItem(str(seconds // 60) if seconds else "")
+                item.setTextAlignment(Qt.AlignCenter)
+                intensity = int(255 * seconds / peak)
+                item.setBackground(QColor(255 - intensity // 2, 255 - intensity // 3, 255))
+                item.setToolTip(f"{WEEKDAYS[weekday]} {hour:02d}:00 - {format_duration(seconds)}")
+                self.heatmap.setItem(weekday, hour, item)
+
+        days, rates = context_switch_rate(columns, offset)
+        if len(rates):
+            self.switch_label.setText(f"Avg app switches per active hour: {rates.mean():.1f}")
+        else:
+            self.switch_label.setText("")
+
+        self.trend_chart.removeAllSeries()
+        for axis in self.trend_chart.axes():
+            self.trend_chart.removeAxis(axis)
+        days, totals = category_trends(columns, offset)
+        if not len(days):
+            return
+        axis_x = QDateTimeAxis()
+        axis_x.setFormat("MMM d")
+        axis_y = QValueAxis()
+        axis_y.setMin(0)
+        axis_y.setMax(max(1.0, float(totals.max()) / 3600))
+        self.trend_chart.addAxis(axis_x, Qt.AlignBottom)
+        self.trend_chart.addAxis(axis_y, Qt.AlignLeft)
+        for code, category in enumerate(columns.categories):
+            if not totals[code].any():
+                continue
+            series = QLineSeries()
+            series.setName(category)
+            for day, seconds in zip(days, totals[code]):
+                series.append(_local_midnight_ms(int(day)), float(seconds) / 3600)
+            self.trend_chart.addSeries(series)
+            series.attachAxis(axis_x)
+            series.attachAxis(axis_y)
+
+    def release(self) -> None:
+        self.heatmap.clearContents()
+        self.trend_chart.removeAllSeries()
+
+
+# QDateTimeAxis shows local time, so plot each local day at its own midnight.
+def _local_midnight_ms(day_number: int) -> float:
+    day = date(1970, 1, 1) + timedelta(days=day_number)
+    return datetime(day.year, day.month, day.day).timestamp() * 1000
@@ -15,3 +15,9 @@ def asset_path(name: str) -> str:
 def optional_icon(name: str) -> str | None:
     path = Path(asset_path(name))
     return str(path) if path.exists() else None
+
+
+def format_duration(seconds: int) -> str:
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    return f"{hours}h {minutes}m"
@@ -47,7 +47,7 @@ GetLastInputInfo.argtypes = [ctypes.POINTER(LASTINPUTINFO)]
 GetLastInputInfo.restype = wintypes.BOOL
 
 
-@dataclass
+@dataclass(slots=True)
 class ForegroundApp:
     process_name: str
     window_title: str
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from where_did_my_time_go.analytics import (  # noqa: E402
+    category_trends,
+    context_switch_rate,
+    hour_weekday_heatmap,
+    load_columns,
+    split_intervals,
+)
+from where_did_my_time_go.storage import Database, SessionRecord  # noqa: E402
+
+
+def _add(db: Database, start: datetime, seconds: int, process: str, category: str) -> None:
+    db.add_session(
+        SessionRecord(
+            start_ts=start.isoformat(),
+            end_ts=(start + timedelta(seconds=seconds)).isoformat(),
+            duration_sec=seconds,
+            process_name=process,
+            exe_path="",
+            window_title="",
+            category=category,
+            intent_tag=None,
+        )
+    )
+
+
+def test_split_intervals_across_hour_boundaries() -> None:
+    start = np.array([3000, 7200], dtype=np.int64)
+    end = np.array([11000, 7260], dtype=np.int64)
+    index, bucket, seconds = split_intervals(start, end, 3600)
+    assert index.tolist() == [0, 0, 0, 0, 1]
+    assert bucket.tolist() == [0, 1, 2, 3, 2]
+    assert seconds.tolist() == [600, 3600, 3600, 200, 60]
+
+
+def test_heatmap_trends_and_switches(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    monday = datetime(2024, 5, 6, 9, 30, tzinfo=timezone.utc)
+    _add(db, monday, 3600, "code.exe", "Work")
+    _add(db, monday + timedelta(hours=1), 600, "chrome.exe", "Video")
+    _add(db, monday + timedelta(days=1, hours=14), 1200, "code.exe", "Work")
+
+    columns = load_columns(db, (monday - timedelta(days=1)).isoformat(), (monday + timedelta(days=2)).isoformat())
+    assert columns.categories == ["Video", "Work"]
+
+    heatmap = hour_weekday_heatmap(columns)
+    assert heatmap.shape == (7, 24)
+    assert heatmap[0, 9] == 1800 and heatmap[0, 10] == 1800 + 600
+    assert heatmap[1, 23] == 1200
+    assert heatmap.sum() == 3600 + 600 + 1200
+
+    shifted = hour_weekday_heatmap(columns, utc_offset_sec=3600)
+    assert shifted[2, 0] == 1200
+
+    days, totals = category_trends(columns)
+    assert len(days) == 2
+    assert totals[1].tolist() == [3600, 1200]
+    assert totals[0].tolist() == [600, 0]
+
+    _, rates = context_switch_rate(columns)
+    assert rates[0] == pytest.approx(1 / (4200 / 3600))
+    assert rates[1] == pytest.approx(1 / (1200 / 3600))
+
+
+def test_offsets_follow_dst_transitions(tmp_path: Path) -> None:
+    from where_did_my_time_go.analytics import utc_offsets
+
+    # A zone at UTC+1 that moves to UTC+2 at 2024-03-31 01:00 UTC.
+    change = int(datetime(2024, 3, 31, 1, tzinfo=timezone.utc).timestamp())
+
+    def offset_at(timestamp: int) -> int:
+        return 7200 if timestamp >= change else 3600
+
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    _add(db, datetime(2024, 3, 30, 8, 0, tzinfo=timezone.utc), 600, "code.exe", "Work")
+    _add(db, datetime(2024, 4, 1, 8, 0, tzinfo=timezone.utc), 600, "code.exe", "Work")
+    _add(db, datetime(2024, 4, 1, 22, 30, tzinfo=timezone.utc), 600, "code.exe", "Work")
+    columns = load_columns(db, "2024-03-29", "2024-04-03")
+
+    offsets = utc_offsets(columns.start, offset_at)
+    assert offsets.tolist() == [3600, 7200, 7200]
+    heatmap = hour_weekday_heatmap(columns, offsets)
+    assert heatmap[5, 9] == 600
+    assert heatmap[0, 10] == 600
+    days, totals = category_trends(columns, offsets)
+    assert totals[0].tolist() == [600, 0, 600, 600]
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from where_did_my_time_go import backup
+from where_did_my_time_go.backup import BackupScheduler, list_backups, run_backup
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.settings import Settings
+from where_did_my_time_go.storage import Database, SessionRecord
+
+START = datetime(2026, 3, 10, 9, tzinfo=timezone.utc)
+
+
+def _seed(path: Path, count: int) -> Database:
+    db = Database(path, check_same_thread=False)
+    db.initialize()
+    db.add_sessions(
+        SessionRecord(
+            start_ts=(START + timedelta(seconds=index)).isoformat(),
+            end_ts=(START + timedelta(seconds=index + 1)).isoformat(),
+            duration_sec=1,
+            process_name="app.exe",
+            exe_path="",
+            window_title=f"Document {index} " + "x" * 200,
+            category="Work",
+            intent_tag=None,
+        )
+        for index in range(count)
+    )
+    return db
+
+
+def test_stepped_backup_finishes_while_the_tracker_writes(tmp_path: Path) -> None:
+    db = _seed(tmp_path / "data.db", 5000)
+    session_id = db.add_session(
+        SessionRecord(START.isoformat(), START.isoformat(), 0, "app.exe", "", "open", "Work", None)
+    )
+    stop = threading.Event()
+    writes = []
+
+    def tracker() -> None:
+        # Every commit by another connection would restart a stepped copy
+        # that doesn't read from a pinned snapshot.
+        while not stop.is_set():
+            writes.append(len(writes))
+            db.update_session_end(session_id, (START + timedelta(seconds=len(writes))).isoformat(), len(writes))
+
+    thread = threading.Thread(target=tracker)
+    thread.start()
+    try:
+        result = run_backup(tmp_path / "data.db", tmp_path / "backups", pages=4, pause=0.001)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert result.ok and result.problems == ["ok"]
+    assert writes
+    copy = Database(result.path, read_only=True)
+    assert copy.select(SessionQuery(aggregate=True))[0][1] == 5001
+    copy.close()
+    # The copy is a single file; nothing is left beside it.
+    assert sorted(path.name for path in (tmp_path / "backups").iterdir()) == [result.path.name]
+
+
+def test_scheduler_runs_when_due_and_rotates(tmp_path: Path) -> None:
+    _seed(tmp_path / "data.db", 10).close()
+    now = [datetime(2026, 3, 10, 12).timestamp()]
+    settings = SimpleNamespace(current=_settings(backup_interval_hours=6, backup_keep=2))
+    scheduler = BackupScheduler(settings, tmp_path / "data.db", tmp_path / "backups", clock=lambda: now[0])
+
+    made = []
+    for hours in (0, 1, 6, 12, 18):
+        now[0] = datetime(2026, 3, 10, 12).timestamp() + hours * 3600
+        result = scheduler.run_if_due()
+        if result is not None:
+            # The schedule follows the newest file's mtime.
+            os.utime(result.path, (now[0], now[0]))
+            made.append(hours)
+    assert made == [0, 6, 12, 18]
+    names = [path.name for path in list_backups(tmp_path / "backups")]
+    assert names == ["data-20260311-000000.db", "data-20260311-060000.db"]
+
+    settings.current.backup_interval_hours = 0
+    now[0] += 7 * 24 * 3600
+    assert scheduler.run_if_due() is None
+
+
+def test_scheduler_failures_are_kept_for_the_tray(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.setattr(backup, "CHECK_INTERVAL_SEC", 0.01)
+    _seed(tmp_path / "data.db", 10).close()
+    # The backup directory can't be created over a file.
+    (tmp_path / "backups").write_text("")
+    settings = SimpleNamespace(current=_settings(backup_interval_hours=6))
+    scheduler = BackupScheduler(settings, tmp_path / "data.db", tmp_path / "backups")
+    scheduler.start()
+    deadline = time.monotonic() + 5
+    while scheduler.last_result is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.stop()
+    scheduler.join(5)
+    result = scheduler.last_result
+    assert result is not None and not result.ok and result.error
+    assert capsys.readouterr().err == ""
+
+
+def _settings(**overrides) -> Settings:
+    return Settings(
+        sampling_interval_sec=1,
+        idle_threshold_min=3,
+        retention_days=0,
+        close_to_tray=True,
+        start_minimized=False,
+        storage_mode="sessions",
+        focus_start=datetime.min.time(),
+        focus_end=datetime.min.time(),
+        prompts_enabled=False,
+        distraction_categories=[],
+        **overrides,
+    )
@@ -0,0 +1,34 @@
+from where_did_my_time_go.chart_model import AnimationThrottle, diff_slices, top_with_other
+
+
+def test_long_tail_folds_into_other() -> None:
+    totals = {f"app{index}.exe": float(index) for index in range(1, 301)}
+    top = top_with_other(totals, 5)
+    assert [label for label, _ in top] == ["app300.exe", "app299.exe", "app298.exe", "app297.exe", "Other"]
+    assert sum(value for _, value in top) == sum(totals.values())
+
+    # An existing "Other" category takes the tail instead of showing twice.
+    top = top_with_other({"Work": 50.0, "Other": 30.0, "Video": 10.0, "Gaming": 5.0}, 3)
+    assert top == [("Work", 50.0), ("Other", 45.0)]
+    assert top_with_other({"Work": 1.0}, 3) == [("Work", 1.0)]
+
+
+def test_diff_updates_in_place_and_only_touches_changes() -> None:
+    shown = {"Work": 100.0, "Video": 40.0, "Social": 5.0}
+    changes = diff_slices(shown, [("Work", 101.0), ("Video", 40.2), ("Gaming", 3.0)])
+    assert changes.updated == [("Work", 101.0)]
+    assert changes.added == [("Gaming", 3.0)]
+    assert changes.removed == ["Social"]
+    assert changes.structural
+    assert not diff_slices(shown, [("Work", 100.0), ("Video", 40.0), ("Social", 5.0)]).structural
+
+
+def test_animation_only_for_structural_changes_and_throttled() -> None:
+    now = [0.0]
+    throttle = AnimationThrottle(30.0, clock=lambda: now[0])
+    assert not throttle.allow(False)
+    assert throttle.allow(True)
+    now[0] = 10.0
+    assert not throttle.allow(True)
+    now[0] = 45.0
+    assert throttle.allow(True)
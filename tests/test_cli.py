@@ -0,0 +1,122 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+import where_did_my_time_go
+from where_did_my_time_go.cli import run
+from where_did_my_time_go.storage import Database, SessionRecord
+
+
+def _seed(db_path: Path) -> None:
+    db = Database(db_path)
+    db.initialize()
+    now = datetime.now(timezone.utc)
+    for offset, seconds, process, category in [
+        (3600, 1200, "code.exe", "Work"),
+        (2400, 600, "chrome.exe", "Video"),
+        (1200, 300, "Idle", "Idle"),
+    ]:
+        start = now - timedelta(seconds=offset)
+        db.add_session(
+            SessionRecord(
+                start_ts=start.isoformat(),
+                end_ts=(start + timedelta(seconds=seconds)).isoformat(),
+                duration_sec=seconds,
+                process_name=process,
+                exe_path="",
+                window_title="",
+                category=category,
+                intent_tag=None,
+            )
+        )
+    db.close()
+
+
+def test_report_json(tmp_path: Path) -> None:
+    db_path = tmp_path / "test.db"
+    _seed(db_path)
+    out = io.StringIO()
+    assert run(["report", "--db", str(db_path), "--days", "1", "--format", "json"], out) == 0
+    rows = json.loads(out.getvalue())
+    assert rows[0] == {"category": "Work", "total_sec": 1200, "duration": "0h 20m"}
+    assert {row["category"] for row in rows} == {"Work", "Video", "Idle"}
+
+
+def test_export_csv_and_stats(tmp_path: Path) -> None:
+    db_path = tmp_path / "test.db"
+    _seed(db_path)
+    out = io.StringIO()
+    run(["export", "--db", str(db_path), "--days", "1"], out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("start_ts,end_ts,duration_sec")
+    assert len(lines) == 4
+
+    out = io.StringIO()
+    run(["stats", "--db", str(db_path), "--days", "1", "--format", "csv"], out)
+    assert "active_sec,1800" in out.getvalue()
+    assert "idle_sec,300" in out.getvalue()
+
+
+def test_commands_agree_on_sessions_crossing_midnight(tmp_path: Path) -> None:
+    db_path = tmp_path / "test.db"
+    db = Database(db_path)
+    db.initialize()
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(minutes=30)
+    db.add_session(
+        SessionRecord(start.isoformat(), (start + timedelta(hours=1)).isoformat(), 3600, "code.exe", "", "", "Work", None)
+    )
+    db.close()
+
+    def rows(command: str) -> list[dict]:
+        out = io.StringIO()
+        run([command, "--db", str(db_path), "--range", "yesterday", "--format", "json"], out)
+        return json.loads(out.getvalue())
+
+    # Each command credits the whole hour to yesterday, where it started.
+    assert rows("report") == [{"category": "Work", "total_sec": 3600, "duration": "1h 0m"}]
+    assert rows("top") == [{"process_name": "code.exe", "total_sec": 3600, "duration": "1h 0m"}]
+    assert [row["duration_sec"] for row in rows("export")] == [3600]
+    stats = {row["stat"]: row["value"] for row in rows("stats")}
+    assert (stats["active_sec"], stats["sessions"]) == (3600, 1)
+
+
+def test_cli_does_not_import_qt(tmp_path: Path) -> None:
+    db_path = tmp_path / "test.db"
+    _seed(db_path)
+    script = (
+        "import sys\n"
+        "from where_did_my_time_go.__main__ import main\n"
+        f"main(['top', '--db', {str(db_path)!r}])\n"
+        "assert not [name for name in sys.modules if name.startswith('PySide6')]\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(where_did_my_time_go.__file__).parents[1]))
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert "code.exe" in result.stdout
+
+
+def test_range_all_only_caches_days_with_data(tmp_path: Path) -> None:
+    db_path = tmp_path / "test.db"
+    _seed(db_path)
+    assert run(["report", "--db", str(db_path), "--range", "all"], io.StringIO()) == 0
+    db = Database(db_path)
+    assert db._conn.execute("SELECT COUNT(*) FROM rollup_days").fetchone()[0] <= 1
+
+
+def test_missing_database_is_an_error(tmp_path: Path) -> None:
+    assert run(["stats", "--db", str(tmp_path / "typo.db")], io.StringIO()) == 2
+    assert not (tmp_path / "typo.db").exists()
+
+
+def test_negative_days_are_rejected(tmp_path: Path) -> None:
+    db_path = tmp_path / "test.db"
+    _seed(db_path)
+    with pytest.raises(SystemExit):
+        run(["report", "--db", str(db_path), "--days", "-1"], io.StringIO())
@@ -0,0 +1,146 @@
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from where_did_my_time_go.clock import TimeAccounting, VirtualClock
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.settings import Settings
+from where_did_my_time_go.storage import Database, SessionRecord
+from where_did_my_time_go.tracker_core import TrackerCore
+
+START = datetime(2026, 3, 10, 12, tzinfo=timezone.utc)
+
+
+class SleeplessBootClock(VirtualClock):
+    # No suspend-aware clock, as on macOS: a suspend is only visible as the
+    # wall clock running ahead.
+    def boottime(self) -> float:
+        return self.monotonic()
+
+
+def test_accounting_tells_steps_from_suspends() -> None:
+    clock = VirtualClock(START)
+    accounting = TimeAccounting(clock)
+    clock.sleep(1)
+    assert accounting.advance().jumped_from is None
+
+    clock.step_wall(3600)
+    clock.sleep(1)
+    tick = accounting.advance()
+    assert tick.jumped_from == START + timedelta(seconds=2)
+    assert tick.now == START + timedelta(seconds=3602)
+    assert tick.elapsed == 1
+    # Between ticks time runs on from the new reading.
+    clock.sleep(0.5)
+    assert accounting.now() == START + timedelta(seconds=3602.5)
+
+    # Slewing within the tolerance follows the wall clock without a split.
+    clock.step_wall(0.5)
+    clock.sleep(0.5)
+    tick = accounting.advance()
+    assert tick.jumped_from is None
+    assert tick.now == START + timedelta(seconds=3603.5)
+
+    clock.suspend(1800)
+    clock.sleep(1)
+    tick = accounting.advance()
+    assert (tick.elapsed, tick.suspended, tick.jumped_from) == (1801, 1800, None)
+
+    clock = VirtualClock(START)
+    accounting = TimeAccounting(clock)
+    clock.step_wall(-600)
+    clock.sleep(1)
+    tick = accounting.advance()
+    assert (tick.now, tick.jumped_from) == (START + timedelta(seconds=1), None)
+    # A later step forward that undoes it lands back on the wall clock.
+    clock.step_wall(600)
+    clock.sleep(1)
+    assert accounting.advance().now == START + timedelta(seconds=2)
+
+    clock = SleeplessBootClock(START)
+    accounting = TimeAccounting(clock)
+    clock.suspend(1800)
+    clock.sleep(1)
+    tick = accounting.advance()
+    assert tick.jumped_from == START + timedelta(seconds=1)
+    assert tick.elapsed == 1
+
+
+def _run(tmp_path: Path, clock: VirtualClock, storage_mode: str, script) -> list[SessionRecord]:
+    settings = SimpleNamespace(
+        current=Settings(
+            sampling_interval_sec=1,
+            idle_threshold_min=3,
+            retention_days=0,
+            close_to_tray=True,
+            start_minimized=False,
+            storage_mode=storage_mode,
+            focus_start=time(9, 0),
+            focus_end=time(17, 0),
+            prompts_enabled=False,
+            distraction_categories=[],
+        )
+    )
+    db = Database(tmp_path / "test.db", check_same_thread=False)
+    app = SimpleNamespace(process_name="code.exe", window_title="main.py", exe_path="")
+    core = TrackerCore(settings, db, foreground=lambda: app, idle_seconds=lambda: 0, clock=clock)
+    for fault in script:
+        if fault is not None:
+            fault(clock)
+        clock.sleep(core.tick())
+    core.pause()
+    return [SessionRecord(*row) for row in db.select(SessionQuery(order_by=("start_ts",)))]
+
+
+def _summary(sessions: list[SessionRecord]) -> list[tuple[str, int, int]]:
+    # (category, seconds after START it began, duration)
+    return [
+        (s.category, int((datetime.fromisoformat(s.start_ts) - START).total_seconds()), s.duration_sec)
+        for s in sessions
+    ]
+
+
+@pytest.mark.parametrize("storage_mode", ["sessions", "events"])
+def test_clock_steps_split_sessions_without_stretching_them(tmp_path: Path, storage_mode: str) -> None:
+    forward = lambda clock: clock.step_wall(3600)
+    back = lambda clock: clock.step_wall(-7200)
+    script = [None] * 3 + [forward] + [None] * 2 + [back] + [None] * 2
+    sessions = _run(tmp_path, VirtualClock(START), storage_mode, script)
+    # After the step back the session runs on, ahead of the wall clock.
+    assert _summary(sessions) == [("Other", 0, 3), ("Other", 3603, 6)]
+    # Nine ticks tracked, however far the wall clock moved.
+    assert sum(s.duration_sec for s in sessions) == 9
+
+
+@pytest.mark.parametrize("storage_mode", ["sessions", "events"])
+def test_steps_back_never_overlap_recorded_sessions(tmp_path: Path, storage_mode: str) -> None:
+    back = lambda clock: clock.step_wall(-3)
+    forward = lambda clock: clock.step_wall(600)
+    # Each step back is shorter than what was recorded before it, and the
+    # step forward starts a new session while the wall clock is behind.
+    script = [None] * 4 + [back] + [None] * 2 + [forward, back] + [None] * 3
+    sessions = _run(tmp_path, VirtualClock(START), storage_mode, script)
+    assert len(sessions) > 1
+    for earlier, later in zip(sessions, sessions[1:]):
+        assert later.start_ts >= earlier.end_ts
+    assert sum(s.duration_sec for s in sessions) == len(script)
+
+
+@pytest.mark.parametrize("storage_mode", ["sessions", "events"])
+def test_suspend_is_split_out_of_the_session(tmp_path: Path, storage_mode: str) -> None:
+    suspend = lambda clock: clock.suspend(1800)
+    script = [None] * 3 + [suspend] + [None] * 3
+    sessions = _run(tmp_path, VirtualClock(START), storage_mode, script)
+    # The suspended half hour is credited to Idle, as any other gap, rather
+    # than stretching the session it interrupted.
+    assert _summary(sessions) == [("Other", 0, 2), ("Idle", 2, 1801), ("Other", 1803, 4)]
+
+
+def test_suspend_without_a_boot_clock_is_split_like_a_step(tmp_path: Path) -> None:
+    suspend = lambda clock: clock.suspend(1800)
+    script = [None] * 3 + [suspend] + [None] * 3
+    sessions = _run(tmp_path, SleeplessBootClock(START), "sessions", script)
+    # The time asleep is unknown, so it is left out.
+    assert _summary(sessions) == [("Other", 0, 3), ("Other", 1803, 4)]
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.comparison import compare_periods, format_change, sparkline
+from where_did_my_time_go.report_cache import ReportCache
+from where_did_my_time_go.storage import Database, SessionRecord
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+TODAY = datetime(2026, 3, 10, tzinfo=timezone.utc)
+
+
+def _add(db: Database, start: datetime, seconds: int, process: str, category: str) -> None:
+    db.add_session(
+        SessionRecord(
+            start_ts=start.isoformat(),
+            end_ts=(start + timedelta(seconds=seconds)).isoformat(),
+            duration_sec=seconds,
+            process_name=process,
+            exe_path="",
+            window_title="",
+            category=category,
+            intent_tag=None,
+        )
+    )
+
+
+def test_week_over_week_from_rollups_and_today(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    # Previous week: 2026-02-25 .. 03-03; this week: 03-04 .. today.
+    _add(db, TODAY - timedelta(days=14, hours=-9), 999, "code.exe", "Work")
+    _add(db, TODAY - timedelta(days=13, hours=-9), 600, "code.exe", "Work")
+    _add(db, TODAY - timedelta(days=8, hours=-9), 300, "chrome.exe", "Video")
+    _add(db, TODAY - timedelta(days=2, hours=-9), 900, "code.exe", "Work")
+    _add(db, TODAY + timedelta(hours=9), 120, "slack.exe", "Communication")
+
+    cache = ReportCache(db)
+    comparison = compare_periods(cache, 7, now=NOW)
+    assert comparison.days[0] == "2026-02-25" and comparison.days[-1] == "2026-03-10"
+    rows = {row.name: row for row in comparison.rows}
+    assert [row.name for row in comparison.rows] == ["Work", "Communication", "Video"]
+    assert (rows["Work"].current_sec, rows["Work"].previous_sec) == (900, 600)
+    assert rows["Work"].daily == [600] + [0] * 10 + [900] + [0] * 2
+    assert format_change(rows["Work"]) == "+50%"
+    assert format_change(rows["Communication"]) == "new"
+    assert format_change(rows["Video"]) == "-100%"
+    assert (comparison.current_total, comparison.previous_total) == (1020, 900)
+
+    # Closed days were read from the rollups cached along the way.
+    assert "2026-03-08" in db.cached_rollup_days("2026-02-25", "2026-03-09", db.data_version())
+    _add(db, TODAY + timedelta(hours=10), 60, "code.exe", "Work")
+    by_app = compare_periods(cache, 7, by="app", app_filter="code", now=NOW)
+    assert [(row.name, row.current_sec, row.previous_sec) for row in by_app.rows] == [("code.exe", 960, 600)]
+
+
+def test_sparkline_scales_to_the_peak() -> None:
+    assert sparkline([0, 4, 8]) == "▁▅█"
+    assert sparkline([0, 0]) == "▁▁"
+    assert sparkline([]) == ""
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.context_catalog import ContextCatalog, normalize_title, preview_rule
+from where_did_my_time_go.rules import Rule
+from where_did_my_time_go.storage import Database, SessionRecord
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+TODAY = datetime(2026, 3, 10, tzinfo=timezone.utc)
+
+
+def _add(db: Database, start: datetime, seconds: int, process: str, title: str, category: str) -> int:
+    return db.add_session(
+        SessionRecord(
+            start_ts=start.isoformat(),
+            end_ts=(start + timedelta(seconds=seconds)).isoformat(),
+            duration_sec=seconds,
+            process_name=process,
+            exe_path="",
+            window_title=title,
+            category=category,
+            intent_tag=None,
+        )
+    )
+
+
+def test_normalize_title_drops_counters_and_markers() -> None:
+    assert normalize_title("(3) Inbox - Mail") == "Inbox - Mail"
+    assert normalize_title("[12]  Team   chat") == "Team chat"
+    assert normalize_title("● main.py - Code") == "main.py - Code"
+    assert normalize_title("notes.txt*") == "notes.txt"
+
+
+def test_catalog_merges_contexts_and_caches_closed_days(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    _add(db, TODAY - timedelta(days=2, hours=-9), 600, "chrome.exe", "(2) Inbox - Mail", "Other")
+    _add(db, TODAY - timedelta(days=1, hours=-9), 300, "chrome.exe", "(5) Inbox - Mail", "Other")
+    _add(db, TODAY - timedelta(days=1, hours=-10), 900, "Idle", "", "Idle")
+    _add(db, TODAY + timedelta(hours=9), 120, "chrome.exe", "Inbox - Mail", "Other")
+    _add(db, TODAY - timedelta(days=40), 5000, "chrome.exe", "Inbox - Mail", "Other")
+
+    catalog = ContextCatalog(db, clock=lambda: NOW)
+    assert catalog.contexts(30) == [("chrome.exe", "Inbox - Mail", "Other", 1020)]
+    assert db.cached_catalog_days("2026-02-09", "2026-03-10", db.data_version()) >= {"2026-03-08", "2026-03-09"}
+
+    # A session still running from yesterday drops yesterday's entry.
+    session_id = _add(db, TODAY - timedelta(hours=1), 60, "code.exe", "main.py", "Work")
+    db.update_session_end(session_id, (TODAY + timedelta(minutes=30)).isoformat(), 5400)
+    assert "2026-03-09" not in db.cached_catalog_days("2026-03-09", "2026-03-09", db.data_version())
+    assert ("code.exe", "main.py", "Work", 5400) in catalog.contexts(30)
+
+
+def test_preview_counts_time_the_draft_would_take_over() -> None:
+    contexts = [
+        ("chrome.exe", "YouTube - Video", "Other", 3600),
+        ("chrome.exe", "YouTube Studio", "Work", 1200),
+        ("chrome.exe", "Docs - Notes", "Other", 600),
+        ("vlc.exe", "movie.mkv", "Video", 900),
+    ]
+    rules = [
+        Rule(1, True, "substring", None, "Studio", "Work", 1),
+        Rule(2, True, "substring", "chrome.exe", None, "Reading", 5),
+    ]
+    draft = Rule(3, True, "substring", None, "youtube", "Video", 2)
+    preview = preview_rule(draft, rules, contexts, 30)
+    # "YouTube Studio" stays with the higher-priority rule 1.
+    assert preview.changes == {("Other", "Video"): 3600}
+    assert preview.total == 3600
+    assert preview.contexts == 1
+
+    # Editing rule 1 in place replaces it instead of competing with it.
+    edited = Rule(1, True, "substring", None, "Studio", "Video", 1)
+    assert preview_rule(edited, rules, contexts, 30).changes == {("Work", "Video"): 1200}
+    assert preview_rule(Rule(3, True, "regex", None, "([", "Video", 2), rules, contexts, 30).total == 0
@@ -0,0 +1,170 @@
+import threading
+import time
+from datetime import datetime, time as time_of_day, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from where_did_my_time_go import daemon as daemon_module
+from where_did_my_time_go.clock import VirtualClock
+from where_did_my_time_go.daemon import DaemonClient, TrackerDaemon
+from where_did_my_time_go.settings import Settings
+from where_did_my_time_go.storage import Database
+from where_did_my_time_go.tracker_core import TrackerCore
+
+START = datetime(2026, 3, 10, 12, tzinfo=timezone.utc)
+
+
+class SlowClock(VirtualClock):
+    # Virtual time, but slow enough in real time for another thread to act.
+    def sleep(self, seconds: float) -> None:
+        time.sleep(0.01)
+        super().sleep(seconds)
+
+
+def _settings(**overrides) -> SimpleNamespace:
+    values = dict(
+        sampling_interval_sec=1,
+        idle_threshold_min=3,
+        retention_days=0,
+        close_to_tray=True,
+        start_minimized=False,
+        storage_mode="sessions",
+        focus_start=time_of_day(0, 0),
+        focus_end=time_of_day(23, 59),
+        prompts_enabled=True,
+        distraction_categories=["Video"],
+    )
+    values.update(overrides)
+    return SimpleNamespace(current=Settings(**values))
+
+
+def _core(tmp_path: Path, **kwargs) -> TrackerCore:
+    app = SimpleNamespace(process_name="chrome.exe", window_title="YouTube - talk", exe_path="C:/chrome.exe")
+    db = Database(tmp_path / "test.db", check_same_thread=False)
+    return TrackerCore(_settings(), db, foreground=lambda: app, idle_seconds=lambda: 0, **kwargs)
+
+
+def test_core_tracks_without_qt(tmp_path: Path) -> None:
+    prompts = []
+    core = _core(tmp_path, on_prompt=lambda session_id, category: prompts.append(category))
+    core.tick()
+    core.tick()
+    assert core.active_session.category == "Video"
+    assert prompts == ["Video"]
+    core.pause()
+    assert core.active_session is None
+
+
+def test_daemon_streams_updates_and_accepts_commands(tmp_path: Path) -> None:
+    core = _core(tmp_path)
+    daemon = TrackerDaemon(core, state_path=tmp_path / "daemon.json")
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        client = None
+        while client is None and time.monotonic() < deadline:
+            client = DaemonClient.connect(tmp_path / "daemon.json")
+        client.send("subscribe")
+        messages = client.messages(timeout=5)
+        assert next(messages) == ("status", "Running")
+        # Sent before this client subscribed; the daemon replays it.
+        _, session_id, category = next(message for message in messages if message[0] == "prompt")
+        assert category == "Video"
+
+        client.send("intent", session_id, "Intentional")
+        client.send("pause")
+        assert next(message for message in messages if message[0] == "status") == ("status", "Paused")
+        client.close()
+    finally:
+        daemon.stop()
+        thread.join(5)
+    assert not thread.is_alive()
+    assert not (tmp_path / "daemon.json").exists()
+    db = Database(tmp_path / "test.db")
+    tags = [row["intent_tag"] for row in db.fetch_sessions("2000-01-01", "2100-01-01")]
+    assert tags == ["Intentional"]
+
+
+def test_commands_from_other_threads_run_on_the_tracker_thread(tmp_path: Path) -> None:
+    # The connection refuses any thread but the loop's, so a command that
+    # touched it from the caller's thread would raise there.
+    app = SimpleNamespace(process_name="chrome.exe", window_title="YouTube - talk", exe_path="")
+    ready = threading.Event()
+    errors = []
+    holder = {}
+
+    def loop() -> None:
+        try:
+            db = Database(tmp_path / "test.db")
+            core = TrackerCore(_settings(), db, foreground=lambda: app, idle_seconds=lambda: 0, clock=SlowClock(START))
+            holder["core"] = core
+            ready.set()
+            core.run()
+            db.close()
+        except Exception as exc:
+            errors.append(exc)
+            ready.set()
+
+    thread = threading.Thread(target=loop)
+    thread.start()
+    assert ready.wait(5)
+    core = holder["core"]
+    deadline = time.monotonic() + 5
+    while core.active_session is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    core.set_intent_tag(core.active_session.session_id, "Intentional")
+    core.pause()
+    while not core.paused and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert core.active_session is None
+    core.resume()
+    core.stop()
+    thread.join(5)
+    assert errors == []
+    db = Database(tmp_path / "test.db")
+    assert [row["intent_tag"] for row in db.fetch_sessions("2000-01-01", "2100-01-01")][0] == "Intentional"
+
+
+def test_stalled_subscriber_is_dropped_without_blocking_the_tracker(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(daemon_module, "SUBSCRIBER_QUEUE", 4)
+    core = _core(tmp_path)
+    daemon = TrackerDaemon(core, state_path=tmp_path / "daemon.json")
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        client = None
+        while client is None and time.monotonic() < deadline:
+            client = DaemonClient.connect(tmp_path / "daemon.json")
+        # Subscribes, then never reads.
+        client.send("subscribe")
+        while not daemon._subscribers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        began = time.monotonic()
+        for _ in range(200):
+            # Far more than the socket buffers hold.
+            daemon._on_status("x" * 100_000)
+        assert time.monotonic() - began < 1
+        assert daemon._subscribers == []
+        client.close()
+    finally:
+        daemon.stop()
+        thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_core_reloads_rules_only_after_a_change(tmp_path: Path) -> None:
+    titles = iter(["YouTube - talk", "YouTube - talk", "YouTube - next"])
+    app = lambda: SimpleNamespace(process_name="chrome.exe", window_title=next(titles), exe_path="")
+    db = Database(tmp_path / "test.db", check_same_thread=False)
+    core = TrackerCore(_settings(), db, foreground=app, idle_seconds=lambda: 0)
+    core.tick()
+    version = db.rules_version()
+    core.tick()
+    assert db.rules_version() == version
+
+    db.add_rule(True, "substring", "chrome.exe", None, "Research", 0)
+    assert db.rules_version() == version + 1
+    core.tick()
+    assert core.active_session.category == "Research"
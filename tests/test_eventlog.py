@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.eventlog import EventLog, rebuild
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.rules import Rule
+from where_did_my_time_go.storage import Database
+
+START = datetime(2024, 5, 6, 9, 0, tzinfo=timezone.utc)
+
+
+def _ts(seconds: float) -> str:
+    return (START + timedelta(seconds=seconds)).isoformat()
+
+
+def _sessions(db: Database) -> list[tuple]:
+    return [
+        (row["process_name"], row["category"], row["start_ts"], row["end_ts"], row["duration_sec"], row["intent_tag"])
+        for row in db.fetch_sessions("2024-05-06", "2024-05-07")
+    ]
+
+
+def _record_morning(db: Database) -> EventLog:
+    log = EventLog(db, checkpoint_sec=60)
+    session_id = log.focus(_ts(0), "code.exe", "", "main.py", "Work")
+    assert not log.checkpoint(_ts(30))
+    assert log.checkpoint(_ts(61))
+    db.update_session_intent(session_id, "deep work")
+    log.focus(_ts(100.5), "chrome.exe", "", "YouTube", "Other")
+    log.focus(_ts(103), "code.exe", "", "main.py", "Work")
+    log.idle(_ts(200))
+    log.focus(_ts(300), "code.exe", "", "main.py", "Work")
+    log.stop(_ts(310.25))
+    return log
+
+
+def test_events_derive_sessions_and_rebuild_identically(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    _record_morning(db)
+    live = _sessions(db)
+    assert [(name, duration) for name, _, _, _, duration, _ in live] == [
+        ("code.exe", 100),
+        ("chrome.exe", 2),
+        ("code.exe", 97),
+        ("Idle", 100),
+        ("code.exe", 10),
+    ]
+    assert live[0][5] == "deep work"
+    assert len(db.fetch_focus_events()) == 6
+
+    version = db.data_version()
+    assert rebuild(db) == 5
+    assert _sessions(db) == live
+    assert db.data_version() == version + 1
+
+
+def test_rebuild_reclassifies_and_coalesces(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    _record_morning(db)
+    rules = [Rule(rule_id=1, enabled=True, match_type="substring", process_pattern="code.exe",
+                  title_pattern=None, category="Coding", priority=1)]
+    assert rebuild(db, rules, coalesce_sec=5) == 3
+    sessions = _sessions(db)
+    assert [(name, category, duration) for name, category, _, _, duration, _ in sessions] == [
+        ("code.exe", "Coding", 200),
+        ("Idle", "Idle", 100),
+        ("code.exe", "Coding", 10),
+    ]
+    assert sessions[0][5] == "deep work"
+    active = SessionQuery("2024-05-06", "2024-05-07", exclude_categories=("Idle",), aggregate=True)
+    assert db.select(active) == [(210, 2)]
+
+
+def test_recover_closes_open_session_at_last_checkpoint(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    log = EventLog(db, checkpoint_sec=60)
+    log.focus(_ts(0), "code.exe", "", "main.py", "Work")
+    log.checkpoint(_ts(90))
+    log.checkpoint(_ts(120))
+
+    restarted = EventLog(db)
+    assert restarted.is_open
+    restarted.recover()
+    assert not restarted.is_open
+    assert [row[4] for row in _sessions(db)] == [90]
+    assert rebuild(db) == 1
+    assert [row[4] for row in _sessions(db)] == [90]
+
+
+def test_rebuild_keeps_category_each_event_was_logged_with(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    log = EventLog(db)
+    # The same context, classified differently after a rule change.
+    log.focus(_ts(0), "chrome.exe", "", "Docs", "Video")
+    log.focus(_ts(60), "code.exe", "", "main.py", "Work")
+    log.focus(_ts(120), "chrome.exe", "", "Docs", "Other")
+    log.stop(_ts(180))
+    live = _sessions(db)
+    assert [category for _, category, *_ in live] == ["Video", "Work", "Other"]
+
+    assert rebuild(db) == 3
+    assert _sessions(db) == live
+
+    rules = [Rule(rule_id=1, enabled=True, match_type="substring", process_pattern="chrome.exe",
+                  title_pattern=None, category="Research", priority=1)]
+    rebuild(db, rules)
+    rebuild(db)
+    assert [category for _, category, *_ in _sessions(db)] == ["Research", "Other", "Research"]
@@ -0,0 +1,232 @@
+import json
+import socket
+import threading
+import time
+from dataclasses import astuple
+from datetime import datetime, time as day_time, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from where_did_my_time_go.clock import VirtualClock
+from where_did_my_time_go.exporter import ExportHub, JsonlSink, SessionExporter, Sink, sink_from_spec
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.settings import Settings
+from where_did_my_time_go.storage import Database, SessionRecord
+from where_did_my_time_go.tracker_core import TrackerCore
+
+START = datetime(2026, 3, 10, 12, tzinfo=timezone.utc)
+
+
+def _record(minute: int, title: str = "") -> SessionRecord:
+    start = START + timedelta(minutes=minute)
+    return SessionRecord(
+        start_ts=start.isoformat(),
+        end_ts=(start + timedelta(seconds=50)).isoformat(),
+        duration_sec=50,
+        process_name="code.exe",
+        exe_path="",
+        window_title=title or f"file{minute}.py",
+        category="Work",
+        intent_tag=None,
+    )
+
+
+class GatedSink(Sink):
+    # Blocks every write until the gate opens; fails the first one.
+    def __init__(self) -> None:
+        super().__init__("gated")
+        self.gate = threading.Event()
+        self.batches: list[list[SessionRecord]] = []
+        self._failed = False
+
+    def write(self, records: list[SessionRecord]) -> None:
+        self.gate.wait(5)
+        if not self._failed:
+            self._failed = True
+            raise OSError("collector down")
+        self.batches.append(records)
+
+
+@pytest.mark.parametrize("storage_mode", ["sessions", "events"])
+def test_tracker_reports_each_closed_session(tmp_path: Path, storage_mode: str) -> None:
+    settings = SimpleNamespace(
+        current=Settings(
+            sampling_interval_sec=1,
+            idle_threshold_min=3,
+            retention_days=0,
+            close_to_tray=True,
+            start_minimized=False,
+            storage_mode=storage_mode,
+            focus_start=day_time(9, 0),
+            focus_end=day_time(17, 0),
+            prompts_enabled=False,
+            distraction_categories=[],
+        )
+    )
+    titles = iter(["a.py"] * 3 + ["b.py"] * 2 + ["c.py"] * 3)
+    idle = iter([0, 0, 0, 0, 0, 600, 600, 0, 0, 0])
+    app = lambda: SimpleNamespace(process_name="code.exe", window_title=next(titles), exe_path="")
+    clock = VirtualClock(START)
+    closed: list[SessionRecord] = []
+    ids: list[int] = []
+
+    def on_closed(session_id: int, record: SessionRecord) -> None:
+        ids.append(session_id)
+        closed.append(record)
+
+    db = Database(tmp_path / "test.db", check_same_thread=False)
+    core = TrackerCore(
+        settings, db, foreground=app, idle_seconds=lambda: next(idle), clock=clock, on_session_closed=on_closed
+    )
+    for _ in range(9):
+        clock.sleep(core.tick())
+    core.set_intent_tag(core.active_session.session_id, "reading")
+    core.pause()
+
+    assert [(record.window_title, record.duration_sec) for record in closed] == [
+        ("a.py", 3),
+        # Idle is back-dated to the tick input stopped after.
+        ("b.py", 1),
+        ("", 3),
+        ("c.py", 2),
+    ]
+    assert closed[-1].intent_tag == "reading"
+    rows = db.select(SessionQuery(columns=("session_id", "start_ts", "end_ts", "category"), order_by=("start_ts",)))
+    assert rows == [(session_id, r.start_ts, r.end_ts, r.category) for session_id, r in zip(ids, closed)]
+    # Sessions close in id order, which is what the export watermark follows.
+    assert ids == sorted(ids)
+
+
+def test_slow_sink_never_blocks_submit_and_catches_up(tmp_path: Path) -> None:
+    path = tmp_path / "data.db"
+    db = Database(path)
+    db.initialize()
+    sink = GatedSink()
+    exporter = SessionExporter(
+        sink,
+        path,
+        queue_size=2,
+        batch_size=3,
+        flush_sec=0.05,
+        retry_sec=0.05,
+    )
+    exporter.start()
+    slowest = 0.0
+    ids = []
+    for minute in range(10):
+        record = _record(minute)
+        ids.append(db.add_session(record))
+        began = time.perf_counter()
+        exporter.submit(ids[-1], record)
+        slowest = max(slowest, time.perf_counter() - began)
+    assert slowest < 0.05
+    assert exporter.dropped > 0
+
+    sink.gate.set()
+    deadline = time.monotonic() + 5
+    while exporter.exported < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    exporter.stop()
+    exported = [record for batch in sink.batches for record in batch]
+    assert exported == [_record(minute) for minute in range(10)]
+    assert all(len(batch) <= 3 for batch in sink.batches)
+    assert exporter.last_error == ""
+
+    # A restart resumes after the stored watermark.
+    db.add_session(_record(10))
+    resumed = SessionExporter(sink, path, flush_sec=0.05)
+    assert resumed.watermark == ids[-1]
+    resumed.start()
+    resumed.submit(ids[-1], _record(9))
+    resumed.stop()
+    assert sink.batches[-1] == [_record(10)]
+    db.close()
+
+
+class ListSink(Sink):
+    def __init__(self) -> None:
+        super().__init__("list")
+        self.batches: list[list[SessionRecord]] = []
+
+    def write(self, records: list[SessionRecord]) -> None:
+        self.batches.append(records)
+
+
+def test_catch_up_keeps_sessions_sharing_a_start_or_behind_the_clock(tmp_path: Path) -> None:
+    path = tmp_path / "data.db"
+    db = Database(path)
+    db.initialize()
+    sink = ListSink()
+    exporter = SessionExporter(sink, path, queue_size=1, batch_size=2, flush_sec=0.05)
+    # Three sessions at the same second, then one from after the clock stepped
+    # back an hour. All but the first are dropped from the queue and read back
+    # two at a time.
+    records = [_record(0, "a.py"), _record(0, "b.py"), _record(0, "c.py"), _record(-60, "d.py")]
+    for record in records:
+        exporter.submit(db.add_session(record), record)
+    assert exporter.dropped == 3
+    exporter.start()
+    deadline = time.monotonic() + 5
+    while exporter.exported < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    exporter.stop()
+    # c.py starts at the same second as the last session of the first batch.
+    assert [[record.window_title for record in batch] for batch in sink.batches] == [
+        ["a.py", "b.py"],
+        ["c.py", "d.py"],
+    ]
+    db.close()
+
+
+def test_failures_are_kept_for_the_tray(tmp_path: Path) -> None:
+    path = tmp_path / "data.db"
+    db = Database(path)
+    db.initialize()
+    sink = GatedSink()
+    sink.gate.set()
+    exporter = SessionExporter(sink, path, flush_sec=0.05, retry_sec=0.05)
+    exporter.start()
+    exporter.submit(db.add_session(_record(0)), _record(0))
+    deadline = time.monotonic() + 5
+    while not exporter.last_error and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert "collector down" in exporter.last_error
+    while exporter.exported < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    exporter.stop()
+    # Cleared once the retry gets through.
+    assert exporter.last_error == ""
+
+    hub = ExportHub(["ftp:somewhere", f"jsonl:{tmp_path / 'out.jsonl'}"], path)
+    assert len(hub.exporters) == 1
+    assert hub.errors and "ftp:somewhere" in hub.errors[0]
+    hub.stop()
+    db.close()
+
+
+def test_sinks_write_json_lines(tmp_path: Path) -> None:
+    records = [_record(0), _record(1)]
+    JsonlSink(tmp_path / "out.jsonl").write(records)
+    sink_from_spec(f"dir:{tmp_path / 'drop'}").write(records)
+    lines = (tmp_path / "out.jsonl").read_text().splitlines()
+    assert [SessionRecord(**json.loads(line)) for line in lines] == records
+    (dropped,) = (tmp_path / "drop").glob("*.jsonl")
+    assert dropped.read_text().splitlines() == lines
+
+    server = socket.create_server(("127.0.0.1", 0))
+    sink = sink_from_spec(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+    sink.write(records)
+    connection, _ = server.accept()
+    received = b""
+    while received.count(b"\n") < 2:
+        received += connection.recv(4096)
+    sink.close()
+    connection.close()
+    server.close()
+    assert [tuple(json.loads(line).values()) for line in received.decode().splitlines()] == [
+        astuple(record) for record in records
+    ]
+    with pytest.raises(ValueError):
+        sink_from_spec("ftp:somewhere")
@@ -0,0 +1,118 @@
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from where_did_my_time_go.clock import VirtualClock
+from where_did_my_time_go.goals import GoalTracker, parse_budgets
+from where_did_my_time_go.settings import Settings
+from where_did_my_time_go.storage import Database, SessionRecord
+from where_did_my_time_go.tracker_core import TrackerCore
+
+DAY = datetime(2026, 3, 10)
+
+
+def _at(hour: int, minute: int = 0, days: int = 0) -> float:
+    # Local wall-clock time, whatever the machine's time zone.
+    return (DAY + timedelta(days=days, hours=hour, minutes=minute)).timestamp()
+
+
+def _settings(**overrides) -> SimpleNamespace:
+    values = dict(
+        sampling_interval_sec=1,
+        idle_threshold_min=3,
+        retention_days=0,
+        close_to_tray=True,
+        start_minimized=False,
+        storage_mode="sessions",
+        focus_start=time(9, 0),
+        focus_end=time(17, 0),
+        prompts_enabled=False,
+        distraction_categories=[],
+        budgets={"Social": 45},
+    )
+    values.update(overrides)
+    return SimpleNamespace(current=Settings(**values))
+
+
+def _add(db: Database, start: float, minutes: int, category: str) -> None:
+    begin = datetime.fromtimestamp(start, timezone.utc)
+    db.add_session(
+        SessionRecord(
+            start_ts=begin.isoformat(),
+            end_ts=(begin + timedelta(minutes=minutes)).isoformat(),
+            duration_sec=minutes * 60,
+            process_name="app.exe",
+            exe_path="",
+            window_title="",
+            category=category,
+            intent_tag=None,
+        )
+    )
+
+
+def test_parse_budgets() -> None:
+    assert parse_budgets("Social=45, Video = 30,") == {"Social": 45, "Video": 30}
+    with pytest.raises(ValueError):
+        parse_budgets("Social=lots")
+
+
+def test_budget_alerts_once_within_focus_hours(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    _add(db, _at(8, 30), 50, "Social")  # 20 of these minutes are after 09:00
+    _add(db, _at(9, 20), 30, "Work")
+    settings = _settings()
+    goals = GoalTracker(settings, db, clock=lambda: _at(10))
+    assert goals.spent("Social", _at(10)) == 20 * 60
+
+    goals.switch("Social", _at(10))
+    assert goals.evaluate(_at(10, 20)) is None
+    alert = goals.evaluate(_at(10, 25))
+    assert (alert.category, alert.limit_sec, alert.spent_sec) == ("Social", 45 * 60, 45 * 60)
+    assert goals.evaluate(_at(10, 30)) is None
+
+    goals.switch("Work", _at(10, 30))
+    assert goals.spent("Social", _at(11)) == 50 * 60
+    assert goals.spent("Work", _at(11)) == 60 * 60  # 30 stored + 30 open
+
+    # Raising the budget re-arms the alert without re-reading storage.
+    settings.current = Settings(**{**vars(settings.current), "budgets": {"Social": 60}})
+    goals.switch("Social", _at(16, 53))
+    assert goals.evaluate(_at(17, 30)) is None  # focus hours ended at 57 minutes
+    assert goals.spent("Social", _at(17, 30)) == 57 * 60
+
+
+def test_overnight_window_resets_at_midnight(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    settings = _settings(focus_start=time(22, 0), focus_end=time(2, 0), budgets={"Video": 90})
+    goals = GoalTracker(settings, db, clock=lambda: _at(21))
+    goals.switch("Video", _at(21))
+    assert goals.spent("Video", _at(23, 30)) == 90 * 60
+    assert goals.evaluate(_at(23, 30)).spent_sec == 90 * 60
+    # A new day starts from zero and only counts its own 00:00-02:00 part.
+    assert goals.evaluate(_at(1, days=1)) is None
+    assert goals.spent("Video", _at(3, days=1)) == 120 * 60
+
+
+def test_tracker_reports_activity_switches(tmp_path: Path) -> None:
+    titles = iter(["YouTube"] * 3 + ["Docs"] * 3)
+    idle = iter([0, 0, 0, 0, 600, 600, 0])
+    app = lambda: SimpleNamespace(process_name="chrome.exe", window_title=next(titles), exe_path="")
+    clock = VirtualClock(datetime(2026, 3, 10, 12, tzinfo=timezone.utc))
+    activity = []
+    core = TrackerCore(
+        _settings(),
+        Database(tmp_path / "test.db", check_same_thread=False),
+        foreground=app,
+        idle_seconds=lambda: next(idle),
+        clock=clock,
+        on_activity=lambda category, at: activity.append((category, int((at - clock._start).total_seconds()))),
+    )
+    for _ in range(7):
+        clock.sleep(core.tick())
+    core.pause()
+    # Only switches are reported; idle is back-dated to when input stopped.
+    assert activity == [("Video", 0), ("Other", 3), ("Idle", 3), ("Other", 6), (None, 7)]
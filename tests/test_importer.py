@@ -0,0 +1,79 @@
+import io
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.cli import run
+from where_did_my_time_go.importer import import_path, import_sessions
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.storage import Database, SessionRecord
+
+
+def _record(offset_min: int, process: str, title: str, category: str = "Other") -> SessionRecord:
+    start = datetime(2024, 5, 6, 9, 0, tzinfo=timezone.utc) + timedelta(minutes=offset_min)
+    return SessionRecord(
+        start_ts=start.isoformat(),
+        end_ts=(start + timedelta(minutes=1)).isoformat(),
+        duration_sec=60,
+        process_name=process,
+        exe_path="",
+        window_title=title,
+        category=category,
+        intent_tag=None,
+    )
+
+
+def test_bulk_insert_dedupes_within_and_across_batches(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    records = [_record(0, "code.exe", "a.py"), _record(1, "code.exe", "b.py"), _record(0, "code.exe", "a.py")]
+    result = import_sessions(db, records, chunk_size=2)
+    assert (result.read, result.inserted, result.skipped) == (3, 2, 1)
+    assert db.data_version() == 1
+
+    result = import_sessions(db, [_record(1, "code.exe", "b.py"), _record(2, "code.exe", "b.py")])
+    assert (result.inserted, result.skipped) == (1, 1)
+    assert db.select(SessionQuery("2024-05-06", "2024-05-07", aggregate=True))[0][1] == 3
+
+
+def test_unsorted_chunks_dedupe_against_stored_rows(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    import_sessions(db, [_record(index * 10, "code.exe", "a.py") for index in range(5)])
+    # Each chunk spans the whole stored range without being contiguous.
+    records = [_record(offset, "code.exe", "a.py") for offset in (40, 5, 0, 25, 20, 35, 10, 15, 30)]
+    result = import_sessions(db, records, chunk_size=3)
+    assert (result.inserted, result.skipped) == (4, 5)
+    starts = [row["start_ts"] for row in db.fetch_sessions("2024-05-06", "2024-05-07")]
+    assert starts == sorted(starts) and len(starts) == 9
+
+
+def test_csv_export_round_trip_with_reclassify(tmp_path: Path) -> None:
+    source = Database(tmp_path / "source.db")
+    source.initialize()
+    source.add_sessions([_record(0, "chrome.exe", "YouTube - cats"), _record(5, "Idle", "", "Idle")])
+    source.close()
+
+    csv_path = tmp_path / "export.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8") as handle:
+        run(["export", "--db", str(tmp_path / "source.db"), "--start", "2024-05-06"], handle)
+
+    target = Database(tmp_path / "target.db")
+    target.initialize()
+    target.ensure_default_rules()
+    result = import_path(target, csv_path, reclassify_with_rules=True)
+    assert result.inserted == 2
+    categories = {row["process_name"]: row["category"] for row in target.fetch_sessions("2024-05-06", "2024-05-07")}
+    assert categories == {"chrome.exe": "Video", "Idle": "Idle"}
+
+
+def test_import_command_merges_database(tmp_path: Path) -> None:
+    source = Database(tmp_path / "source.db")
+    source.initialize()
+    source.add_sessions([_record(index, "code.exe", f"file{index}.py") for index in range(10)])
+    source.close()
+
+    out = io.StringIO()
+    run(["import", str(tmp_path / "source.db"), "--db", str(tmp_path / "target.db"), "--format", "csv"], out)
+    run(["import", str(tmp_path / "source.db"), "--db", str(tmp_path / "target.db"), "--format", "csv"], out)
+    assert out.getvalue().splitlines()[1:4] == ["read,10", "inserted,10", "duplicates,0"]
+    assert out.getvalue().splitlines()[5:8] == ["read,10", "inserted,0", "duplicates,10"]
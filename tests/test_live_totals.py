@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.live_totals import DayTotals, TodayStats
+from where_did_my_time_go.storage import Database, SessionRecord
+
+DAY = datetime(2026, 3, 10)
+
+
+def _at(hour: int, minute: int = 0, days: int = 0) -> float:
+    return (DAY + timedelta(days=days, hours=hour, minutes=minute)).timestamp()
+
+
+def _add(db: Database, start: float, minutes: int, category: str) -> None:
+    begin = datetime.fromtimestamp(start, timezone.utc)
+    db.add_session(
+        SessionRecord(
+            start_ts=begin.isoformat(),
+            end_ts=(begin + timedelta(minutes=minutes)).isoformat(),
+            duration_sec=minutes * 60,
+            process_name=category.lower(),
+            exe_path="",
+            window_title="",
+            category=category,
+            intent_tag=None,
+        )
+    )
+
+
+def test_stats_follow_switches_without_queries(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    _add(db, _at(23, 30, days=-1), 60, "Social")  # 30 of these minutes are today
+    _add(db, _at(8), 60, "Work")
+    _add(db, _at(9), 10, "Idle")
+    _add(db, _at(9, 10), 40, "Work")
+    today = DayTotals(db, clock=lambda: _at(10))
+
+    today.switch("Work", _at(10, 10))
+    today.switch("Idle", _at(10, 40))
+    today.switch("Other", _at(10, 50))
+    db.close()  # reads below must not need storage
+    assert today.stats(_at(11)) == TodayStats(170 * 60, 20 * 60, "Work", 130 * 60)
+    today.switch(None, _at(11))
+    assert today.totals(_at(12))["Other"] == 10 * 60
+
+    # Counters start over at midnight; an open stretch keeps counting.
+    today.switch("Work", _at(23, 30))
+    assert today.totals(_at(0, 15, days=1)) == {"Work": 15 * 60}
+
+
+def test_reconcile_picks_up_storage_without_double_counting(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    today = DayTotals(db, clock=lambda: _at(10))
+    today.switch("Work", _at(10))
+    # The tracker keeps extending the open session row...
+    _add(db, _at(10), 45, "Work")
+    # ...and an import adds time the switches never saw.
+    _add(db, _at(8), 30, "Reading")
+    assert today.totals(_at(11)) == {"Work": 60 * 60}
+
+    today.reconcile(_at(11))
+    assert today.totals(_at(11)) == {"Work": 60 * 60, "Reading": 30 * 60}
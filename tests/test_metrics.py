@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+from where_did_my_time_go.metrics import MetricsRegistry, SnapshotWriter, registry
+from where_did_my_time_go.storage import Database
+
+
+def test_disabled_registry_records_nothing() -> None:
+    metrics = MetricsRegistry(enabled=False)
+    metrics.increment("ticks")
+    with metrics.timer("tick"):
+        pass
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {}
+    assert snapshot["histograms"] == {}
+
+
+def test_counters_and_histograms() -> None:
+    metrics = MetricsRegistry(enabled=True)
+    metrics.increment("gaps")
+    metrics.increment("gaps", 2)
+    for value in (0.05, 0.3, 2.0, 40.0):
+        metrics.observe("db.write", value)
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"gaps": 3}
+    histogram = snapshot["histograms"]["db.write"]
+    assert histogram["count"] == 4
+    assert histogram["max_ms"] == 40.0
+    assert histogram["p50_ms"] == 0.5
+    assert histogram["buckets"]["50.0"] == 1
+
+
+def test_database_methods_are_timed(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    registry.reset()
+    registry.enabled = True
+    try:
+        db.initialize()
+        db.list_rules()
+        snapshot = registry.snapshot()
+    finally:
+        registry.enabled = False
+        registry.reset()
+    assert snapshot["histograms"]["db.initialize"]["count"] == 1
+    assert snapshot["histograms"]["db.list_rules"]["count"] == 1
+
+
+def test_snapshot_writer(tmp_path: Path) -> None:
+    metrics = MetricsRegistry(enabled=True)
+    metrics.increment("ticks")
+    path = tmp_path / "metrics.json"
+    SnapshotWriter(path, metrics=metrics).write()
+    assert json.loads(path.read_text(encoding="utf-8"))["counters"] == {"ticks": 1}
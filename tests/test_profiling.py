@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from where_did_my_time_go.profiling import Profiler
+
+
+def _work() -> list[int]:
+    return [value * value for value in range(1000)]
+
+
+def test_profiler_writes_dumps_and_summary(tmp_path: Path) -> None:
+    profiler = Profiler(tmp_path, top_n=5)
+    with profiler.section("tracker"):
+        _work()
+    assert list(tmp_path.iterdir()) == []
+
+    profiler.start()
+    with profiler.section("tracker"):
+        _work()
+    summary_path = profiler.stop()
+
+    assert summary_path is not None
+    summary = summary_path.read_text(encoding="utf-8")
+    assert "=== tracker" in summary
+    assert "_work" in summary
+    assert "allocations" in summary
+    assert len(list(tmp_path.glob("*-tracker.prof"))) == 1
+    assert profiler.stop() is None
+
+
+def test_profiler_rotates_old_runs(tmp_path: Path) -> None:
+    profiler = Profiler(tmp_path, keep_runs=2)
+    for _ in range(3):
+        profiler.start()
+        with profiler.section("ui.reports"):
+            _work()
+        profiler.stop()
+    assert len(list(tmp_path.glob("*-summary.txt"))) == 2
+    assert len(list(tmp_path.glob("*.prof"))) == 2
@@ -0,0 +1,112 @@
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from where_did_my_time_go.query import SessionQuery, compile_query
+from where_did_my_time_go.storage import Database, SessionRecord
+
+DAY = datetime(2026, 3, 10, tzinfo=timezone.utc)
+RANGE = SessionQuery(DAY.isoformat(), (DAY + timedelta(days=1)).isoformat())
+
+
+def _add(db: Database, hour: int, seconds: int, process: str, title: str, category: str, intent: str | None = None):
+    start = DAY + timedelta(hours=hour)
+    db.add_session(
+        SessionRecord(
+            start_ts=start.isoformat(),
+            end_ts=(start + timedelta(seconds=seconds)).isoformat(),
+            duration_sec=seconds,
+            process_name=process,
+            exe_path="",
+            window_title=title,
+            category=category,
+            intent_tag=intent,
+        )
+    )
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Database:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    _add(db, 9, 1800, "code.exe", "query.py - editor", "Work", "refactor")
+    _add(db, 10, 600, "chrome.exe", "Inbox - Mail", "Communication")
+    _add(db, 11, 300, "chrome.exe", "100%_done - Docs", "Work")
+    _add(db, 12, 900, "Idle", "", "Idle")
+    _add(db, 23, 7200, "game.exe", "Match", "Gaming")  # ends the next day
+    _add(db, 30, 60, "code.exe", "tomorrow.py", "Work")
+    return db
+
+
+def test_filters_are_pushed_into_sql(db: Database) -> None:
+    titles = lambda query: [row[5] for row in db.select(replace(query, order_by=("start_ts",)))]
+    assert titles(replace(RANGE, category_like="WOR")) == ["query.py - editor", "100%_done - Docs"]
+    # LIKE wildcards in the filter text match literally.
+    assert titles(replace(RANGE, title_like="0%_")) == ["100%_done - Docs"]
+    assert titles(replace(RANGE, process="chrome.exe", min_duration=600)) == ["Inbox - Mail"]
+    assert titles(replace(RANGE, intent_tag="refactor")) == ["query.py - editor"]
+    assert titles(replace(RANGE, search="inbox")) == ["Inbox - Mail"]
+    # The session running past midnight belongs to the day it starts in.
+    assert len(db.select(RANGE)) == 5
+
+    by_category = replace(RANGE, exclude_categories=("Idle",), group_by=("category",))
+    assert db.select(replace(by_category, order_by=("-total",))) == [
+        ("Gaming", 7200, 1),
+        ("Work", 2100, 2),
+        ("Communication", 600, 1),
+    ]
+    assert db.select(replace(RANGE, category_like="work", aggregate=True)) == [(2100, 2)]
+    top = replace(RANGE, group_by=("process_name",), order_by=("-total", "process_name"), limit=2)
+    assert db.select(top) == [("game.exe", 7200, 1), ("code.exe", 1800, 1)]
+
+    spans = replace(RANGE, columns=("start_epoch", "end_epoch", "process_name"), limit=1)
+    start = int((DAY + timedelta(hours=9)).timestamp())
+    assert db.select(replace(spans, order_by=("start_ts",))) == [(start, start + 1800, "code.exe")]
+
+    with pytest.raises(ValueError):
+        db.select(replace(RANGE, order_by=("1; DROP TABLE sessions",)))
+    with pytest.raises(ValueError):
+        db.select(replace(RANGE, columns=("rowid; DROP TABLE sessions",)))
+
+
+def test_same_shape_compiles_to_the_same_statement(db: Database) -> None:
+    first = compile_query(replace(RANGE, category_like="work", limit=10), db._search_clause)
+    second = compile_query(
+        SessionQuery("2020-01-01", "2020-02-01", category_like="play", limit=5), db._search_clause
+    )
+    assert first[0] == second[0]
+    assert first[1] != second[1]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        # Reports table, filtered table and export.
+        replace(RANGE, order_by=("start_ts",)),
+        replace(RANGE, category_like="work", process_like="code", order_by=("start_ts",)),
+        # Dashboard and CLI totals.
+        replace(RANGE, group_by=("category",)),
+        replace(RANGE, group_by=("process_name",), order_by=("-total",), limit=10),
+        # Rollup by day.
+        replace(RANGE, group_by=("day", "category")),
+        replace(RANGE, intent_tag="refactor", min_duration=60),
+        # Trends spans and CLI stats.
+        replace(RANGE, columns=("start_epoch", "end_epoch", "category", "process_name")),
+        replace(RANGE, columns=("end_ts",), order_by=("-end_ts",), limit=1),
+    ],
+)
+def test_ranged_queries_search_the_start_index(db: Database, query: SessionQuery) -> None:
+    plan = db.explain(query)
+    assert "SEARCH s USING INDEX idx_sessions_dedupe (start_ts>? AND start_ts<?)" in plan
+    assert not any(line.startswith("SCAN s") for line in plan)
+    if query.order_by == ("start_ts",):
+        # Rows come back in index order; no sort step.
+        assert not any("ORDER BY" in line for line in plan)
+
+
+def test_search_goes_through_the_full_text_index(db: Database) -> None:
+    plan = db.explain(replace(RANGE, search="inbox", order_by=("-start_ts",), limit=1000))
+    assert any(line.startswith("SCAN sessions_fts VIRTUAL TABLE") for line in plan)
+    assert "SEARCH s USING INTEGER PRIMARY KEY (rowid=?)" in plan
@@ -0,0 +1,188 @@
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from where_did_my_time_go import query_server
+from where_did_my_time_go.query_server import QueryServer
+from where_did_my_time_go.report_cache import ReportCache
+from where_did_my_time_go.storage import Database, SessionRecord
+
+DAY = datetime(2026, 3, 10, tzinfo=timezone.utc)
+RANGE = "start=2026-03-09&end=2026-03-10"
+TOKEN = "test-token"
+
+
+def _add(db: Database, start: datetime, seconds: int, process: str, category: str) -> None:
+    db.add_session(
+        SessionRecord(
+            start_ts=start.isoformat(),
+            end_ts=(start + timedelta(seconds=seconds)).isoformat(),
+            duration_sec=seconds,
+            process_name=process,
+            exe_path="",
+            window_title=f"{process} window",
+            category=category,
+            intent_tag=None,
+        )
+    )
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    path = tmp_path / "data.db"
+    db = Database(path)
+    db.initialize()
+    for index in range(5):
+        _add(db, DAY + timedelta(hours=9, minutes=index * 10), 300, "code.exe", "Work")
+    _add(db, DAY + timedelta(hours=12), 900, "chrome.exe", "Social")
+    _add(db, DAY - timedelta(hours=2), 600, "chrome.exe", "Social")
+    db.close()
+    return path
+
+
+def _get(server: QueryServer, path: str, headers: dict[str, str] | None = None) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.port}{path}", headers={"Authorization": f"Bearer {TOKEN}", **(headers or {})}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_endpoints_answer_from_read_only_connections(db_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Pages span several streamed writes.
+    monkeypatch.setattr(query_server, "ROWS_PER_WRITE", 2)
+    status = {"tracking": True, "session": {"process_name": "code.exe"}}
+    server = QueryServer(db_path, status=lambda: status, token=TOKEN)
+    server.start()
+    try:
+        code, summary = _get(server, f"/summary?{RANGE}")
+        assert code == 200
+        assert summary["rows"] == [{"name": "Social", "total_sec": 1500}, {"name": "Work", "total_sec": 1500}]
+        code, top = _get(server, f"/top-apps?{RANGE}&limit=1")
+        assert top["rows"] == [{"process_name": "chrome.exe", "total_sec": 1500, "sessions": 2}]
+
+        pages = []
+        path = f"/sessions?{RANGE}&limit=3"
+        while True:
+            code, page = _get(server, path)
+            assert code == 200
+            pages.append([row["start_ts"] for row in page["rows"]])
+            if page["next_offset"] is None:
+                break
+            path = f"/sessions?{RANGE}&limit=3&offset={page['next_offset']}"
+        assert [len(rows) for rows in pages] == [3, 3, 1]
+        assert sum(pages, []) == sorted(sum(pages, []))
+        _, filtered = _get(server, f"/sessions?{RANGE}&category=soc&search=chrome")
+        assert [row["duration_sec"] for row in filtered["rows"]] == [600, 900]
+
+        assert _get(server, "/status") == (200, status)
+        assert _get(server, "/nothing")[0] == 404
+        assert _get(server, "/sessions?limit=0")[0] == 400
+        assert _get(server, "/summary?start=yesterday")[0] == 400
+        assert _get(server, "/summary?days=-1")[0] == 400
+        assert _get(server, "/summary?range=month")[0] == 400
+    finally:
+        server.stop()
+
+
+def test_requests_need_a_local_host_and_the_token(db_path: Path) -> None:
+    server = QueryServer(db_path, token=TOKEN)
+    server.start()
+    try:
+        assert _get(server, "/status", {"Host": f"localhost:{server.port}"})[0] == 200
+        # A rebound name reaches the same socket but not the data.
+        assert _get(server, "/status", {"Host": f"attacker.example:{server.port}"})[0] == 403
+        assert _get(server, "/status", {"Host": "127.0.0.1"})[0] == 403
+        assert _get(server, "/status", {"Authorization": "Bearer guess"})[0] == 401
+        assert _get(server, "/status", {"Authorization": ""})[0] == 401
+    finally:
+        server.stop()
+
+
+def test_start_server_makes_one_token_per_install(db_path: Path, tmp_path: Path) -> None:
+    token_path = tmp_path / "api_token"
+    server, error = query_server.start_server(0, db_path=db_path, token_path=token_path)
+    assert (server, error) == (None, "")
+    server, error = query_server.start_server(_free_port(), db_path=db_path, token_path=token_path)
+    assert error == ""
+    try:
+        assert server.token == token_path.read_text(encoding="utf-8")
+        assert query_server.load_token(token_path) == server.token
+        # The port is taken, so a second server reports why instead of printing.
+        again, error = query_server.start_server(server.port, db_path=db_path, token_path=token_path)
+        assert again is None and error
+    finally:
+        server.stop()
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def test_read_only_cache_sums_days_without_storing_them(db_path: Path) -> None:
+    db = Database(db_path, read_only=True)
+    totals = ReportCache(db, store=False).totals(
+        DAY - timedelta(days=1), DAY + timedelta(days=1), now=DAY + timedelta(days=5)
+    )
+    assert totals.by_category() == {"Social": 1500, "Work": 1500}
+    assert db.cached_rollup_days("2026-03-09", "2026-03-10", db.data_version()) == set()
+    db.close()
+
+
+def test_endpoints_agree_on_sessions_crossing_the_range_end(db_path: Path) -> None:
+    db = Database(db_path)
+    _add(db, DAY + timedelta(hours=23, minutes=30), 3600, "game.exe", "Games")
+    db.close()
+    server = QueryServer(db_path, token=TOKEN)
+    server.start()
+    try:
+        _, summary = _get(server, f"/summary?{RANGE}")
+        _, top = _get(server, f"/top-apps?{RANGE}&limit=100")
+        _, sessions = _get(server, f"/sessions?{RANGE}&limit=100")
+    finally:
+        server.stop()
+    # Credited whole to the day it starts in, by every endpoint.
+    assert summary["total_sec"] == 6600
+    assert sum(row["total_sec"] for row in top["rows"]) == 6600
+    assert sum(row["duration_sec"] for row in sessions["rows"]) == 6600
+
+
+def test_requests_over_the_limit_are_refused(db_path: Path) -> None:
+    entered = threading.Event()
+    release = threading.Event()
+
+    def slow_status() -> dict:
+        entered.set()
+        release.wait(5)
+        return {"tracking": False, "session": None}
+
+    server = QueryServer(db_path, status=slow_status, max_requests=1, token=TOKEN)
+    server.start()
+    try:
+        holder = threading.Thread(target=_get, args=(server, "/status"))
+        holder.start()
+        assert entered.wait(5)
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/summary", timeout=5)
+        except urllib.error.HTTPError as exc:
+            assert exc.code == 503
+            assert exc.headers["Retry-After"] == "1"
+        else:
+            pytest.fail("second request was served")
+        release.set()
+        holder.join()
+        assert _get(server, "/summary")[0] == 200
+    finally:
+        release.set()
+        server.stop()
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.report_cache import ReportCache
+from where_did_my_time_go.storage import Database, SessionRecord
+
+
+def _add(db: Database, start: datetime, seconds: int, process: str, category: str) -> int:
+    end = start + timedelta(seconds=seconds)
+    return db.add_session(
+        SessionRecord(
+            start_ts=start.isoformat(),
+            end_ts=end.isoformat(),
+            duration_sec=seconds,
+            process_name=process,
+            exe_path="",
+            window_title="",
+            category=category,
+            intent_tag=None,
+        )
+    )
+
+
+def test_closed_days_are_cached_and_today_is_live(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+    today = datetime(2026, 3, 10, tzinfo=timezone.utc)
+    _add(db, today - timedelta(days=2, hours=-9), 600, "code.exe", "Work")
+    _add(db, today - timedelta(days=1, hours=-9), 300, "chrome.exe", "Video")
+    _add(db, today + timedelta(hours=9), 120, "code.exe", "Work")
+
+    cache = ReportCache(db)
+    totals = cache.totals(today - timedelta(days=7), now, now=now)
+    assert totals.by_category() == {"Work": 720, "Video": 300}
+    # Days before the first recorded session are never materialized.
+    assert db.cached_rollup_days("2026-03-03", "2026-03-09", db.data_version()) == {
+        "2026-03-08",
+        "2026-03-09",
+    }
+
+    _add(db, today + timedelta(hours=10), 60, "chrome.exe", "Video")
+    totals = cache.totals(today - timedelta(days=7), now, now=now)
+    assert totals.by_app() == {"code.exe": 720, "chrome.exe": 360}
+
+
+def test_data_version_invalidates_cached_days(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+    yesterday = datetime(2026, 3, 9, 9, 0, tzinfo=timezone.utc)
+    _add(db, yesterday, 600, "code.exe", "Work")
+
+    cache = ReportCache(db)
+    start = yesterday.replace(hour=0)
+    assert cache.totals(start, now, now=now).by_category() == {"Work": 600}
+
+    # Changes that bypass the session writers (edits, imports, retention)
+    # only show once data_version moves.
+    db._conn.execute("UPDATE sessions SET category='Communication'")
+    db._conn.commit()
+    assert cache.totals(start, now, now=now).by_category() == {"Work": 600}
+
+    db.bump_data_version()
+    assert cache.totals(start, now, now=now).by_category() == {"Communication": 600}
+
+
+def test_rows_written_into_a_cached_day_drop_it(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+    yesterday = datetime(2026, 3, 9, 9, 0, tzinfo=timezone.utc)
+    session_id = _add(db, yesterday, 600, "code.exe", "Work")
+    cache = ReportCache(db)
+    start = yesterday.replace(hour=0)
+    assert cache.totals(start, now, now=now).by_category() == {"Work": 600}
+    assert db.cached_rollup_days("2026-03-09", "2026-03-09", db.data_version()) == {"2026-03-09"}
+
+    # An idle row back-dated after a resume lands in the closed day.
+    _add(db, yesterday + timedelta(hours=1), 60, "Idle", "Idle")
+    assert cache.totals(start, now, now=now).by_category() == {"Work": 600, "Idle": 60}
+
+    db.update_session_end(session_id, (yesterday + timedelta(seconds=900)).isoformat(), 900)
+    assert cache.totals(start, now, now=now).by_category() == {"Work": 900, "Idle": 60}
+
+
+def test_session_growing_past_midnight_invalidates_its_day(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    now = datetime(2026, 3, 10, 0, 30, tzinfo=timezone.utc)
+    start = datetime(2026, 3, 9, 23, 50, tzinfo=timezone.utc)
+    session_id = _add(db, start, 60, "code.exe", "Work")
+
+    cache = ReportCache(db)
+    day_start = start.replace(hour=0, minute=0)
+    assert cache.totals(day_start, now, now=now).by_category() == {"Work": 60}
+
+    db.update_session_end(session_id, now.isoformat(), 2400)
+    assert cache.totals(day_start, now, now=now).by_category() == {"Work": 2400}
+
+
+def test_session_straddling_partial_day_boundary_is_counted_once(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+    _add(db, datetime(2026, 3, 4, 23, 30, tzinfo=timezone.utc), 3600, "code.exe", "Work")
+    _add(db, datetime(2026, 3, 2, 23, 30, tzinfo=timezone.utc), 3600, "code.exe", "Work")
+
+    window_start = now - timedelta(days=7)
+    totals = ReportCache(db).totals(window_start, now, now=now)
+    assert totals.by_category() == {"Work": 3600}
+    table = db.select(SessionQuery(window_start.isoformat(), now.isoformat(), aggregate=True))
+    assert table == [(3600, 1)]
+
+    head = ReportCache(db).totals(datetime(2026, 3, 4, 18, 0, tzinfo=timezone.utc), now, now=now)
+    assert head.by_category() == {"Work": 3600}
@@ -0,0 +1,55 @@
+import io
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.cli import run
+from where_did_my_time_go.rollup import aggregate_many
+from where_did_my_time_go.storage import Database, SessionRecord
+
+
+def _make_db(path: Path, sessions: list[tuple[str, str, int]]) -> None:
+    db = Database(path)
+    db.initialize()
+    start = datetime(2024, 5, 6, 9, 0, tzinfo=timezone.utc)
+    for index, (process, category, seconds) in enumerate(sessions):
+        begin = start + timedelta(hours=index)
+        db.add_session(
+            SessionRecord(
+                start_ts=begin.isoformat(),
+                end_ts=(begin + timedelta(seconds=seconds)).isoformat(),
+                duration_sec=seconds,
+                process_name=process,
+                exe_path="",
+                window_title="",
+                category=category,
+                intent_tag=None,
+            )
+        )
+    db.close()
+
+
+def test_aggregate_many_merges_partials(tmp_path: Path) -> None:
+    _make_db(tmp_path / "alice.db", [("code.exe", "Work", 600), ("chrome.exe", "Video", 300)])
+    _make_db(tmp_path / "bob.db", [("code.exe", "Work", 900)])
+    paths = [tmp_path / "alice.db", tmp_path / "bob.db", tmp_path / "missing.db"]
+
+    result = aggregate_many(paths, "2024-05-01T00:00:00+00:00", "2024-06-01T00:00:00+00:00", workers=2)
+
+    assert result.databases == 2
+    assert result.sessions == 3
+    assert result.by_category == {"Work": 1500, "Video": 300}
+    assert result.by_app == {"code.exe": 1500, "chrome.exe": 300}
+    assert result.by_day == {("2024-05-06", "Work"): 1500, ("2024-05-06", "Video"): 300}
+    assert [path for path, _ in result.errors] == [str(tmp_path / "missing.db")]
+
+
+def test_rollup_command_scans_directories(tmp_path: Path) -> None:
+    _make_db(tmp_path / "alice.db", [("code.exe", "Work", 600)])
+    _make_db(tmp_path / "bob.db", [("slack.exe", "Communication", 120)])
+    out = io.StringIO()
+    run(["rollup", str(tmp_path), "--by", "app", "--format", "csv", "--start", "2024-05-06", "--workers", "1"], out)
+    assert out.getvalue().splitlines() == [
+        "process_name,total_sec,duration",
+        "code.exe,600,0h 10m",
+        "slack.exe,120,0h 2m",
+    ]
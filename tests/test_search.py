@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.query import SessionQuery
+from where_did_my_time_go.storage import Database, SessionRecord
+
+
+def _add(db: Database, start: datetime, seconds: int, process: str, title: str) -> int:
+    return db.add_session(
+        SessionRecord(
+            start_ts=start.isoformat(),
+            end_ts=(start + timedelta(seconds=seconds)).isoformat(),
+            duration_sec=seconds,
+            process_name=process,
+            exe_path=f"C:\\Program Files\\{process}",
+            window_title=title,
+            category="Other",
+            intent_tag=None,
+        )
+    )
+
+
+def _search(db: Database, text: str, start: str, end: str) -> list[tuple]:
+    return db.select(SessionQuery(start, end, search=text, order_by=("-start_ts",)))
+
+
+def test_title_search_uses_index_and_tracks_changes(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    now = datetime.now(timezone.utc)
+    start, end = (now - timedelta(days=1)).isoformat(), (now + timedelta(days=1)).isoformat()
+    _add(db, now - timedelta(hours=3), 600, "chrome.exe", "Quarterly report - Google Docs")
+    _add(db, now - timedelta(hours=2), 300, "code.exe", "report.py - project")
+    session_id = _add(db, now - timedelta(hours=1), 120, "slack.exe", "general channel")
+
+    rows = _search(db, "report", start, end)
+    assert [row[3] for row in rows] == ["code.exe", "chrome.exe"]
+    summary = db.select(SessionQuery(start, end, search="quart rep", aggregate=True))
+    assert summary == [(600, 1)]
+    assert len(_search(db, "slack", start, end)) == 1
+
+    db._conn.execute("UPDATE sessions SET window_title=? WHERE session_id=?", ("report review", session_id))
+    assert len(_search(db, "review", start, end)) == 1
+    assert _search(db, '"unbalanced OR (', start, end) == []
+
+    plan = db._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT rowid FROM sessions_fts WHERE sessions_fts MATCH ?", ('"report"*',)
+    ).fetchall()
+    assert any("VIRTUAL TABLE INDEX" in row["detail"] for row in plan)
+
+
+def test_existing_sessions_are_indexed_on_upgrade(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    now = datetime.now(timezone.utc)
+    _add(db, now - timedelta(hours=1), 60, "notepad.exe", "todo list")
+    db._conn.executescript(
+        "DROP TRIGGER sessions_fts_insert; DROP TRIGGER sessions_fts_delete;"
+        "DROP TRIGGER sessions_fts_update; DROP TABLE sessions_fts;"
+    )
+    db.close()
+
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    rows = _search(db, "todo", (now - timedelta(days=1)).isoformat(), now.isoformat())
+    assert [row[3] for row in rows] == ["notepad.exe"]
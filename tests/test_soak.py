@@ -0,0 +1,48 @@
+import os
+import statistics
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from where_did_my_time_go.eventlog import rebuild
+from where_did_my_time_go.simulation import SOAK_START, Soak, accounting_errors
+
+# A few simulated hours run by default; set WDMTG_SOAK_DAYS (e.g. 14) for the
+# long run that leaks and drift used to need days of uptime to show.
+SOAK_HOURS = int(float(os.environ.get("WDMTG_SOAK_DAYS", "0")) * 24) or 4
+
+
+@pytest.fixture
+def soak_dir(tmp_path: Path):
+    # On tmpfs the per-tick commits skip fsync, which is what makes weeks of
+    # simulated tracking fit in minutes.
+    if Path("/dev/shm").is_dir():
+        with tempfile.TemporaryDirectory(dir="/dev/shm") as tmp:
+            yield Path(tmp)
+    else:
+        yield tmp_path
+
+
+@pytest.mark.parametrize("storage_mode", ["sessions", "events"])
+def test_soak_accounts_for_every_second(soak_dir: Path, storage_mode: str) -> None:
+    soak = Soak(soak_dir / "soak.db", storage_mode, seed=7)
+    for _ in range(SOAK_HOURS):
+        soak.run_hour()
+    end_ts = soak.finish()
+    sessions = soak.sessions()
+
+    assert accounting_errors(sessions, SOAK_START.isoformat(), end_ts) == []
+    # One row per focus or idle stretch, not per tick.
+    assert len(sessions) == soak.transitions
+    if storage_mode == "events":
+        rebuild(soak.db)
+        assert soak.sessions() == sessions
+
+    first, last = soak.samples[0], soak.samples[-1]
+    assert (last.db_bytes - first.db_bytes) <= 1024 * max(1, last.rows - first.rows)
+    assert last.blocks - first.blocks < 2000 + 100 * SOAK_HOURS
+    if first.rss_bytes and last.rss_bytes:
+        assert last.rss_bytes - first.rss_bytes < 16 * 2**20
+    assert statistics.median(sample.cpu_per_tick for sample in soak.samples) < 0.005
+    soak.db.close()
@@ -0,0 +1,28 @@
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+import bench_startup  # noqa: E402
+
+# Wall-clock budgets are noisy on shared CI machines, so these only run when
+# explicitly requested; `python benchmarks/bench_startup.py --check` is the
+# usual gate.
+pytestmark = pytest.mark.skipif(
+    os.environ.get("WDMTG_STARTUP_BUDGETS") != "1", reason="set WDMTG_STARTUP_BUDGETS=1 to run"
+)
+
+
+def test_cli_import_within_budget() -> None:
+    results = bench_startup.measure(repeat=3, include_gui=False)
+    assert bench_startup.over_budget(results) == {}
+
+
+@pytest.mark.skipif(importlib.util.find_spec("PySide6") is None, reason="PySide6 not installed")
+def test_gui_startup_within_budget() -> None:
+    results = bench_startup.measure(repeat=3)
+    assert bench_startup.over_budget(results) == {}
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.rules import Rule
+from where_did_my_time_go.storage import Database, SessionRecord
+from where_did_my_time_go.suggestions import SuggestionEngine, title_tokens
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def _record(start: datetime, seconds: int, process: str, title: str, category: str = "Other") -> SessionRecord:
+    return SessionRecord(
+        start_ts=start.isoformat(),
+        end_ts=(start + timedelta(seconds=seconds)).isoformat(),
+        duration_sec=seconds,
+        process_name=process,
+        exe_path="",
+        window_title=title,
+        category=category,
+        intent_tag=None,
+    )
+
+
+def _seed(db: Database) -> None:
+    start = NOW - timedelta(days=1)
+    db.add_sessions(
+        [
+            _record(start, 3000, "chrome.exe", "(2) JIRA-101 Fix login - Jira - Google Chrome"),
+            _record(start + timedelta(hours=1), 2400, "firefox.exe", "Sprint board - Jira - Mozilla Firefox"),
+            _record(start + timedelta(hours=2), 1800, "chrome.exe", "Reddit - Google Chrome"),
+            _record(start + timedelta(hours=3), 1500, "figma.exe", "Logo draft - Figma"),
+            _record(start + timedelta(hours=4), 9000, "code.exe", "main.py - Code", "Work"),
+        ]
+    )
+
+
+def test_title_tokens() -> None:
+    assert title_tokens("(3) Fix the build - GitHub") == {"fix", "build", "github"}
+
+
+def test_suggestions_rank_uncategorized_clusters(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    _seed(db)
+    engine = SuggestionEngine(db, clock=lambda: NOW)
+    assert engine.scan() == 5
+
+    suggestions = engine.suggestions([], limit=20)
+    patterns = [(s.rule.process_pattern, s.rule.title_pattern) for s in suggestions]
+    # "jira" spans two browsers, so it becomes a title-only rule.
+    jira = suggestions[patterns.index((None, "jira"))]
+    assert (jira.seconds, jira.sessions) == (5400, 2)
+    assert jira.share == 5400 / 8700
+    assert patterns[:2] == [(None, "jira"), ("chrome.exe", None)]
+    assert ("chrome.exe", "reddit") in patterns
+    # Categorized time and tokens that only restate the process stay out.
+    assert all(process != "code.exe" for process, _ in patterns)
+    assert ("figma.exe", "figma") not in patterns
+
+    # Rules added since the time was logged hide what they already catch.
+    rules = [Rule(1, True, "substring", None, "jira", "Work", 1)]
+    assert (None, "jira") not in [
+        (s.rule.process_pattern, s.rule.title_pattern) for s in engine.suggestions(rules, limit=20)
+    ]
+
+
+def test_scan_resumes_from_its_watermark(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    _seed(db)
+    engine = SuggestionEngine(db, batch_size=2, clock=lambda: NOW)
+    # Interrupted after the first batch; that batch stays indexed.
+    assert engine.scan(should_stop=lambda: db.suggestion_state()[0] > 0) == 2
+    assert engine.scan() == 3
+    assert engine.scan() == 0
+
+    # A session still running is left for a later scan.
+    session_id = db.add_session(_record(NOW - timedelta(minutes=5), 300, "slack.exe", "general - Slack"))
+    assert engine.scan() == 0
+    assert db.suggestion_state()[0] == session_id - 1
+    later = SuggestionEngine(db, clock=lambda: NOW + timedelta(hours=2))
+    assert later.scan() == 1
+    totals = {s.rule.process_pattern: s.seconds for s in later.suggestions([], 20) if s.rule.title_pattern is None}
+    assert totals == {"chrome.exe": 4800, "firefox.exe": 2400, "figma.exe": 1500, "slack.exe": 300}
+
+    # History rewritten by an import or rebuild starts the index over.
+    db.bump_data_version()
+    assert later.scan() == 6
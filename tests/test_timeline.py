@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from where_did_my_time_go.storage import Database, SessionRecord
+from where_did_my_time_go.timeline import DAY, HOUR, MINUTE, RAW, TimelineIndex, choose_resolution, day_occupancy
+
+DAY0 = int(datetime(2024, 5, 6, tzinfo=timezone.utc).timestamp())
+
+
+def _record(start: int, seconds: int, process: str, category: str) -> SessionRecord:
+    begin = datetime.fromtimestamp(start, timezone.utc)
+    return SessionRecord(
+        start_ts=begin.isoformat(),
+        end_ts=(begin + timedelta(seconds=seconds)).isoformat(),
+        duration_sec=seconds,
+        process_name=process,
+        exe_path="",
+        window_title="",
+        category=category,
+        intent_tag=None,
+    )
+
+
+def test_occupancy_splits_at_bucket_and_day_edges() -> None:
+    spans = [
+        (DAY0 - 30, DAY0 + 90, "Work"),  # crosses midnight and a minute edge
+        (DAY0 + 60, DAY0 + 75, "Work"),  # overlaps the first; counted once
+        (DAY0 + HOUR - 10, DAY0 + HOUR + 20, "Video"),
+    ]
+    buckets = day_occupancy(spans, DAY0)
+    assert sorted(buckets[MINUTE]) == [
+        (DAY0, "Work", 60),
+        (DAY0 + MINUTE, "Work", 30),
+        (DAY0 + HOUR - MINUTE, "Video", 10),
+        (DAY0 + HOUR, "Video", 20),
+    ]
+    assert sorted(buckets[HOUR]) == [(DAY0, "Video", 10), (DAY0, "Work", 90), (DAY0 + HOUR, "Video", 20)]
+
+
+def test_levels_follow_zoom() -> None:
+    assert choose_resolution(DAY0, DAY0 + HOUR, 1000) == RAW
+    assert choose_resolution(DAY0, DAY0 + DAY, 1000) == MINUTE
+    assert choose_resolution(DAY0, DAY0 + 30 * DAY, 1000) == HOUR
+
+
+def test_closed_days_are_cached_and_invalidated(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    db.add_sessions(
+        [_record(DAY0 + 9 * HOUR, 1800, "code.exe", "Work"), _record(DAY0 + DAY - 600, 1200, "vlc.exe", "Video")]
+    )
+    index = TimelineIndex(db, clock=lambda: DAY0 + 3 * DAY)
+
+    week = index.fetch(DAY0, DAY0 + 2 * DAY, 200)
+    assert week.resolution == HOUR
+    assert sorted(week.items) == [
+        (DAY0 + 9 * HOUR, "Work", 1800),
+        (DAY0 + 23 * HOUR, "Video", 600),
+        (DAY0 + DAY, "Video", 600),
+    ]
+    assert week.categories == ["Video", "Work"]
+    assert len(db.cached_timeline_days("2024-05-06", "2024-05-07", db.data_version())) == 2
+
+    # A late write into a cached day drops that day's cache.
+    db.add_session(_record(DAY0 + DAY + HOUR, 60, "code.exe", "Work"))
+    assert db.cached_timeline_days("2024-05-06", "2024-05-07", db.data_version()) == {"2024-05-06"}
+    assert (DAY0 + DAY + HOUR, "Work", 60) in index.fetch(DAY0, DAY0 + 2 * DAY, 200).items
+
+    raw = index.fetch(DAY0 + 9 * HOUR + 600, DAY0 + 10 * HOUR, 1000)
+    assert raw.resolution == RAW
+    assert raw.items == [(DAY0 + 9 * HOUR + 600, DAY0 + 9 * HOUR + 1800, "Work", "code.exe", "")]
+
+
+def test_current_day_is_computed_live(tmp_path: Path) -> None:
+    db = Database(tmp_path / "test.db")
+    db.initialize()
+    db.add_session(_record(DAY0 + HOUR, 120, "code.exe", "Work"))
+    index = TimelineIndex(db, clock=lambda: DAY0 + 2 * HOUR)
+    assert index.fetch(DAY0, DAY0 + DAY, 100).items == [(DAY0 + HOUR, "Work", 120)]
+    assert db.cached_timeline_days("2024-05-06", "2024-05-06", db.data_version()) == set()